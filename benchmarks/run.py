@@ -0,0 +1,143 @@
+""" Benchmarks for augmentation hot paths.
+
+Usage (from repository root):\n
+python -m benchmarks.run --output results.json\n
+python -m benchmarks.run --compare baseline.json results.json --threshold 0.1
+"""
+import sys, json, time, typing, platform, argparse, statistics, subprocess
+
+from src import CONFIGS, _ROOT
+from src.attrs.attributes import TRANSFORMATION_CASES
+from src.augmentor import RUNERAugmentor, LOC_ENTITIES
+from src.utils.corpus_io import read_corpus
+from src.utils.transformation import transform, transform_batch
+
+INFLECTING_TAGS = ('NOUN', 'datv', 'femn', 'sing')
+SAMPLE = 'Задача NLP - извлечении именованных сущностей (NER)'.split(' ')
+
+
+def measure(func: typing.Callable, number: int, repeat: int) -> dict:
+    """ Measure time of function call.
+
+    :param func: Benchmarked function (without arguments), it's called once before measuring for warm up.
+    :param number: Number of calls per round.
+    :param repeat: Number of rounds.
+    :return: Min, median and mean time per call (in seconds) and number of calls.
+    """
+    func()  # warm up
+    timings = list()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings += [(time.perf_counter() - start) / number]
+    return {'min': min(timings), 'median': statistics.median(timings), 'mean': statistics.mean(timings),
+            'number': number, 'repeat': repeat}
+
+
+def import_time() -> None:
+    """ Import 'src' in clean interpreter.
+
+    :return:
+    """
+    subprocess.run([sys.executable, '-c', 'import src'], cwd=str(_ROOT), check=True)
+
+
+def benchmarks(aug: RUNERAugmentor, scale: float = 1.0) -> typing.Dict[str, typing.Tuple[typing.Callable, int]]:
+    """ Collect benchmarks.
+
+    :param aug: Augmentor.
+    :param scale: Multiplier for number of calls per round.
+    :return: Benchmarks names, functions and numbers of calls per round.
+    """
+    n = lambda number: max(1, int(number * scale))
+    samples = list(read_corpus(path=_ROOT/'ner_samples.csv'))
+    tokens_list, tags_list = [sample[0] for sample in samples], [sample[1] for sample in samples]
+    tokens, tags = aug.generate_augmentation(entity='address', inflecting_tags=INFLECTING_TAGS)
+    sub_tags = [tag.split('-')[-1] for tag in tags]
+    items = {
+        'detect_case': (lambda: aug.detect_case(s='Москве'), n(2000)),
+        'inflect': (lambda: aug.inflect(s='Ленинский проспект', tags=set(INFLECTING_TAGS)), n(2000)),
+        'tagging': (lambda: aug.tagging(s=tokens, t=sub_tags), n(2000)),
+    }
+    for entity in ['full_name'] + LOC_ENTITIES:
+        items[f'generate_augmentation.{entity}'] = (
+            lambda entity=entity: aug.generate_augmentation(entity=entity, inflecting_tags=INFLECTING_TAGS), n(500)
+        )
+    items['augment.PER'] = (lambda: aug.augment(s='Иванову', tag='PER'), n(500))
+    items['augment.LOC'] = (lambda: aug.augment(s='Москве', tag='LOC'), n(500))
+    for case in TRANSFORMATION_CASES[0]:
+        items[f'transform.{case}'] = (lambda case=case: transform(tokens=SAMPLE, transformation_case=case), n(2000))
+    items['transform_batch.ner_samples'] = (lambda: transform_batch(tokens_list=tokens_list, rng=aug.np_rng), n(50))
+    items['import.src'] = (import_time, 1)
+    items['end_to_end.ner_samples'] = (
+        lambda: transform_batch(tokens_list=aug.augment_corpus(tokens_list=tokens_list, tags_list=tags_list)[0],
+                                rng=aug.np_rng),
+        n(5)
+    )
+    return items
+
+
+def run(repeat: int = 5, scale: float = 1.0, names: typing.List[str] = None) -> dict:
+    """ Run benchmarks.
+
+    :param repeat: Number of rounds per benchmark.
+    :param scale: Multiplier for number of calls per round.
+    :param names: Benchmarks names prefixes (if None, then all benchmarks are run).
+    :return: Results with environment info.
+    """
+    aug = RUNERAugmentor(seed=CONFIGS['seed'])
+    results = dict()
+    for name, (func, number) in benchmarks(aug=aug, scale=scale).items():
+        if names is None or any(name.startswith(prefix) for prefix in names):
+            aug.reseed(seed=CONFIGS['seed'])
+            results[name] = measure(func=func, number=number, repeat=repeat)
+            print(f'{name:<40} {results[name]["median"] * 1e6:>12.1f} us/call', file=sys.stderr)
+    return {
+        'meta': {'python': platform.python_version(), 'platform': platform.platform(), 'time': time.time()},
+        'results': results,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float = 0.1) -> typing.List[str]:
+    """ Compare results (by median time per call) and find regressions.
+
+    :param baseline: Baseline results.
+    :param current: Current results.
+    :param threshold: Allowed relative slowdown.
+    :return: Names of regressed benchmarks.
+    """
+    regressions = list()
+    for name in sorted(set(baseline['results']) & set(current['results'])):
+        old, new = baseline['results'][name]['median'], current['results'][name]['median']
+        ratio = new / old if old > 0 else float('inf')
+        flag = 'REGRESSION' if ratio > 1 + threshold else 'faster' if ratio < 1 - threshold else ''
+        print(f'{name:<40} {old * 1e6:>12.1f} -> {new * 1e6:>12.1f} us/call  x{ratio:.2f} {flag}')
+        if flag == 'REGRESSION':
+            regressions += [name]
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmarks for augmentation hot paths.')
+    parser.add_argument('--output', default=None, help='Path to output json with results.')
+    parser.add_argument('--repeat', type=int, default=5, help='Number of rounds per benchmark.')
+    parser.add_argument('--scale', type=float, default=1.0, help='Multiplier for number of calls per round.')
+    parser.add_argument('--only', nargs='*', default=None, help='Benchmarks names prefixes.')
+    parser.add_argument('--compare', nargs=2, metavar=('BASELINE', 'CURRENT'), default=None,
+                        help='Compare two json results instead of running benchmarks.')
+    parser.add_argument('--threshold', type=float, default=0.1, help='Allowed relative slowdown for compare mode.')
+    args = parser.parse_args()
+    if args.compare is not None:
+        with open(args.compare[0], 'r') as f_baseline, open(args.compare[1], 'r') as f_current:
+            regressions = compare(baseline=json.load(f_baseline), current=json.load(f_current),
+                                  threshold=args.threshold)
+        sys.exit(1 if regressions else 0)
+    results = run(repeat=args.repeat, scale=args.scale, names=args.only)
+    if args.output is not None:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
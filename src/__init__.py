@@ -1,7 +1,8 @@
-import os, yaml, pathlib, marisa_trie
+import os, yaml, pathlib
 
 from src.utils.set_seed import set_seed
-from src.utils.load_txt import load_txt
+
+__version__ = '0.1.0'
 
 _ROOT = pathlib.Path(os.path.dirname(__file__)).parent
 DIR_SRC = _ROOT/'src'
@@ -13,18 +14,20 @@ DIR_VOCABS = DIR_SRC/'vocabs'
 with (_ROOT/'configs.yml').open('r') as f:
     CONFIGS = yaml.safe_load(stream=f)
 
-# Load vocabs:
-COUNTRIES = marisa_trie.Trie(load_txt(path=f'{DIR_VOCABS}/location/countries.txt'))
-REGIONS = marisa_trie.Trie(load_txt(path=f'{DIR_VOCABS}/location/regions.txt'))
-CITIES = marisa_trie.Trie(load_txt(path=f'{DIR_VOCABS}/location/cities.txt'))
-DISTRICTS = marisa_trie.Trie(load_txt(path=f'{DIR_VOCABS}/location/districts.txt'))
-STREETS = marisa_trie.Trie(load_txt(path=f'{DIR_VOCABS}/location/streets.txt'))
-LAST_NAMES_MALE = marisa_trie.Trie(load_txt(path=f'{DIR_VOCABS}/names/last_names_male.txt'))
-LAST_NAMES_FEMALE = marisa_trie.Trie(load_txt(path=f'{DIR_VOCABS}/names/last_names_female.txt'))
-FIRST_NAMES_MALE = marisa_trie.Trie(load_txt(path=f'{DIR_VOCABS}/names/first_names_male.txt'))
-FIRST_NAMES_FEMALE = marisa_trie.Trie(load_txt(path=f'{DIR_VOCABS}/names/first_names_female.txt'))
-MIDDLE_NAMES_MALE = marisa_trie.Trie(load_txt(path=f'{DIR_VOCABS}/names/middle_names_male.txt'))
-MIDDLE_NAMES_FEMALE = marisa_trie.Trie(load_txt(path=f'{DIR_VOCABS}/names/middle_names_female.txt'))
+
+def __getattr__(name: str):
+    """ Load vocabs lazily on first access (COUNTRIES, REGIONS, CITIES, DISTRICTS, STREETS, LAST_NAMES_MALE,
+    LAST_NAMES_FEMALE, FIRST_NAMES_MALE, FIRST_NAMES_FEMALE, MIDDLE_NAMES_MALE, MIDDLE_NAMES_FEMALE), see
+    'src.utils.vocab'.
+
+    :param name: Attribute name.
+    :return: Vocab trie.
+    """
+    from src.utils.vocab import VOCAB_FILES, load_vocab
+    if name in VOCAB_FILES:
+        return load_vocab(name=name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
 
 # Set unite seed for all project:
 set_seed(seed=CONFIGS['seed'])
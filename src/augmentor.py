@@ -1,10 +1,33 @@
-import typing, random, pymorphy2
+import typing, random, asyncio, itertools, threading, concurrent.futures
+import numpy as np
 
-from src import COUNTRIES, REGIONS, CITIES, DISTRICTS, STREETS, LAST_NAMES_MALE, LAST_NAMES_FEMALE, FIRST_NAMES_MALE, \
-    FIRST_NAMES_FEMALE, MIDDLE_NAMES_MALE, MIDDLE_NAMES_FEMALE
-from src.attrs.attributes import INPUT_TAG_MAP, TAG_MAP, NOT_NER_TAG, REPLACEMENT_MAP
+from src import CONFIGS
+from src.attrs.attributes import INPUT_TAG_MAP
+from src.utils.sampler import VocabSampler
+from src.utils.morphology import CachedMorphAnalyzer, get_shared_morph
+from src.utils.inflection_table import InflectionTable
+from src.utils.profiling import StageProfiler, NULL_PROFILER
+from src.utils.dedup import Deduplicator
+from src.utils.coverage import CoverageTracker
+from src.utils.entity_bank import EntityBank
+from src.utils.tag_vocab import TAG_VOCAB, ANCHOR_SETS, TAGGING_FORMATS
+from src.utils.matcher import ANCHORS, REPLACERS, strip_anchors
+from src.utils.sample_batch import SampleBatch, StringTable, TAG_TABLES
+from src.utils.transformation import transform_batch
+from src.utils.templates import TEMPLATES, ABBREVIATED_SLOTS, TemplatePlan
 
-ANCHORS = [anchor for k in NOT_NER_TAG for anchor in NOT_NER_TAG[k]]
+LOC_ENTITIES = ['address', 'country', 'region', 'city', 'district', 'street']
+# Vocabs are loaded on first draw:
+SAMPLERS = {
+    'COUNTRY': VocabSampler(vocab='COUNTRIES'),
+    'REGION': VocabSampler(vocab='REGIONS'),
+    'CITY': VocabSampler(vocab='CITIES'),
+    'DISTRICT': VocabSampler(vocab='DISTRICTS'),
+    'STREET': VocabSampler(vocab='STREETS'),
+    'LAST_NAME': {'masc': VocabSampler(vocab='LAST_NAMES_MALE'), 'femn': VocabSampler(vocab='LAST_NAMES_FEMALE')},
+    'FIRST_NAME': {'masc': VocabSampler(vocab='FIRST_NAMES_MALE'), 'femn': VocabSampler(vocab='FIRST_NAMES_FEMALE')},
+    'MIDDLE_NAME': {'masc': VocabSampler(vocab='MIDDLE_NAMES_MALE'), 'femn': VocabSampler(vocab='MIDDLE_NAMES_FEMALE')},
+}
 
 
 class RUNERAugmentor:
@@ -23,14 +46,69 @@ class RUNERAugmentor:
     print(aug.augment(s=['Москве'], tag='LOC'))\n
     >>> ([], [])
     """
-    def __init__(self, tagging_format: str = 'BIOLU') -> None:
+    def __init__(
+            self,
+            tagging_format: str = 'BIOLU',
+            morph: CachedMorphAnalyzer = None,
+            inflection_mode: str = 'morph',
+            inflection_table: InflectionTable = None,
+            seed: int = None,
+            rng: random.Random = None,
+            np_rng: np.random.Generator = None,
+            profiler: StageProfiler = None,
+            entity_bank: EntityBank = None,
+            dedup: Deduplicator = None,
+            templates: typing.Dict[str, TemplatePlan] = None,
+            coverage: CoverageTracker = None,
+    ) -> None:
         """ Create 'RUNERAugmentor' object class.
 
-        :param tagging_format: Tagging format for output DataFrame: 'BIOLU', 'BIO', 'single-token'
+        :param tagging_format: Tagging format for output DataFrame: 'BIOLU', 'BIO', 'single_token' (or 'single-token')
+        :param morph: Cached morphology analyzer (if None, then process-wide shared analyzer is used).
+        :param inflection_mode: Inflection source: 'morph' (pymorphy2) or 'table' (precomputed inflection tables,
+        see 'src.utils.inflection_table'; tables cover NOUN and ADJF forms of vocab tokens, other parts of speech and
+        unknown tokens are inflected by pymorphy2 fallback, so output is the same as in 'morph' mode).
+        :param inflection_table: Loaded inflection tables for 'table' mode (if None, then tables are loaded from
+        default directory).
+        :param seed: Seed for own random generators (if None, then seed from configs is used).
+        :param rng: Own random generator for single draws (if None, then it's created from seed).
+        :param np_rng: Own NumPy random generator for vectorized draws (if None, then it's created from seed).
+        :param profiler: Stage profiler for collecting time and calls per pipeline stage and entity type (if None, then
+        profiling is disabled).
+        :param entity_bank: Bank of pre-generated entities (if set, then entities are drawn from bank instead of
+        generation, see 'src.utils.entity_bank').
+        :param dedup: Uniqueness guard for generated entities or augmented sentences (if set, then duplicates are
+        re-drawn up to retry budget, see 'src.utils.dedup').
+        :param templates: Compiled layouts of generated entities by augmentation type (if None, then templates from
+        configs are used, see 'src.utils.templates').
+        :param coverage: Coverage counters which observe vocab draws (see 'src.utils.coverage').
+        :return:
+        """
+        seed = seed if seed is not None else CONFIGS['seed']
+        self.rng = rng if rng is not None else random.Random(seed)
+        self.np_rng = np_rng if np_rng is not None else np.random.default_rng(seed=seed)
+        self.morph = morph if morph is not None else get_shared_morph()
+        self.inflector = self.morph
+        if inflection_mode == 'table':
+            self.inflector = inflection_table if inflection_table is not None else InflectionTable(fallback=self.morph)
+        self.tagging_format = tagging_format.replace('-', '_')
+        if self.tagging_format not in TAGGING_FORMATS:
+            raise ValueError(f'Unknown tagging format: {tagging_format}. Possible formats: {TAGGING_FORMATS}')
+        self.profiler = profiler if profiler is not None else NULL_PROFILER
+        self.entity_bank = entity_bank
+        self.dedup = dedup
+        self.templates = templates if templates is not None else TEMPLATES
+        self.coverage = coverage
+        self._lock = threading.Lock()
+
+    def reseed(self, seed: int) -> None:
+        """ Reset own random generators with new seed.
+
+        :param seed: Seed value.
         :return:
         """
-        self.morph = pymorphy2.MorphAnalyzer(lang='ru')
-        self.tagging_format = tagging_format
+        self.rng.seed(seed)
+        self.np_rng = np.random.default_rng(seed=seed)
 
     def detect_case(self, s: str) -> typing.Tuple[str, str, str, str]:
         """ Detect input string (word) case (for pymorphy2 lib.) for correct transformation.
@@ -40,11 +118,12 @@ class RUNERAugmentor:
         """
         cases = {
             'pos': 'NOUN',
-            'case': random.choice(seq=['nomn', 'gent', 'datv', 'accs', 'ablt']),
-            'gender': random.choice(seq=['masc', 'femn']),
-            'number': random.choice(seq=['sing', 'plur']),
+            'case': self.rng.choice(seq=['nomn', 'gent', 'datv', 'accs', 'ablt']),
+            'gender': self.rng.choice(seq=['masc', 'femn']),
+            'number': self.rng.choice(seq=['sing', 'plur']),
         }
-        p = self.morph.parse(word=s)[0]
+        with self.profiler.stage('morph.parse'):
+            p = self.morph.parse(word=s)[0]
         tags = (
             p.tag.POS if p.tag.POS is not None else cases['pos'],
             p.tag.case if p.tag.case is not None else cases['case'],
@@ -54,17 +133,16 @@ class RUNERAugmentor:
         return tags
 
     @staticmethod
-    def replace_suffix(entity: str, label: str) -> str:
-        """ Apply replacing suffix to entity according to input label (replacing is random function).
+    def replace_suffix(entity: str, label: str, rng: random.Random = None) -> str:
+        """ Apply replacing suffix to entity according to input label (replacing is random function, see
+        'src.utils.matcher.SuffixReplacer').
 
         :param entity: Input entity (string).
         :param label: Input label (for replacement group).
+        :param rng: Random generator (if None, then global 'random' state is used).
         :return: Applied to entity random replacement from replacement map.
         """
-        for rplcmnt in REPLACEMENT_MAP[label]:
-            entity = entity.replace(rplcmnt[0], rplcmnt[1])
-            entity = random.choice(seq=[entity, entity.replace('.', '')])
-        return entity.strip()
+        return REPLACERS[label](s=entity, rng=rng)
 
     def inflect(self, s: str, tags: typing.Set[str], casing: bool = True) -> str:
         """ Do inflection for input string according right form in text.
@@ -78,16 +156,12 @@ class RUNERAugmentor:
         tags = {tag for tag in tags if tag is not None}
         inflected_s = list()
         s = ' '.join(list(filter(None, s.split(' '))))
-        for token in s.split(' '):
-            try:
-                inflected_s += [self.morph.parse(word=token)[0].inflect(required_grammemes=tags).word]
-            except AttributeError:
-                inflected_s += [token]
+        with self.profiler.stage('morph.inflect'):
+            for token in s.split(' '):
+                inflected = self.inflector.inflect(word=token, grammemes=tags)
+                inflected_s += [inflected if inflected is not None else token]
         if casing:
-            if 'улица' in inflected_s:
-                inflected_s = [f'{w[0].upper()}{w[1:]}' if w.lower != 'улица' else w for w in inflected_s]
-            else:
-                inflected_s = [f'{w[0].upper()}{w[1:]}' if w not in ANCHORS else w for w in inflected_s]
+            inflected_s = [f'{w[0].upper()}{w[1:]}' if w not in ANCHORS else w for w in inflected_s]
         return ' '.join(inflected_s)
 
     @staticmethod
@@ -96,44 +170,131 @@ class RUNERAugmentor:
 
         :param s: Input string.
         :param t: Original tags.
-        :return: Tokens and NER-tags.
+        :return: Tokens and NER-tags (BIOLU sub-tags, for example, 'U-COUNTRY').
+        """
+        tokens, ids = RUNERAugmentor.tagging_ids(s=s, t=t)
+        return tokens, TAG_VOCAB.decode(ids=ids, tag_map=False)
+
+    @staticmethod
+    def tagging_ids(s: list, t: list) -> typing.Tuple[list, np.ndarray]:
+        """ NER-Tagging for input string with tags as ids of tag vocab (see 'src.utils.tag_vocab').
+
+        :param s: Input string.
+        :param t: Original tags.
+        :return: Tokens and ids of BIOLU sub-tags.
         """
-        tokens, tags = list(), list()
+        tokens, ids = list(), list()
         for p in zip(s, t):
-            cnt = 0
             tokens_tmp = p[0].split(' ')
-            for i in range(len(tokens_tmp)):
-                tokens += [tokens_tmp[i]]
-                if p[1] == 'O':
-                    tags += ['O']
+            tokens += tokens_tmp
+            if p[1] == 'O':
+                ids += [0] * len(tokens_tmp)
+                continue
+            b, i, l, u = TAG_VOCAB.prefix_ids(label=p[1])
+            is_anchor = [token.lower() in ANCHOR_SETS[p[1]] for token in tokens_tmp] + [False]
+            cnt = 0
+            for k in range(len(tokens_tmp)):
+                if is_anchor[k]:
+                    ids += [0]
+                    cnt = 0
+                elif len(tokens_tmp) < 2:
+                    ids += [u]
+                    cnt += 1
+                elif k < len(tokens_tmp) - 1 and not is_anchor[k + 1]:
+                    ids += [b if cnt == 0 else i]
+                    cnt += 1
                 else:
-                    if tokens_tmp[i].lower() in NOT_NER_TAG[p[1]]:
-                        tags += ['O']
-                        cnt = 0
-                    else:
-                        if len(tokens_tmp) < 2:
-                            tags += [f'U-{p[1]}']
-                            cnt += 1
-                        else:
-                            if i < len(tokens_tmp) - 1:
-                                if tokens_tmp[i + 1].lower() in NOT_NER_TAG[p[1]]:
-                                    if cnt == 0:
-                                        tags += [f'U-{p[1]}']
-                                    else:
-                                        tags += [f'L-{p[1]}']
-                                    cnt = 0
-                                else:
-                                    if cnt == 0:
-                                        tags += [f'B-{p[1]}']
-                                    else:
-                                        tags += [f'I-{p[1]}']
-                                    cnt += 1
-                            else:
-                                if cnt == 0:
-                                    tags += [f'U-{p[1]}']
-                                else:
-                                    tags += [f'L-{p[1]}']
-        return tokens, tags
+                    ids += [u if cnt == 0 else l]
+                    cnt = 0
+        return tokens, np.array(ids, dtype=np.int32)
+
+    def _sample(self, label: str, gender: str = None) -> str:
+        """ Draw random entry from vocab of sub-tag.
+
+        :param label: Sub-tag (key of 'SAMPLERS').
+        :param gender: Gender for names vocabs ('masc' or 'femn').
+        :return: Vocab entry.
+        """
+        with self.profiler.stage('sample'):
+            sampler = SAMPLERS[label] if gender is None else SAMPLERS[label][gender]
+            value = sampler.sample(rng=self.rng)
+        if self.coverage is not None:
+            self.coverage.observe_vocab(vocab=sampler.vocab, entry=value)
+        return value
+
+    def _draw_region(self, cc: int) -> str:
+        """ Draw random region from vocab.
+
+        :param cc: Abbreviation mode (2 - apply replacing suffix).
+        :return: Region.
+        """
+        region = self._sample(label='REGION')
+        if cc == 2:
+            region = self.replace_suffix(entity=region, label='REGION', rng=self.rng)
+        return region
+
+    def _draw_district(self, cc: int) -> str:
+        """ Draw random district from vocab.
+
+        :param cc: Abbreviation mode (2 - apply replacing suffix).
+        :return: District.
+        """
+        district = self._sample(label='DISTRICT')
+        if cc == 2:
+            district = self.replace_suffix(entity=district, label='DISTRICT', rng=self.rng)
+        return district
+
+    def _draw_street(self, cc: int) -> str:
+        """ Draw random street from vocab.
+
+        :param cc: Abbreviation mode (1 - cut street anchors, 2 - apply replacing suffix).
+        :return: Street.
+        """
+        street = self._sample(label='STREET')
+        if cc == 1:
+            street = strip_anchors(s=street, label='STREET')
+        if cc == 2:
+            street = self.replace_suffix(entity=street, label='STREET', rng=self.rng)
+        return street
+
+    # Drawers of template slots (augmentor, abbreviation mode and gender):
+    SLOT_DRAWERS = {
+        'LAST_NAME': lambda self, cc, gender: self._sample(label='LAST_NAME', gender=gender),
+        'FIRST_NAME': lambda self, cc, gender: self._sample(label='FIRST_NAME', gender=gender),
+        'MIDDLE_NAME': lambda self, cc, gender: self._sample(label='MIDDLE_NAME', gender=gender),
+        'COUNTRY': lambda self, cc, gender: self._sample(label='COUNTRY'),
+        'COUNTRY_RU': lambda self, cc, gender: self.rng.choice(seq=['Россия', 'РФ', 'Российская Федерация']),
+        'REGION': lambda self, cc, gender: self._draw_region(cc=cc),
+        'DISTRICT': lambda self, cc, gender: self._draw_district(cc=cc),
+        'CITY': lambda self, cc, gender: self._sample(label='CITY'),
+        'STREET': lambda self, cc, gender: self._draw_street(cc=cc),
+        'HOUSE': lambda self, cc, gender: self._draw_house(),
+        'POSTCODE': lambda self, cc, gender: self._draw_postcode(),
+    }
+
+    def _draw_postcode(self) -> str:
+        """ Draw random postcode.
+
+        :return: Postcode.
+        """
+        return '{0:04}'.format(self.rng.randint(a=0, b=999999))
+
+    def _draw_house(self) -> str:
+        """ Draw random house number with optional prefix and extra number (office, flat), for example: 'д25 кв 61'.
+
+        :return: House.
+        """
+        prefix_house = self.rng.choice(seq=['д', 'д.', 'д,', 'Д', 'Д.', 'Д,', 'дом', 'дом,', 'Дом', 'Дом,', 'стр',
+                                            'стр.', 'стр.', 'строение', ''])
+        num_house_1 = self.rng.randint(a=1, b=999)
+        num_house_2 = self.rng.randint(a=1, b=99)
+        num_house = self.rng.choice(seq=[
+            num_house_1,
+            f'{num_house_1}/{num_house_2}'
+        ])
+        extra_num_house = f'{self.rng.choice(seq=["офис", "оф.", "о.", "кв.", "квартира"])} ' \
+                          f'{self.rng.randint(a=1, b=999)}'
+        return f'{prefix_house} {num_house} {self.rng.choice(seq=["", extra_num_house])}'.strip()
 
     def generate_augmentation(
             self,
@@ -144,137 +305,81 @@ class RUNERAugmentor:
 
         :param entity: Augmentation type.
         :param inflecting_tags: inflecting tags/cases for transforming string according to rule of the input string. (was got after 'pymorphy2' parsing).
-        :return: Generated and inflected tokens and tags.
+        :return: Generated and inflected tokens and tags (BIOLU sub-tags).
         """
-        if entity == 'full_name':
-            if inflecting_tags[2] == 'masc':
-                ln = random.choice(seq=LAST_NAMES_MALE.keys())
-                fn = random.choice(seq=FIRST_NAMES_MALE.keys())
-                md = random.choice(seq=MIDDLE_NAMES_MALE.keys())
-            if inflecting_tags[2] == 'femn':
-                ln = random.choice(seq=LAST_NAMES_FEMALE.keys())
-                fn = random.choice(seq=FIRST_NAMES_FEMALE.keys())
-                md = random.choice(seq=MIDDLE_NAMES_FEMALE.keys())
-            c = random.randint(a=0, b=6)
-            if c == 0:
-                value = [
-                    (self.inflect(s=ln, tags=set(inflecting_tags), casing=True), 'LAST_NAME'),
-                    (self.inflect(s=fn, tags=set(inflecting_tags), casing=True), 'FIRST_NAME'),
-                    (self.inflect(s=md, tags=set(inflecting_tags), casing=True), 'MIDDLE_NAME'),
-                ]
-            if c == 1:
-                value = [
-                    (self.inflect(s=ln, tags=set(inflecting_tags), casing=True), 'LAST_NAME'),
-                    (self.inflect(s=fn, tags=set(inflecting_tags), casing=True), 'FIRST_NAME'),
-                ]
-            if c == 2:
-                value = [
-                    (self.inflect(s=fn, tags=set(inflecting_tags), casing=True), 'FIRST_NAME'),
-                    (self.inflect(s=md, tags=set(inflecting_tags), casing=True), 'MIDDLE_NAME'),
-                ]
-            if c == 3:
-                value = [
-                    (self.inflect(s=ln, tags=set(inflecting_tags), casing=True), 'LAST_NAME'),
-                    (self.inflect(s=md, tags=set(inflecting_tags), casing=True), 'MIDDLE_NAME'),
-                ]
-            if c == 4:
-                value = [(self.inflect(s=ln, tags=set(inflecting_tags), casing=True), 'LAST_NAME')]
-            if c == 5:
-                value = [(self.inflect(s=fn, tags=set(inflecting_tags), casing=True), 'FIRST_NAME')]
-            if c == 6:
-                value = [(self.inflect(s=md, tags=set(inflecting_tags), casing=True), 'MIDDLE_NAME')]
-            random.shuffle(x=value)
-        if entity in ['country', 'region', 'city', 'street', 'district', 'address']:
-            # General:
-            country = random.choice(seq=COUNTRIES.keys())
-            region = random.choice(seq=REGIONS.keys())
-            city = random.choice(seq=CITIES.keys())
-            district = random.choice(seq=DISTRICTS.keys())
-            street = random.choice(seq=STREETS.keys())
-            # Additional:
-            postcode = '{0:04}'.format(random.randint(a=0, b=999999))
-            prefix_house = ''.join([
-                random.choice(seq=['д', 'д.', 'д,', 'Д', 'Д.', 'Д,', 'дом', 'дом,', 'Дом', 'Дом,', 'стр', 'стр.',
-                                   'стр.', 'строение', ''])
-            ])
-            # д25 кв 61
-            num_house_1 = random.randint(a=1, b=999)
-            num_house_2 = random.randint(a=1, b=99)
-            num_house = random.choice(seq=[
-                num_house_1,
-                f'{num_house_1}/{num_house_2}'
-            ])
-            extra_num_house = f'{random.choice(seq=["офис", "оф.", "о.", "кв.", "квартира"])} {random.randint(a=1, b=999)}'
-            house = f'{prefix_house} {num_house} {random.choice(seq=["", extra_num_house])}'.strip()
-            cc = random.choice(seq=[0, 1, 2])
-            if cc == 1:
-                for anchor in NOT_NER_TAG['STREET']:
-                    street = street.replace(anchor, '')
-                street = street.strip()
-            if cc == 2:
-                region = self.replace_suffix(entity=region, label='REGION')
-                district = self.replace_suffix(entity=district, label='DISTRICT')
-                street = self.replace_suffix(entity=street, label='STREET')
-            if entity == 'country':
-                value = [(self.inflect(s=country, tags=set(inflecting_tags), casing=True), 'COUNTRY')]
-            if entity == 'region':
-                value = [(self.inflect(s=region, tags=set(inflecting_tags), casing=True), 'REGION')]
-            if entity == 'city':
-                value = [(self.inflect(s=city, tags=set(inflecting_tags), casing=True), 'CITY')]
-            if entity == 'district':
-                value = [(self.inflect(s=district, tags=set(inflecting_tags), casing=True), 'DISTRICT')]
-            if entity == 'street':
-                c = random.randint(a=0, b=1)
-                if c == 0:
-                    value = [(self.inflect(s=street, tags=set(inflecting_tags), casing=True), 'STREET')]
-                if c == 1:
-                    value = [
-                        (self.inflect(s=street, tags=set(inflecting_tags), casing=True), 'STREET'),
-                        (self.inflect(s=house, tags=set(inflecting_tags), casing=True), 'HOUSE'),
-                    ]
-            if entity == 'address':
-                c = random.randint(a=0, b=4)
-                if c == 0:
-                    value = [
-                        (postcode, 'O'),
-                        (random.choice(seq=['Россия', 'РФ', 'Российская Федерация']), 'COUNTRY'),
-                        (region, 'REGION'),
-                        (district, 'DISTRICT'),
-                        (city, 'CITY'),
-                        (street, 'STREET'),
-                        (house, 'HOUSE'),
-                    ]
-                if c == 1:
-                    value = [
-                        (street, 'STREET'),
-                        (house, 'HOUSE'),
-                        (city, 'CITY'),
-                        (postcode, 'O'),
-                    ]
-                if c == 2:
-                    value = [
-                        (street, 'STREET'),
-                        (house, 'HOUSE'),
-                        (city, 'CITY'),
-                    ]
-                if c == 3:
-                    value = [
-                        (street, 'STREET'),
-                        (house, 'HOUSE'),
-                        (city, 'CITY'),
-                        (region, 'REGION'),
-                        (postcode, 'O'),
-                    ]
-                if c == 4:
-                    value = [
-                        (street, 'STREET'),
-                        (house, 'HOUSE'),
-                        (city, 'CITY'),
-                        (district, 'DISTRICT'),
-                        (region, 'REGION'),
-                        (postcode, 'O'),
-                    ]
-        return self.tagging(s=[p[0] for p in value], t=[p[1] for p in value])
+        tokens, ids = self.generate_augmentation_ids(entity=entity, inflecting_tags=inflecting_tags)
+        return tokens, TAG_VOCAB.decode(ids=ids, tag_map=False)
+
+    def generate_augmentation_ids(
+            self,
+            entity: str,
+            inflecting_tags: typing.Tuple[str, str, str, str]
+    ) -> typing.Tuple[list, np.ndarray]:
+        """ Generate new augmentation (see 'generate_augmentation') with tags as ids of tag vocab.
+
+        :param entity: Augmentation type.
+        :param inflecting_tags: inflecting tags/cases for transforming string.
+        :return: Generated and inflected tokens and ids of BIOLU sub-tags.
+        """
+        self.profiler.count_entity(entity=entity)
+        for attempt in itertools.count():
+            tokens, ids = self._generate_ids(entity=entity, inflecting_tags=inflecting_tags)
+            if self.dedup is None or self.dedup.level != 'entity' or self.dedup.check(tokens=tokens, attempt=attempt):
+                return tokens, ids
+
+    def _generate_ids(self, entity: str, inflecting_tags: typing.Tuple[str, str, str, str]) -> \
+            typing.Tuple[list, np.ndarray]:
+        """ Generate new entity (or draw it from entity bank).
+
+        :param entity: Augmentation type.
+        :param inflecting_tags: inflecting tags/cases for transforming string.
+        :return: Generated and inflected tokens and ids of BIOLU sub-tags.
+        """
+        if self.entity_bank is not None:
+            with self.profiler.stage('entity_bank'):
+                return self.entity_bank.draw(entity=entity, inflecting_tags=inflecting_tags, rng=self.rng)
+        with self.profiler.stage(f'generate.{entity}'):
+            value = self._generate_value(entity=entity, inflecting_tags=inflecting_tags)
+            with self.profiler.stage('tagging'):
+                return self.tagging_ids(s=[p[0] for p in value], t=[p[1] for p in value])
+
+    def _generate_value(self, entity: str, inflecting_tags: typing.Tuple[str, str, str, str]) -> typing.List[tuple]:
+        """ Generate strings of new entity with their sub-tags by template (see 'src.utils.templates').
+
+        :param entity: Augmentation type.
+        :param inflecting_tags: inflecting tags/cases for transforming string.
+        :return: Pairs (string, sub-tag).
+        """
+        plan = self.templates[entity]
+        cc = self.rng.choice(seq=[0, 1, 2]) if plan.abbreviation == 'entity' else 0
+        c = plan.choose(rng=self.rng)
+        value = list()
+        # Draw only slots which are used by chosen layout:
+        for slot, label in zip(plan.layouts[c], plan.labels[c]):
+            if plan.abbreviation == 'slot' and slot in ABBREVIATED_SLOTS:
+                cc = self.rng.choice(seq=[0, 1, 2])
+            s = self.SLOT_DRAWERS[slot](self, cc, inflecting_tags[2])
+            if plan.inflect:
+                s = self.inflect(s=s, tags=set(inflecting_tags), casing=True)
+            value += [(s, label)]
+        if plan.shuffle:
+            self.rng.shuffle(x=value)
+        return value
+
+    def generate_augmentation_batch(
+            self,
+            entity: str,
+            inflecting_tags: typing.Tuple[str, str, str, str],
+            n: int,
+    ) -> typing.List[typing.Tuple[list, np.ndarray]]:
+        """ Generate batch of new entities of the same type and form (see 'generate_augmentation_ids').
+
+        :param entity: Augmentation type.
+        :param inflecting_tags: inflecting tags/cases for transforming string.
+        :param n: Number of entities.
+        :return: Generated and inflected tokens and ids of BIOLU sub-tags.
+        """
+        return [self.generate_augmentation_ids(entity=entity, inflecting_tags=inflecting_tags) for _ in range(n)]
 
     @staticmethod
     def biolu2bio(tags: list) -> list:
@@ -289,9 +394,7 @@ class RUNERAugmentor:
         :param tags: NER-tags for text tokens.
         :return: Relabeled NER-tokens.
         """
-        return [f'B-{tag.split("-")[-1]}' if tag.split('-')[0] == 'U' else
-                f'I-{tag.split("-")[-1]}' if tag.split('-')[0] == 'L' else
-                tag for tag in tags]
+        return TAG_VOCAB.decode(ids=TAG_VOCAB.encode(tags=tags), tagging_format='BIO', tag_map=False)
 
     @staticmethod
     def biolu2single_token(tags: list) -> list:
@@ -302,7 +405,24 @@ class RUNERAugmentor:
             :param tags: NER-tags for text tokens.
             :return: Relabeled NER-tokens.
             """
-        return [tag.split('-')[-1] for tag in tags]
+        return TAG_VOCAB.decode(ids=TAG_VOCAB.encode(tags=tags), tagging_format='single_token', tag_map=False)
+
+    def format_tags(self, tags: list) -> list:
+        """ Relabel BIOLU-tags to object's tagging format and map sub-tags to output NER-tags.
+
+        :param tags: NER-tags in BIOLU format.
+        :return: Relabeled NER-tags.
+        """
+        return self.format_tag_ids(ids=TAG_VOCAB.encode(tags=tags))
+
+    def format_tag_ids(self, ids: np.ndarray) -> list:
+        """ Relabel ids of BIOLU sub-tags to object's tagging format and convert them to output NER-tags.
+
+        :param ids: Ids of BIOLU sub-tags.
+        :return: Relabeled NER-tags.
+        """
+        with self.profiler.stage('format_tags'):
+            return TAG_VOCAB.decode(ids=ids, tagging_format=self.tagging_format)
 
     def augment(self, s: str, tag: str) -> typing.Tuple[list, list]:
         """ Generate string based on old string rules and NER-tag.\n
@@ -320,16 +440,163 @@ class RUNERAugmentor:
         if tag == INPUT_TAG_MAP['PERSON']:
             tag = 'full_name'
         if tag == INPUT_TAG_MAP['LOCATION']:
-            tag = random.choice(seq=['address', 'country', 'region', 'city', 'district', 'street'])
+            tag = self.rng.choice(seq=LOC_ENTITIES)
         # Define tags and cases for input word/collocation which needs to be replaced:
         inflecting_tags = self.detect_case(s=s)
         # Generate new word/collocation:
-        tokens, tags = self.generate_augmentation(entity=tag, inflecting_tags=inflecting_tags)
-        # Change tagging:
-        if self.tagging_format == 'BIO':
-            tags = self.biolu2bio(tags=tags)
-        if self.tagging_format == 'single_token':
-            tags = self.biolu2single_token(tags=tags)
-        # Last formatting:
-        tags = ['O' if tag == 'O' else f'{tag.split("-")[0]}-{TAG_MAP[tag.split("-")[-1]]}' for tag in tags]
-        return tokens, tags
+        tokens, ids = self.generate_augmentation_ids(entity=tag, inflecting_tags=inflecting_tags)
+        return tokens, self.format_tag_ids(ids=ids)
+
+    def _augment_locked(self, s: str, tag: str) -> typing.Tuple[list, list]:
+        with self._lock:
+            return self.augment(s=s, tag=tag)
+
+    async def augment_async(
+            self,
+            s: str,
+            tag: str,
+            executor: concurrent.futures.Executor = None,
+    ) -> typing.Tuple[list, list]:
+        """ Asynchronous 'augment': augmentation runs in executor (calls of one augmentor are serialized, because its
+        random generators are shared), so event loop isn't blocked.
+
+        :param s: Input string.
+        :param tag: Input NER-tag.
+        :param executor: Executor (if None, then default executor of event loop is used).
+        :return: Return split into tokens generated new string and tokens.
+        """
+        return await asyncio.get_running_loop().run_in_executor(executor, self._augment_locked, s, tag)
+
+    @staticmethod
+    def group_spans(tags: list) -> typing.List[typing.Tuple[int, int, str]]:
+        """ Group contiguous tokens of PER and LOC entities into spans (input tags can be in BIO or BIOLU format).\n
+        Example:\n
+        * ['B-PER', 'I-PER', 'O', 'B-LOC', 'B-LOC'] --> [(0, 2, 'PER'), (3, 4, 'LOC'), (4, 5, 'LOC')]
+
+        :param tags: NER-tags for text tokens.
+        :return: Spans (start token index, end token index, NER-tag).
+        """
+        spans, prev_prefix = list(), None
+        for i, tag in enumerate(tags):
+            prefix, label = tag.split('-')[0] if '-' in tag else '', tag.split('-')[-1]
+            if label in INPUT_TAG_MAP.values():
+                if spans and spans[-1][1] == i and spans[-1][2] == label and prefix in ['I', 'L', ''] and \
+                        prev_prefix not in ['L', 'U']:
+                    spans[-1][1] = i + 1
+                else:
+                    spans += [[i, i + 1, label]]
+            prev_prefix = prefix
+        return [(span[0], span[1], span[2]) for span in spans]
+
+    def _span_head(self, tokens: list) -> str:
+        """ Choose token of entity span for case detection: the first noun (or the first token if there is no nouns).
+
+        :param tokens: Span tokens.
+        :return: Head token.
+        """
+        for token in tokens:
+            if self.morph.parse(word=token)[0].tag.POS == 'NOUN':
+                return token
+        return tokens[0]
+
+    def augment_corpus(
+            self,
+            tokens_list: typing.List[list],
+            tags_list: typing.List[list],
+            n_variants: int = 1,
+            return_ids: bool = False,
+    ) -> typing.Tuple[list, list]:
+        """ Augment whole sentences. Every contiguous PER or LOC span is replaced by generated entity, other tokens are
+        kept and tagged as 'O'. Cases are detected once per span and shared by all variants, entity types for all
+        spans of all variants are drawn in one call (with sentence-level dedup re-drawn variants choose entity types one
+        by one).
+
+        :param tokens_list: Sentences tokens.
+        :param tags_list: Sentences NER-tags (BIO or BIOLU format).
+        :param n_variants: Number of augmented variants per sentence.
+        :param return_ids: Return NER-tags as arrays of ids of object's tagging format (see 'TAG_VOCAB.names') instead
+        of strings.
+        :return: Augmented tokens and NER-tags (variants of each sentence follow in input order).
+        """
+        if n_variants < 1:
+            raise ValueError('n_variants must be >= 1')
+        spans_list = [self.group_spans(tags=tags) for tags in tags_list]
+        # Define tags and cases for every span:
+        cases_list = [
+            [self.detect_case(s=self._span_head(tokens=tokens[span[0]:span[1]])) for span in spans]
+            for tokens, spans in zip(tokens_list, spans_list)
+        ]
+        # Chose what type it needs to generate for all location spans at once:
+        n_loc = n_variants * sum(span[2] == INPUT_TAG_MAP['LOCATION'] for spans in spans_list for span in spans)
+        loc_entities = iter(self.np_rng.choice(a=LOC_ENTITIES, size=n_loc).tolist())
+        augmented_tokens, augmented_tags = list(), list()
+        for tokens, spans, cases in zip(tokens_list, spans_list, cases_list):
+            for _ in range(n_variants):
+                entities = ['full_name' if span[2] == INPUT_TAG_MAP['PERSON'] else next(loc_entities) for span in spans]
+                for attempt in itertools.count():
+                    tokens_tmp, ids_tmp = self._augment_variant(tokens=tokens, spans=spans, cases=cases,
+                                                                entities=entities)
+                    if self.dedup is None or self.dedup.level != 'sentence' or not spans or \
+                            self.dedup.check(tokens=tokens_tmp, attempt=attempt):
+                        break
+                    entities = ['full_name' if span[2] == INPUT_TAG_MAP['PERSON'] else
+                                self.rng.choice(seq=LOC_ENTITIES) for span in spans]
+                augmented_tokens += [tokens_tmp]
+                if return_ids:
+                    augmented_tags += [TAG_VOCAB.convert(ids=ids_tmp, tagging_format=self.tagging_format)]
+                else:
+                    augmented_tags += [self.format_tag_ids(ids=ids_tmp)]
+        return augmented_tokens, augmented_tags
+
+    def augment_batch(
+            self,
+            tokens_list: typing.List[list],
+            tags_list: typing.List[list],
+            n_variants: int = 1,
+            transformation: bool = False,
+            token_table: StringTable = None,
+    ) -> SampleBatch:
+        """ Augment whole sentences (see 'augment_corpus') into compact batch with interned tokens and NER-tags (see
+        'src.utils.sample_batch').
+
+        :param tokens_list: Sentences tokens.
+        :param tags_list: Sentences NER-tags (BIO or BIOLU format).
+        :param n_variants: Number of augmented variants per sentence.
+        :param transformation: Apply random transformation (see 'transform') to every augmented sentence.
+        :param token_table: Table of tokens shared by batches (if None, then new table is created).
+        :return: Batch of augmented sentences (variants of each sentence follow in input order).
+        """
+        tokens, ids = self.augment_corpus(tokens_list=tokens_list, tags_list=tags_list, n_variants=n_variants,
+                                          return_ids=True)
+        if transformation:
+            with self.profiler.stage('transform'):
+                tokens = transform_batch(tokens_list=tokens, rng=self.np_rng)
+        return SampleBatch.from_ids(tokens_list=tokens, ids_list=ids, tag_table=TAG_TABLES[self.tagging_format],
+                                    token_table=token_table)
+
+    def _augment_variant(
+            self,
+            tokens: list,
+            spans: typing.List[typing.Tuple[int, int, str]],
+            cases: typing.List[typing.Tuple[str, str, str, str]],
+            entities: typing.List[str],
+    ) -> typing.Tuple[list, np.ndarray]:
+        """ Replace spans of sentence by generated entities.
+
+        :param tokens: Sentence tokens.
+        :param spans: PER and LOC spans (see 'group_spans').
+        :param cases: Inflecting tags of spans.
+        :param entities: Entity types of spans.
+        :return: Augmented tokens and ids of BIOLU sub-tags.
+        """
+        tokens_tmp, ids_tmp, prev = list(), list(), 0
+        for span, inflecting_tags, entity in zip(spans, cases, entities):
+            tokens_tmp += tokens[prev:span[0]]
+            ids_tmp += [np.zeros(span[0] - prev, dtype=np.int32)]
+            tokens_span, ids_span = self.generate_augmentation_ids(entity=entity, inflecting_tags=inflecting_tags)
+            tokens_tmp += tokens_span
+            ids_tmp += [ids_span]
+            prev = span[1]
+        tokens_tmp += tokens[prev:]
+        ids_tmp += [np.zeros(len(tokens) - prev, dtype=np.int32)]
+        return tokens_tmp, np.concatenate(ids_tmp)
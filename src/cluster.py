@@ -0,0 +1,253 @@
+import os, json, typing, hashlib, pathlib, argparse
+
+from src import CONFIGS, __version__
+from src.pipeline import augment_stream, save_checkpoint, file_sha256
+from src.utils.corpus_io import FORMATS, detect_format, read_corpus
+from src.utils.parallel import derive_seed
+
+
+def manifest_sha256(manifest: dict) -> str:
+    """ Compute checksum of manifest (it's saved with outputs of shards, so outputs of other plans are detected).
+
+    :param manifest: Manifest (see 'plan_shards').
+    :return: Hex digest.
+    """
+    return hashlib.sha256(json.dumps(manifest, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def parse_shard(shard: str) -> typing.Tuple[int, int]:
+    """ Parse shard argument.
+
+    :param shard: Shard as 'i/N' (shards are numbered from 0).
+    :return: Shard index and number of shards.
+    """
+    try:
+        index, n_shards = [int(v) for v in shard.split('/')]
+    except ValueError:
+        raise ValueError(f'Shard must be in format i/N, got: {shard}')
+    if not 0 <= index < n_shards:
+        raise ValueError(f'Shard index must be in range [0, {n_shards}), got: {index}')
+    return index, n_shards
+
+
+def plan_shards(
+        input_path: typing.Union[str, pathlib.Path],
+        n_shards: int,
+        chunk_size: int = 1000,
+        n_variants: int = 1,
+        seed: int = CONFIGS['seed'],
+        transformation: bool = True,
+        tagging_format: str = 'BIOLU',
+        inflection_mode: str = 'morph',
+        input_format: str = None,
+        output_format: str = None,
+) -> dict:
+    """ Split corpus into shards for multi-node run. Shards are contiguous ranges of pipeline chunks (see
+    'augment_stream'), every chunk is augmented with seed derived from master seed and chunk index, so merged output of
+    shards is byte-identical to single-node run with the same settings.
+
+    :param input_path: Path to input corpus (csv, jsonl or conll).
+    :param n_shards: Number of shards (nodes).
+    :param chunk_size: Number of input samples per chunk.
+    :param n_variants: Number of augmented variants per sample.
+    :param seed: Master seed.
+    :param transformation: Apply random transformation (see 'transform') to every augmented sample.
+    :param tagging_format: Tagging format (see 'RUNERAugmentor').
+    :param inflection_mode: Inflection source (see 'RUNERAugmentor').
+    :param input_format: Input corpus format (if None, then it's detected by file extension).
+    :param output_format: Output corpus format (if None, then it's the same as input format).
+    :return: Manifest: input checksum, settings and shards (chunk and row ranges and chunk seeds).
+    """
+    input_format = input_format if input_format is not None else detect_format(path=input_path)
+    n_rows = sum(1 for _ in read_corpus(path=input_path, corpus_format=input_format))
+    n_chunks = -(-n_rows // chunk_size)
+    shards = list()
+    for i in range(n_shards):
+        first, last = i * n_chunks // n_shards, (i + 1) * n_chunks // n_shards
+        shards += [{
+            'index': i,
+            'chunks': [first, last],
+            'rows': [min(first * chunk_size, n_rows), min(last * chunk_size, n_rows)],
+            'seeds': [derive_seed(seed=seed, index=k) for k in range(first, last)],
+        }]
+    return {
+        'version': __version__,
+        'input': str(pathlib.Path(input_path).resolve()),
+        'input_sha256': file_sha256(path=input_path),
+        'input_format': input_format,
+        'output_format': output_format if output_format is not None else input_format,
+        'rows': n_rows,
+        'chunk_size': chunk_size,
+        'n_variants': n_variants,
+        'seed': seed,
+        'transformation': transformation,
+        'tagging_format': tagging_format,
+        'inflection_mode': inflection_mode,
+        'shards': shards,
+    }
+
+
+def shard_path(manifest: dict, output_dir: typing.Union[str, pathlib.Path], index: int) -> pathlib.Path:
+    """ Get path to output of shard.
+
+    :param manifest: Manifest (see 'plan_shards').
+    :param output_dir: Directory of shards outputs.
+    :param index: Shard index.
+    :return: Path to output file (its record with checksum has the same name with '.done.json' suffix).
+    """
+    return pathlib.Path(output_dir)/f'shard-{index:05d}-of-{len(manifest["shards"]):05d}.{manifest["output_format"]}'
+
+
+def run_shard(
+        manifest: dict,
+        index: int,
+        output_dir: typing.Union[str, pathlib.Path],
+        n_workers: int = 1,
+        verify_input: bool = True,
+) -> dict:
+    """ Augment one shard (resumable, see 'augment_stream') and write record with its checksum.
+
+    :param manifest: Manifest (see 'plan_shards').
+    :param index: Shard index.
+    :param output_dir: Directory of shards outputs.
+    :param n_workers: Number of processes (if None, then number of CPUs).
+    :param verify_input: Check that input corpus is the same as planned.
+    :return: Record of shard: index, output rows, output size, checksum and manifest checksum.
+    """
+    if verify_input and file_sha256(path=manifest['input']) != manifest['input_sha256']:
+        raise ValueError(f'Input corpus {manifest["input"]} was changed after planning')
+    shard = manifest['shards'][index]
+    first, last = shard['chunks']
+    # Seeds differ if seed derivation of this node differs from planning node:
+    if shard['seeds'] != [derive_seed(seed=manifest['seed'], index=k) for k in range(first, last)]:
+        raise ValueError(f'Chunk seeds of shard {index} differ from planned ones')
+    digest = manifest_sha256(manifest=manifest)
+    path = shard_path(manifest=manifest, output_dir=output_dir, index=index)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    checkpoint = augment_stream(
+        input_path=manifest['input'],
+        output_path=path,
+        chunk_size=manifest['chunk_size'],
+        n_variants=manifest['n_variants'],
+        seed=manifest['seed'],
+        n_workers=n_workers,
+        transformation=manifest['transformation'],
+        checkpoint_path=f'{path}.checkpoint.json',
+        tagging_format=manifest['tagging_format'],
+        inflection_mode=manifest['inflection_mode'],
+        input_format=manifest['input_format'],
+        output_format=manifest['output_format'],
+        chunks=(first, last),
+        # Csv header is written once: by shard of the first chunk (or by the last shard if corpus is empty):
+        header=first == 0 and (last > 0 or index == len(manifest['shards']) - 1),
+        settings={'manifest_sha256': digest},
+    )
+    if path.stat().st_size != checkpoint['output_bytes'] or checkpoint['rows'] != shard['rows'][1] - shard['rows'][0]:
+        raise RuntimeError(f'Shard {index} is incomplete: {checkpoint}')
+    record = {
+        'index': index,
+        'rows': checkpoint['rows'] * manifest['n_variants'],
+        'bytes': checkpoint['output_bytes'],
+        'sha256': file_sha256(path=path),
+        'manifest_sha256': digest,
+    }
+    save_checkpoint(path=f'{path}.done.json', checkpoint=record)
+    return record
+
+
+def merge_shards(
+        manifest: dict,
+        output_dir: typing.Union[str, pathlib.Path],
+        output_path: typing.Union[str, pathlib.Path],
+) -> dict:
+    """ Check that all shards are complete, unchanged and made for this manifest and concatenate their outputs in shard
+    order.
+
+    :param manifest: Manifest (see 'plan_shards').
+    :param output_dir: Directory of shards outputs.
+    :param output_path: Path to merged corpus.
+    :return: Merged output rows, size and checksum.
+    """
+    digest, records = manifest_sha256(manifest=manifest), list()
+    for i in range(len(manifest['shards'])):
+        path = shard_path(manifest=manifest, output_dir=output_dir, index=i)
+        done = pathlib.Path(f'{path}.done.json')
+        if not done.exists():
+            raise RuntimeError(f'Shard {i} is missing or unfinished: {path}')
+        with done.open('r') as f:
+            record = json.load(f)
+        if record.get('manifest_sha256') != digest:
+            raise RuntimeError(f'Shard {i} was made for another manifest: {path}')
+        if path.stat().st_size != record['bytes'] or file_sha256(path=path) != record['sha256']:
+            raise RuntimeError(f'Checksum mismatch of shard {i}: {path}')
+        records += [record]
+    n_rows = sum(record['rows'] for record in records)
+    if n_rows != manifest['rows'] * manifest['n_variants']:
+        raise RuntimeError(f'Shards have {n_rows} rows, expected {manifest["rows"] * manifest["n_variants"]}')
+    tmp_path = f'{output_path}.tmp'
+    with open(tmp_path, 'wb') as writer:
+        for i in range(len(records)):
+            with shard_path(manifest=manifest, output_dir=output_dir, index=i).open('rb') as reader:
+                for block in iter(lambda: reader.read(1 << 20), b''):
+                    writer.write(block)
+    os.replace(tmp_path, str(output_path))
+    return {'rows': n_rows, 'bytes': os.path.getsize(str(output_path)), 'sha256': file_sha256(path=output_path)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Multi-node augmentation: plan shards, run one shard, merge shards.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    plan = commands.add_parser('plan', help='Split input corpus into shards and write manifest.')
+    plan.add_argument('input', help='Path to input corpus (csv, jsonl or conll).')
+    plan.add_argument('manifest', help='Path to output manifest (json).')
+    plan.add_argument('--shards', type=int, required=True, help='Number of shards (nodes).')
+    plan.add_argument('--chunk-size', type=int, default=1000, help='Number of input samples per chunk.')
+    plan.add_argument('--variants', type=int, default=1, help='Number of augmented variants per sample.')
+    plan.add_argument('--seed', type=int, default=CONFIGS['seed'], help='Master seed.')
+    plan.add_argument('--no-transform', action='store_true', help='Disable random transformations.')
+    plan.add_argument('--tagging-format', default='BIOLU', choices=['BIOLU', 'BIO', 'single_token'])
+    plan.add_argument('--inflection-mode', default='morph', choices=['morph', 'table'])
+    plan.add_argument('--input-format', default=None, choices=FORMATS)
+    plan.add_argument('--output-format', default=None, choices=FORMATS)
+    run = commands.add_parser('run', help='Augment one shard.')
+    run.add_argument('manifest', help='Path to manifest.')
+    run.add_argument('output_dir', help='Directory of shards outputs.')
+    run.add_argument('--shard', required=True, help='Shard as i/N (shards are numbered from 0).')
+    run.add_argument('--workers', type=int, default=1, help='Number of processes (0 - number of CPUs).')
+    merge = commands.add_parser('merge', help='Check shards and concatenate them.')
+    merge.add_argument('manifest', help='Path to manifest.')
+    merge.add_argument('output_dir', help='Directory of shards outputs.')
+    merge.add_argument('output', help='Path to merged corpus.')
+    args = parser.parse_args()
+    if args.command == 'plan':
+        manifest = plan_shards(
+            input_path=args.input,
+            n_shards=args.shards,
+            chunk_size=args.chunk_size,
+            n_variants=args.variants,
+            seed=args.seed,
+            transformation=not args.no_transform,
+            tagging_format=args.tagging_format,
+            inflection_mode=args.inflection_mode,
+            input_format=args.input_format,
+            output_format=args.output_format,
+        )
+        save_checkpoint(path=args.manifest, checkpoint=manifest)
+        print(f'Planned {len(manifest["shards"])} shards of {manifest["rows"]} rows.')
+        return
+    with open(args.manifest, 'r') as f:
+        manifest = json.load(f)
+    if args.command == 'run':
+        index, n_shards = parse_shard(shard=args.shard)
+        if n_shards != len(manifest['shards']):
+            raise ValueError(f'Manifest has {len(manifest["shards"])} shards, got: {args.shard}')
+        record = run_shard(manifest=manifest, index=index, output_dir=args.output_dir,
+                           n_workers=args.workers if args.workers > 0 else None)
+        print(f'Shard {index}/{n_shards}: {record["rows"]} rows, {record["bytes"]} bytes, sha256 {record["sha256"]}.')
+    if args.command == 'merge':
+        merged = merge_shards(manifest=manifest, output_dir=args.output_dir, output_path=args.output)
+        print(f'Merged: {merged["rows"]} rows, {merged["bytes"]} bytes, sha256 {merged["sha256"]}.')
+
+
+if __name__ == '__main__':
+    main()
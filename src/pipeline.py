@@ -0,0 +1,212 @@
+import os, json, typing, hashlib, pathlib, argparse, itertools
+
+from src import CONFIGS
+from src.utils.corpus_io import FORMATS, read_corpus, CorpusWriter
+from src.utils.parallel import derive_seed, imap_shards
+
+
+def iter_chunks(samples: typing.Iterable[typing.Tuple[list, list]], chunk_size: int) -> \
+        typing.Iterator[typing.Tuple[typing.List[list], typing.List[list]]]:
+    """ Split stream of samples into chunks.
+
+    :param samples: Iterator of pairs tokens and NER-tags.
+    :param chunk_size: Number of samples per chunk.
+    :return: Iterator of chunks (tokens and NER-tags).
+    """
+    samples = iter(samples)
+    while True:
+        chunk = list(itertools.islice(samples, chunk_size))
+        if not chunk:
+            return
+        yield [sample[0] for sample in chunk], [sample[1] for sample in chunk]
+
+
+def file_sha256(path: typing.Union[str, pathlib.Path]) -> str:
+    """ Compute checksum of file.
+
+    :param path: Path to file.
+    :return: Hex digest.
+    """
+    h = hashlib.sha256()
+    with open(str(path), 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def load_checkpoint(path: typing.Union[str, pathlib.Path]) -> dict:
+    """ Load pipeline checkpoint.
+
+    :param path: Path to checkpoint file.
+    :return: Checkpoint (processed rows, chunks and output size) or empty dict if checkpoint doesn't exist.
+    """
+    path = pathlib.Path(path)
+    if not path.exists():
+        return dict()
+    with path.open('r') as f:
+        return json.load(f)
+
+
+def save_checkpoint(path: typing.Union[str, pathlib.Path], checkpoint: dict) -> None:
+    """ Save pipeline checkpoint atomically.
+
+    :param path: Path to checkpoint file.
+    :param checkpoint: Checkpoint.
+    :return:
+    """
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, str(path))
+
+
+def augment_stream(
+        input_path: typing.Union[str, pathlib.Path],
+        output_path: typing.Union[str, pathlib.Path],
+        chunk_size: int = 1000,
+        n_variants: int = 1,
+        seed: int = CONFIGS['seed'],
+        n_workers: int = 1,
+        transformation: bool = True,
+        checkpoint_path: typing.Union[str, pathlib.Path] = None,
+        tagging_format: str = 'BIOLU',
+        inflection_mode: str = 'morph',
+        input_format: str = None,
+        output_format: str = None,
+        entity_bank: str = None,
+        chunks: typing.Tuple[int, int] = None,
+        header: bool = None,
+        settings: dict = None,
+) -> dict:
+    """ Augment corpus file chunk by chunk with constant memory. Every chunk is augmented with seed derived from master
+    seed and chunk index, so output doesn't depend on number of workers and interrupted job continues from checkpoint
+    (row offset of the last written chunk) with the same output as uninterrupted one.
+
+    :param input_path: Path to input corpus (csv, jsonl or conll).
+    :param output_path: Path to output corpus (csv, jsonl or conll).
+    :param chunk_size: Number of input samples per chunk.
+    :param n_variants: Number of augmented variants per sample.
+    :param seed: Master seed.
+    :param n_workers: Number of processes (if None, then number of CPUs).
+    :param transformation: Apply random transformation (see 'transform') to every augmented sample.
+    :param checkpoint_path: Path to checkpoint file (if None, then job isn't resumable).
+    :param tagging_format: Tagging format (see 'RUNERAugmentor').
+    :param inflection_mode: Inflection source (see 'RUNERAugmentor').
+    :param input_format: Input corpus format (if None, then it's detected by file extension).
+    :param output_format: Output corpus format (if None, then it's detected by file extension).
+    :param entity_bank: Path to saved entity bank for warm start of workers (if None, then entity bank isn't used;
+    with entity bank resumed job isn't identical to uninterrupted one).
+    :param chunks: Range of chunk indices to augment (start, end), for example, one shard of multi-node run (see
+    'src.cluster'); output of range is the same as its part of output of the whole corpus (if None, then all chunks are
+    augmented).
+    :param header: Write csv header (if None, then it's written if range isn't empty and starts from the first chunk).
+    :param settings: Extra job settings which are saved in checkpoint and must be the same on resume (for example,
+    checksum of manifest of shard).
+    :return: Final checkpoint: processed input rows, chunks, output size (in bytes) and settings.
+    """
+    if n_variants < 1:
+        raise ValueError('n_variants must be >= 1')
+    # Output of resumed job is the same as output of uninterrupted one only with the same input and settings:
+    settings = {
+        'input': str(pathlib.Path(input_path).resolve()),
+        # Checksum costs extra pass over input, so it's computed only for resumable job:
+        'input_sha256': file_sha256(path=input_path) if checkpoint_path is not None else None,
+        'input_format': input_format,
+        'output_format': output_format,
+        'n_variants': n_variants,
+        'seed': seed,
+        'transformation': transformation,
+        'tagging_format': tagging_format,
+        'inflection_mode': inflection_mode,
+        'entity_bank': entity_bank,
+        'chunks': list(chunks) if chunks is not None else None,
+        **(settings if settings is not None else dict()),
+    }
+    checkpoint = load_checkpoint(path=checkpoint_path) if checkpoint_path is not None else dict()
+    if checkpoint and checkpoint['chunk_size'] != chunk_size:
+        raise ValueError(f'Checkpoint was made with chunk size {checkpoint["chunk_size"]}, but got {chunk_size}')
+    if checkpoint and checkpoint.get('settings') != settings:
+        changed = sorted(k for k in settings if checkpoint.get('settings', dict()).get(k) != settings[k])
+        raise ValueError(f'Checkpoint {checkpoint_path} was made with other settings or input: {changed}')
+    checkpoint = checkpoint if checkpoint else {'rows': 0, 'chunks': 0, 'output_bytes': 0, 'chunk_size': chunk_size,
+                                                'settings': settings}
+    if checkpoint['chunks'] > 0:
+        # Drop output written after the last checkpoint:
+        with open(str(output_path), 'a') as f:
+            f.truncate(checkpoint['output_bytes'])
+    first, last = chunks if chunks is not None else (0, None)
+    header = header if header is not None else first == 0 and (last is None or last > first)
+    if last is not None and last <= first and not header:
+        # Empty range (for example, there are more shards than chunks) has empty output:
+        open(str(output_path), 'w').close()
+        if checkpoint_path is not None:
+            save_checkpoint(path=checkpoint_path, checkpoint=checkpoint)
+        return checkpoint
+    samples = read_corpus(path=input_path, corpus_format=input_format, skip=first * chunk_size + checkpoint['rows'])
+    chunks_iter = itertools.islice(iter_chunks(samples=samples, chunk_size=chunk_size),
+                                   None if last is None else max(last - first - checkpoint['chunks'], 0))
+    shards = (
+        (derive_seed(seed=seed, index=i), tokens_list, tags_list, n_variants, transformation)
+        for i, (tokens_list, tags_list) in enumerate(chunks_iter, start=first + checkpoint['chunks'])
+    )
+    with CorpusWriter(path=output_path, corpus_format=output_format, append=checkpoint['chunks'] > 0,
+                      header=header) as writer:
+        for tokens_list, tags_list in imap_shards(shards=shards, n_workers=n_workers, tagging_format=tagging_format,
+                                                  inflection_mode=inflection_mode, entity_bank=entity_bank):
+            writer.write(tokens_list=tokens_list, tags_list=tags_list)
+            checkpoint['rows'] += len(tokens_list) // n_variants
+            checkpoint['chunks'] += 1
+            checkpoint['output_bytes'] = writer.tell()
+            if checkpoint_path is not None:
+                save_checkpoint(path=checkpoint_path, checkpoint=checkpoint)
+    return checkpoint
+
+
+def positive_int(value: str) -> int:
+    """ Parse positive integer argument of command line.
+
+    :param value: Argument value.
+    :return: Integer.
+    """
+    n = int(value)
+    if n < 1:
+        raise argparse.ArgumentTypeError(f'must be >= 1, got: {value}')
+    return n
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Augment NER corpus with constant memory.')
+    parser.add_argument('input', help='Path to input corpus (csv, jsonl or conll).')
+    parser.add_argument('output', help='Path to output corpus (csv, jsonl or conll).')
+    parser.add_argument('--chunk-size', type=int, default=1000, help='Number of input samples per chunk.')
+    parser.add_argument('--variants', type=positive_int, default=1, help='Number of augmented variants per sample.')
+    parser.add_argument('--seed', type=int, default=CONFIGS['seed'], help='Master seed.')
+    parser.add_argument('--workers', type=int, default=1, help='Number of processes (0 - number of CPUs).')
+    parser.add_argument('--checkpoint', default=None, help='Path to checkpoint file for resuming.')
+    parser.add_argument('--no-transform', action='store_true', help='Disable random transformations.')
+    parser.add_argument('--tagging-format', default='BIOLU', choices=['BIOLU', 'BIO', 'single_token'])
+    parser.add_argument('--inflection-mode', default='morph', choices=['morph', 'table'])
+    parser.add_argument('--input-format', default=None, choices=FORMATS)
+    parser.add_argument('--output-format', default=None, choices=FORMATS)
+    parser.add_argument('--entity-bank', default=None, help='Path to saved entity bank (see src.utils.entity_bank).')
+    args = parser.parse_args()
+    checkpoint = augment_stream(
+        input_path=args.input,
+        output_path=args.output,
+        chunk_size=args.chunk_size,
+        n_variants=args.variants,
+        seed=args.seed,
+        n_workers=args.workers if args.workers > 0 else None,
+        transformation=not args.no_transform,
+        checkpoint_path=args.checkpoint,
+        tagging_format=args.tagging_format,
+        inflection_mode=args.inflection_mode,
+        input_format=args.input_format,
+        output_format=args.output_format,
+        entity_bank=args.entity_bank,
+    )
+    print(f'Done: {checkpoint["rows"]} rows, {checkpoint["chunks"]} chunks, {checkpoint["output_bytes"]} bytes.')
+
+
+if __name__ == '__main__':
+    main()
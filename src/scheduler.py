@@ -0,0 +1,230 @@
+import time, random, typing, argparse
+
+from src import CONFIGS
+from src.attrs.attributes import INPUT_TAG_MAP, TAG_MAP
+from src.augmentor import RUNERAugmentor, LOC_ENTITIES, SAMPLERS
+from src.utils.coverage import CoverageTracker
+from src.utils.templates import TEMPLATES
+from src.utils.transformation import transform_batch
+
+# Output tags and vocabs which can be covered by entity type (by its templates):
+ENTITY_TAGS = {
+    entity: sorted({TAG_MAP[label] for labels in plan.labels for label in labels if label in TAG_MAP})
+    for entity, plan in TEMPLATES.items()
+}
+ENTITY_VOCABS = {
+    entity: sorted({
+        sampler.vocab
+        for labels in plan.labels for label in labels if label in SAMPLERS
+        for sampler in (SAMPLERS[label].values() if isinstance(SAMPLERS[label], dict) else [SAMPLERS[label]])
+    })
+    for entity, plan in TEMPLATES.items()
+}
+
+
+class CoverageScheduler:
+    """ Augmentation until coverage targets are met (see 'CoverageTracker'). Every step augments one base sentence:
+    the most useful of several random candidates (by missing share of targets which its spans can cover), and
+    location entity types are drawn with weights of targets they can cover, so under-covered tags, vocabs and cases
+    are generated first. Blind generation (passes over corpus with uniform entity types, like 'example.py') can be run
+    with the same targets to report how many samples were saved.\n\n
+    Usage example:\n
+    scheduler = CoverageScheduler(tokens_list=tokens, tags_list=tags, tags={'DMN_CITY': 100})\n
+    tokens_augmented, tags_augmented = scheduler.run()\n
+    print(scheduler.report(compare_blind=True))
+    """
+    def __init__(
+            self,
+            tokens_list: typing.List[list],
+            tags_list: typing.List[list],
+            tags: typing.Dict[str, int] = None,
+            vocabs: typing.Dict[str, int] = None,
+            cases: typing.Dict[str, int] = None,
+            candidates: int = CONFIGS['coverage']['candidates'],
+            max_samples: int = CONFIGS['coverage']['max_samples'],
+            transformation: bool = False,
+            seed: int = CONFIGS['seed'],
+            tagging_format: str = 'BIOLU',
+            inflection_mode: str = 'morph',
+    ) -> None:
+        """ Create 'CoverageScheduler' object class.
+
+        :param tokens_list: Base corpus sentences tokens.
+        :param tags_list: Base corpus sentences NER-tags (BIO or BIOLU format).
+        :param tags: Minimum number of entities per output tag (see 'CoverageTracker').
+        :param vocabs: Minimum number of distinct entries per vocab (see 'CoverageTracker').
+        :param cases: Minimum number of entities per inflection case (see 'CoverageTracker').
+        :param candidates: Number of random base sentences compared at every step.
+        :param max_samples: Max number of generated samples (if targets can't be met).
+        :param transformation: Apply random transformation (see 'transform') to every augmented sentence.
+        :param seed: Seed.
+        :param tagging_format: Tagging format (see 'RUNERAugmentor').
+        :param inflection_mode: Inflection source (see 'RUNERAugmentor').
+        :return:
+        """
+        self.tokens_list, self.tags_list = tokens_list, tags_list
+        self.targets = {'tags': tags, 'vocabs': vocabs, 'cases': cases}
+        self.candidates, self.max_samples, self.transformation = max(candidates, 1), max_samples, transformation
+        self.seed, self.tagging_format, self.inflection_mode = seed, tagging_format, inflection_mode
+        self.tracker, self.blind_tracker = None, None
+        self.elapsed, self.blind_elapsed = 0.0, 0.0
+        self._spans, self._cases = None, None
+
+    def _augmentor(self, tracker: CoverageTracker) -> RUNERAugmentor:
+        return RUNERAugmentor(tagging_format=self.tagging_format, inflection_mode=self.inflection_mode, seed=self.seed,
+                              coverage=tracker)
+
+    def _prepare(self, augmentor: RUNERAugmentor) -> None:
+        """ Detect spans and their cases once (they are shared by steered and blind runs).
+
+        :param augmentor: Augmentor.
+        :return:
+        """
+        if self._spans is None:
+            self._spans = [augmentor.group_spans(tags=tags) for tags in self.tags_list]
+            self._cases = [
+                [augmentor.detect_case(s=augmentor._span_head(tokens=tokens[span[0]:span[1]])) for span in spans]
+                for tokens, spans in zip(self.tokens_list, self._spans)
+            ]
+
+    @staticmethod
+    def _gain(tracker: CoverageTracker, entity: str, case: str) -> float:
+        """ Missing share of targets which entity can cover.
+
+        :param tracker: Coverage counters.
+        :param entity: Entity type.
+        :param case: Inflection case of span.
+        :return: Sum of missing shares.
+        """
+        return sum(tracker.deficit(kind='tag', key=tag) for tag in ENTITY_TAGS[entity]) + \
+            sum(tracker.deficit(kind='vocab', key=name) for name in ENTITY_VOCABS[entity]) + \
+            tracker.deficit(kind='case', key=case)
+
+    def _steer(self, tracker: CoverageTracker, i: int, rng: random.Random) -> typing.Tuple[float, typing.List[str]]:
+        """ Choose entity types for spans of base sentence.
+
+        :param tracker: Coverage counters.
+        :param i: Base sentence index.
+        :param rng: Random generator.
+        :return: Expected gain of sentence and entity types of its spans.
+        """
+        total, entities = 0.0, list()
+        for span, inflecting_tags in zip(self._spans[i], self._cases[i]):
+            if span[2] == INPUT_TAG_MAP['PERSON']:
+                entity = 'full_name'
+            else:
+                gains = [self._gain(tracker=tracker, entity=e, case=inflecting_tags[1]) for e in LOC_ENTITIES]
+                # Covered entity types keep small weight, so entities stay diverse:
+                entity = rng.choices(population=LOC_ENTITIES, weights=[g + 1e-3 for g in gains])[0]
+            total += self._gain(tracker=tracker, entity=entity, case=inflecting_tags[1])
+            entities += [entity]
+        return total, entities
+
+    def _generate(self, augmentor: RUNERAugmentor, tracker: CoverageTracker, i: int, entities: typing.List[str]) -> \
+            typing.Tuple[list, list]:
+        tokens, ids = augmentor._augment_variant(tokens=self.tokens_list[i], spans=self._spans[i],
+                                                 cases=self._cases[i], entities=entities)
+        tracker.observe_sample(ids=ids, cases=[inflecting_tags[1] for inflecting_tags in self._cases[i]])
+        return tokens, augmentor.format_tag_ids(ids=ids)
+
+    def run(self) -> typing.Tuple[list, list]:
+        """ Augment base sentences until coverage targets are met (or number of samples reaches limit).
+
+        :return: Augmented tokens and NER-tags.
+        """
+        start = time.perf_counter()
+        self.tracker = CoverageTracker(**self.targets)
+        augmentor = self._augmentor(tracker=self.tracker)
+        self._prepare(augmentor=augmentor)
+        rng = random.Random(self.seed)
+        # Sentences without entities can't cover anything:
+        useful = [i for i, spans in enumerate(self._spans) if spans]
+        tokens_list, tags_list = list(), list()
+        while useful and not self.tracker.done() and len(tokens_list) < self.max_samples:
+            best = None
+            for i in rng.sample(population=useful, k=min(self.candidates, len(useful))):
+                gain, entities = self._steer(tracker=self.tracker, i=i, rng=rng)
+                if best is None or gain > best[0]:
+                    best = (gain, i, entities)
+            tokens, tags = self._generate(augmentor=augmentor, tracker=self.tracker, i=best[1], entities=best[2])
+            tokens_list += [tokens]
+            tags_list += [tags]
+        if self.transformation:
+            tokens_list = transform_batch(tokens_list=tokens_list, rng=augmentor.np_rng)
+        self.elapsed = time.perf_counter() - start
+        return tokens_list, tags_list
+
+    def run_blind(self) -> int:
+        """ Count samples of blind generation (passes over base corpus in order with uniform location entity types)
+        needed to meet the same targets. Samples aren't kept.
+
+        :return: Number of samples (or limit, if targets weren't met).
+        """
+        start = time.perf_counter()
+        self.blind_tracker = CoverageTracker(**self.targets)
+        augmentor = self._augmentor(tracker=self.blind_tracker)
+        self._prepare(augmentor=augmentor)
+        n = 0
+        while not self.blind_tracker.done() and n < self.max_samples and any(self._spans):
+            for i in range(len(self.tokens_list)):
+                if self.blind_tracker.done() or n >= self.max_samples:
+                    break
+                entities = ['full_name' if span[2] == INPUT_TAG_MAP['PERSON'] else augmentor.rng.choice(LOC_ENTITIES)
+                            for span in self._spans[i]]
+                self._generate(augmentor=augmentor, tracker=self.blind_tracker, i=i, entities=entities)
+                n += 1
+        self.blind_elapsed = time.perf_counter() - start
+        return n
+
+    def report(self, compare_blind: bool = False) -> dict:
+        """ Get coverage of the last run.
+
+        :param compare_blind: Run blind generation with the same targets (if it wasn't run) and report saved samples.
+        :return: Generated samples, elapsed time and coverage counters (and blind samples, saved samples and their
+        share of blind samples).
+        """
+        if self.tracker is None:
+            raise RuntimeError('Scheduler was not run')
+        report = {'samples': self.tracker.samples, 'elapsed': self.elapsed, 'coverage': self.tracker.report()}
+        if compare_blind:
+            if self.blind_tracker is None:
+                self.run_blind()
+            blind = self.blind_tracker.samples
+            report.update({
+                'blind_samples': blind,
+                'blind_done': self.blind_tracker.done(),
+                'blind_elapsed': self.blind_elapsed,
+                'saved_samples': blind - self.tracker.samples,
+                'saved_ratio': (blind - self.tracker.samples) / blind if blind else 0.0,
+            })
+        return report
+
+
+if __name__ == '__main__':
+    from src.utils.corpus_io import FORMATS, read_corpus, CorpusWriter
+
+    parser = argparse.ArgumentParser(description='Augment corpus until coverage targets from configs are met.')
+    parser.add_argument('input', help='Path to base corpus (csv, jsonl or conll).')
+    parser.add_argument('output', help='Path to output corpus (csv, jsonl or conll).')
+    parser.add_argument('--seed', type=int, default=CONFIGS['seed'], help='Seed.')
+    parser.add_argument('--max-samples', type=int, default=CONFIGS['coverage']['max_samples'])
+    parser.add_argument('--no-transform', action='store_true', help='Disable random transformations.')
+    parser.add_argument('--compare-blind', action='store_true', help='Report samples saved against blind generation.')
+    parser.add_argument('--tagging-format', default='BIOLU', choices=['BIOLU', 'BIO', 'single_token'])
+    parser.add_argument('--inflection-mode', default='morph', choices=['morph', 'table'])
+    parser.add_argument('--input-format', default=None, choices=FORMATS)
+    parser.add_argument('--output-format', default=None, choices=FORMATS)
+    args = parser.parse_args()
+    samples = list(read_corpus(path=args.input, corpus_format=args.input_format))
+    scheduler = CoverageScheduler(
+        tokens_list=[sample[0] for sample in samples],
+        tags_list=[sample[1] for sample in samples],
+        max_samples=args.max_samples,
+        transformation=not args.no_transform,
+        seed=args.seed,
+        tagging_format=args.tagging_format,
+        inflection_mode=args.inflection_mode,
+    )
+    with CorpusWriter(path=args.output, corpus_format=args.output_format) as writer:
+        writer.write(*scheduler.run())
+    print(scheduler.report(compare_blind=args.compare_blind))
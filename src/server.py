@@ -0,0 +1,381 @@
+import json, time, socket, typing, asyncio, argparse, functools, itertools, collections, concurrent.futures
+import numpy as np
+
+from src import CONFIGS
+from src.augmentor import RUNERAugmentor
+from src.utils.parallel import derive_seed, _init_worker, _augment_shard
+from src.utils.transformation import transform_batch
+
+
+class AugmentationServer:
+    """ Long-running local augmentation server (Unix socket or TCP) with warm augmentors. Protocol is one JSON object
+    per line: request {"id": 1, "tokens": [[...]], "tags": [[...]], "n_variants": 1, "transformation": false} is answered by
+    {"id": 1, "tokens": [[...]], "tags": [[...]]}, request {"id": 2, "op": "stats"} is answered by server counters.
+    Concurrent requests are coalesced into batches (up to 'max_batch' sentences or 'max_latency' seconds since the first
+    request of batch) and every request is answered as soon as its batch is augmented.\n\n
+    Usage example:\n
+    python -m src.server --socket /tmp/runer.sock --workers 4\n
+    with AugmentationClient(path='/tmp/runer.sock') as client:\n
+        print(client.augment(tokens_list=[['Я', 'живу', 'в', 'Москве']], tags_list=[['O', 'O', 'O', 'B-LOC']]))
+    """
+    def __init__(
+            self,
+            n_workers: int = 1,
+            max_batch: int = CONFIGS['server']['max_batch'],
+            max_latency: float = CONFIGS['server']['max_latency_ms'] / 1000,
+            seed: int = CONFIGS['seed'],
+            tagging_format: str = 'BIOLU',
+            inflection_mode: str = 'morph',
+    ) -> None:
+        """ Create 'AugmentationServer' object class.
+
+        :param n_workers: Number of augmentors (1 - thread of server process, otherwise processes).
+        :param max_batch: Max number of sentences (with variants) per batch.
+        :param max_latency: Max time (in seconds) which the first request of batch waits for other requests.
+        :param seed: Master seed (batch is augmented with seed derived from master seed and batch index).
+        :param tagging_format: Tagging format (see 'RUNERAugmentor').
+        :param inflection_mode: Inflection source (see 'RUNERAugmentor').
+        :return:
+        """
+        self.n_workers, self.max_batch, self.max_latency, self.seed = max(n_workers, 1), max_batch, max_latency, seed
+        self.tagging_format, self.inflection_mode = tagging_format, inflection_mode
+        self.latencies = collections.deque(maxlen=10000)
+        self.requests, self.batches, self.batched_sentences, self.in_flight = 0, 0, 0, 0
+        self.executor, self.server, self._queue, self._batcher, self._slots = None, None, None, None, None
+        self._augment_shard, self._tasks = _augment_shard, set()
+
+    async def start(self, path: str = None, host: str = '127.0.0.1', port: int = None) -> None:
+        """ Start augmentors and listen Unix socket (if path is set) or TCP port.
+
+        :param path: Path to Unix socket.
+        :param host: TCP host.
+        :param port: TCP port (0 - any free port).
+        :return:
+        """
+        loop = asyncio.get_running_loop()
+        if self.n_workers == 1:
+            # Own augmentor (worker's augmentor of 'src.utils.parallel' may be used by other in-process run):
+            self.executor = concurrent.futures.ThreadPoolExecutor(1)
+            augmentor = await loop.run_in_executor(self.executor, functools.partial(
+                RUNERAugmentor, tagging_format=self.tagging_format, inflection_mode=self.inflection_mode))
+            self._augment_shard = functools.partial(_augment_shard, augmentor=augmentor)
+        else:
+            self.executor = concurrent.futures.ProcessPoolExecutor(
+                self.n_workers, initializer=_init_worker, initargs=(self.tagging_format, self.inflection_mode))
+        # Start augmentors before the first request:
+        await loop.run_in_executor(self.executor, self._augment_shard, (self.seed, [], [], 1, False))
+        self._queue, self._slots = asyncio.Queue(), asyncio.Semaphore(self.n_workers)
+        self._batcher = asyncio.create_task(self._batch_loop())
+        if path is not None:
+            self.server = await asyncio.start_unix_server(self._handle, path=path)
+        else:
+            self.server = await asyncio.start_server(self._handle, host=host, port=port)
+
+    async def serve_forever(self) -> None:
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def close(self) -> None:
+        """ Stop listening, answer queued requests with error, wait for running batches and stop augmentors.
+
+        :return:
+        """
+        self.server.close()
+        await self.server.wait_closed()
+        self._batcher.cancel()
+        try:
+            await self._batcher
+        except asyncio.CancelledError:
+            pass
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError('Server is closed'))
+        if self._tasks:
+            await asyncio.wait(self._tasks)
+        # Shutdown waits for workers, so it's run outside of event loop:
+        await asyncio.get_running_loop().run_in_executor(None, self.executor.shutdown)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """ Read requests of connection (responses are written as soon as they are ready, so they can be out of
+        order).
+
+        :param reader: Connection reader.
+        :param writer: Connection writer.
+        :return:
+        """
+        tasks = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                except ValueError as e:
+                    self._write(writer=writer, response={'id': None, 'error': f'Invalid JSON: {e}'})
+                    continue
+                if request.get('op', 'augment') == 'stats':
+                    self._write(writer=writer, response={'id': request.get('id'), 'stats': self.stats()})
+                    continue
+                error = self._validate(request=request)
+                if error is not None:
+                    self._write(writer=writer, response={'id': request.get('id'), 'error': error})
+                    continue
+                task = asyncio.create_task(self._respond(request=request, writer=writer))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.wait(tasks)
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _validate(request: dict) -> typing.Optional[str]:
+        """ Check augmentation request.
+
+        :param request: Request.
+        :return: Error message (None if request is valid).
+        """
+        if not isinstance(request.get('tokens'), list) or not isinstance(request.get('tags'), list) or \
+                len(request['tokens']) != len(request['tags']):
+            return 'Request must have equal-length tokens and tags lists'
+        n_variants = request.get('n_variants', 1)
+        if not isinstance(n_variants, int) or isinstance(n_variants, bool) or n_variants < 1:
+            return f'n_variants must be positive integer, got: {n_variants!r}'
+        if not isinstance(request.get('transformation', False), bool):
+            return f'transformation must be boolean, got: {request["transformation"]!r}'
+        for i, (tokens, tags) in enumerate(zip(request['tokens'], request['tags'])):
+            if not isinstance(tokens, list) or not isinstance(tags, list) or len(tokens) != len(tags):
+                return f'Sentence {i} must have equal-length tokens and tags lists'
+            if not all(isinstance(v, str) for v in tokens) or not all(isinstance(v, str) for v in tags):
+                return f'Tokens and tags of sentence {i} must be strings'
+        return None
+
+    @staticmethod
+    def _write(writer: asyncio.StreamWriter, response: dict) -> None:
+        writer.write(json.dumps(response, ensure_ascii=False).encode('utf-8') + b'\n')
+
+    async def _respond(self, request: dict, writer: asyncio.StreamWriter) -> None:
+        start = time.perf_counter()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((request, future))
+        try:
+            tokens, tags = await future
+            response = {'id': request.get('id'), 'tokens': tokens, 'tags': tags}
+        except Exception as e:
+            response = {'id': request.get('id'), 'error': f'{type(e).__name__}: {e}'}
+        self._write(writer=writer, response=response)
+        await writer.drain()
+        self.requests += 1
+        self.latencies.append(time.perf_counter() - start)
+
+    @staticmethod
+    def _size(request: dict) -> int:
+        return len(request.get('tokens', [])) * request.get('n_variants', 1)
+
+    async def _batch_loop(self) -> None:
+        """ Coalesce queued requests into batches and run them on augmentors.
+
+        :return:
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            items = [await self._queue.get()]
+            try:
+                size, deadline = self._size(request=items[0][0]), loop.time() + self.max_latency
+                while size < self.max_batch:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        items += [await asyncio.wait_for(self._queue.get(), timeout=timeout)]
+                    except asyncio.TimeoutError:
+                        break
+                    size += self._size(request=items[-1][0])
+                await self._slots.acquire()
+            except Exception as e:
+                # Batcher must survive any request, requests of broken batch are answered with error:
+                self._fail(items=items, error=e)
+                continue
+            except asyncio.CancelledError:
+                # Server is closed, collected requests aren't augmented:
+                self._fail(items=items, error=RuntimeError('Server is closed'))
+                raise
+            self.in_flight += len(items)
+            task = asyncio.create_task(self._run_batch(items=items, index=self.batches))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+            self.batches += 1
+
+    @staticmethod
+    def _fail(items: typing.List[tuple], error: BaseException) -> None:
+        for _, future in items:
+            if not future.done():
+                future.set_exception(error)
+
+    async def _augment(self, items: typing.List[tuple], seed: int) -> None:
+        """ Augment requests as one shard and resolve their futures.
+
+        :param items: Requests and their futures.
+        :param seed: Shard seed.
+        :return:
+        """
+        tokens_list, tags_list = list(), list()
+        for request, _ in items:
+            n_variants = request.get('n_variants', 1)
+            # Variants of every sentence are augmented as repeated sentence (layout is the same as in
+            # 'augment_corpus'):
+            tokens_list += [tokens for tokens in request['tokens'] for _ in range(n_variants)]
+            tags_list += [tags for tags in request['tags'] for _ in range(n_variants)]
+        tokens_list, tags_list = await asyncio.get_running_loop().run_in_executor(
+            self.executor, self._augment_shard, (seed, tokens_list, tags_list, 1, False))
+        self.batched_sentences += len(tokens_list)
+        rng, start = np.random.default_rng(seed=seed), 0
+        for request, future in items:
+            end = start + self._size(request=request)
+            tokens = tokens_list[start:end]
+            if request.get('transformation', False):
+                tokens = transform_batch(tokens_list=tokens, rng=rng)
+            if not future.done():
+                future.set_result((tokens, tags_list[start:end]))
+            start = end
+
+    async def _run_batch(self, items: typing.List[tuple], index: int) -> None:
+        """ Augment batch of requests and resolve their futures. If batch fails, its requests are augmented one by one,
+        so only failing requests are answered with error.
+
+        :param items: Requests and their futures.
+        :param index: Batch index.
+        :return:
+        """
+        seed = derive_seed(seed=self.seed, index=index)
+        try:
+            await self._augment(items=items, seed=seed)
+        except Exception as e:
+            if len(items) == 1:
+                self._fail(items=items, error=e)
+            else:
+                for i, item in enumerate(items):
+                    try:
+                        await self._augment(items=[item], seed=derive_seed(seed=seed, index=i))
+                    except Exception as item_error:
+                        self._fail(items=[item], error=item_error)
+        finally:
+            self.in_flight -= len(items)
+            self._slots.release()
+
+    def stats(self) -> dict:
+        """ Get server counters.
+
+        :return: Answered requests, batches, mean batch size (sentences), queue depth (waiting and augmented requests)
+        and latency percentiles of recent requests (in milliseconds).
+        """
+        latencies = np.array(self.latencies) * 1000
+        percentiles = np.percentile(latencies, [50, 90, 99]).tolist() if len(latencies) else [0.0, 0.0, 0.0]
+        return {
+            'requests': self.requests,
+            'batches': self.batches,
+            'mean_batch_size': self.batched_sentences / self.batches if self.batches else 0.0,
+            'queue_depth': self._queue.qsize() if self._queue is not None else 0,
+            'in_flight': self.in_flight,
+            'latency_ms': {'p50': percentiles[0], 'p90': percentiles[1], 'p99': percentiles[2],
+                           'max': float(latencies.max()) if len(latencies) else 0.0},
+        }
+
+
+class AugmentationClient:
+    """ Blocking client of 'AugmentationServer'.\n\n
+    Usage example:\n
+    with AugmentationClient(path='/tmp/runer.sock') as client:\n
+        tokens, tags = client.augment(tokens_list=[['Москва']], tags_list=[['B-LOC']], n_variants=3)\n
+        print(client.stats())
+    """
+    def __init__(self, path: str = None, host: str = '127.0.0.1', port: int = None, timeout: float = None) -> None:
+        """ Create 'AugmentationClient' object class.
+
+        :param path: Path to Unix socket of server.
+        :param host: TCP host of server (if path isn't set).
+        :param port: TCP port of server (if path isn't set).
+        :param timeout: Socket timeout (in seconds).
+        :return:
+        """
+        if path is not None:
+            self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.socket.settimeout(timeout)
+            self.socket.connect(path)
+        else:
+            self.socket = socket.create_connection((host, port), timeout=timeout)
+        self.file = self.socket.makefile('rwb')
+        self._ids = itertools.count()
+
+    def _request(self, request: dict) -> dict:
+        request['id'] = next(self._ids)
+        self.file.write(json.dumps(request, ensure_ascii=False).encode('utf-8') + b'\n')
+        self.file.flush()
+        response = json.loads(self.file.readline())
+        if 'error' in response:
+            raise RuntimeError(response['error'])
+        return response
+
+    def augment(
+            self,
+            tokens_list: typing.List[list],
+            tags_list: typing.List[list],
+            n_variants: int = 1,
+            transformation: bool = False,
+    ) -> typing.Tuple[list, list]:
+        """ Augment sentences on server (see 'RUNERAugmentor.augment_corpus').
+
+        :param tokens_list: Sentences tokens.
+        :param tags_list: Sentences NER-tags (BIO or BIOLU format).
+        :param n_variants: Number of augmented variants per sentence.
+        :param transformation: Apply random transformation (see 'transform') to every augmented sentence.
+        :return: Augmented tokens and NER-tags.
+        """
+        response = self._request(request={'tokens': tokens_list, 'tags': tags_list, 'n_variants': n_variants,
+                                          'transformation': transformation})
+        return response['tokens'], response['tags']
+
+    def stats(self) -> dict:
+        return self._request(request={'op': 'stats'})['stats']
+
+    def close(self) -> None:
+        self.file.close()
+        self.socket.close()
+
+    def __enter__(self) -> 'AugmentationClient':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Run local augmentation server.')
+    parser.add_argument('--socket', default=None, help='Path to Unix socket (otherwise TCP is used).')
+    parser.add_argument('--host', default='127.0.0.1', help='TCP host.')
+    parser.add_argument('--port', type=int, default=8765, help='TCP port.')
+    parser.add_argument('--workers', type=int, default=1, help='Number of augmentors (processes if more than 1).')
+    parser.add_argument('--max-batch', type=int, default=CONFIGS['server']['max_batch'],
+                        help='Max number of sentences per batch.')
+    parser.add_argument('--max-latency-ms', type=float, default=CONFIGS['server']['max_latency_ms'],
+                        help='Max time which request waits for batch.')
+    parser.add_argument('--seed', type=int, default=CONFIGS['seed'], help='Master seed.')
+    parser.add_argument('--tagging-format', default='BIOLU', choices=['BIOLU', 'BIO', 'single_token'])
+    parser.add_argument('--inflection-mode', default='morph', choices=['morph', 'table'])
+    args = parser.parse_args()
+
+    async def run() -> None:
+        server = AugmentationServer(n_workers=args.workers, max_batch=args.max_batch,
+                                    max_latency=args.max_latency_ms / 1000, seed=args.seed,
+                                    tagging_format=args.tagging_format, inflection_mode=args.inflection_mode)
+        await server.start(path=args.socket, host=args.host, port=args.port)
+        print(f'Listening on {args.socket if args.socket is not None else f"{args.host}:{args.port}"}')
+        await server.serve_forever()
+
+    asyncio.run(run())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+import typing, random
+import numpy as np
+
+
+class AliasTable:
+    """ Walker/Vose alias table for O(1) sampling from discrete distribution. Table is two NumPy arrays (acceptance
+    probabilities and aliases), so batch of draws is vectorized.\n\n
+    Usage example:\n
+    table = AliasTable(weights=[10, 1, 1])\n
+    print(table.sample(rng=random.Random(0)))\n
+    print(table.sample_batch(n=5, rng=np.random.default_rng(0)))
+    """
+    def __init__(self, weights: typing.Sequence[float]) -> None:
+        """ Create 'AliasTable' object class.
+
+        :param weights: Non-negative weights of outcomes (they are normalized).
+        :return:
+        """
+        weights = np.asarray(weights, dtype=np.float64)
+        if weights.ndim != 1 or len(weights) == 0 or (weights < 0).any() or weights.sum() <= 0:
+            raise ValueError('Weights must be non-empty 1-D array of non-negative numbers with positive sum')
+        n = len(weights)
+        scaled = weights * (n / weights.sum())
+        self.prob = np.ones(n, dtype=np.float64)
+        self.alias = np.arange(n, dtype=np.int64)
+        small = [i for i in range(n) if scaled[i] < 1.0]
+        large = [i for i in range(n) if scaled[i] >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            self.prob[s], self.alias[s] = scaled[s], l
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+        # The rest outcomes have probability 1 (up to rounding errors):
+        for i in small + large:
+            self.prob[i] = 1.0
+
+    def __len__(self) -> int:
+        return len(self.prob)
+
+    def sample(self, rng: random.Random = None) -> int:
+        """ Draw one outcome.
+
+        :param rng: Random generator (if None, then global 'random' state is used).
+        :return: Outcome index.
+        """
+        rng = random if rng is None else rng
+        i = rng.randrange(len(self.prob))
+        return i if rng.random() < self.prob[i] else int(self.alias[i])
+
+    def sample_batch(self, n: int, rng: np.random.Generator = None) -> np.ndarray:
+        """ Draw N outcomes (with replacement) by vectorized lookup.
+
+        :param n: Number of outcomes.
+        :param rng: NumPy random generator (if None, then global NumPy state is used).
+        :return: Outcomes indices.
+        """
+        rng = np.random if rng is None else rng
+        i = rng.choice(a=len(self.prob), size=n)
+        return np.where(rng.random(size=n) < self.prob[i], i, self.alias[i])
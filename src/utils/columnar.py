@@ -0,0 +1,205 @@
+import typing, json, pathlib, argparse, bisect
+import numpy as np
+
+from src.utils.corpus_io import read_corpus
+from src.utils.sample_batch import StringTable
+
+MANIFEST = 'manifest.json'
+
+
+def _save_strings(table: StringTable, path: pathlib.Path, name: str) -> None:
+    """ Save string table as concatenated UTF-8 bytes and offsets, so it's read back by memory-mapping without parsing.
+
+    :param table: String table.
+    :param path: Output directory.
+    :param name: Name of table files.
+    :return:
+    """
+    encoded = [value.encode('utf-8') for value in table.strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(value) for value in encoded], out=offsets[1:])
+    np.save(file=str(path/f'{name}_offsets.npy'), arr=offsets)
+    with (path/f'{name}.bin').open('wb') as f:
+        f.write(b''.join(encoded))
+
+
+class _MappedStrings:
+    """ Memory-mapped dictionary of strings saved by '_save_strings'. """
+    def __init__(self, path: pathlib.Path, name: str) -> None:
+        self.offsets = np.load(file=str(path/f'{name}_offsets.npy'), mmap_mode='r')
+        size = int(self.offsets[-1])
+        self.data = np.memmap(str(path/f'{name}.bin'), dtype=np.uint8, mode='r') if size else np.zeros(0, np.uint8)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> str:
+        return self.data[int(self.offsets[i]):int(self.offsets[i + 1])].tobytes().decode('utf-8')
+
+    def decode(self, ids: np.ndarray) -> typing.List[str]:
+        return [self[i] for i in ids.tolist()]
+
+
+class ColumnarWriter:
+    """ Sharded columnar corpus writer. Tokens and NER-tags are encoded by shared dictionaries and every shard is
+    directory with ragged columns:
+        * tokens.npy - int32 token ids of all samples,
+        * tags.npy - int16 tag ids of all samples,
+        * offsets.npy - int64 start of every sample in columns (and total length at the end).
+    Dictionaries and 'manifest.json' (shards and their sizes) are written on close.\n\n
+    Usage example:\n
+    with ColumnarWriter(path='augmented') as writer:\n
+        writer.write(tokens_list=[['Москва']], tags_list=[['U-DMN_CITY']])\n
+    corpus = ColumnarCorpus(path='augmented')\n
+    print(corpus[0])\n
+    >>> (['Москва'], ['U-DMN_CITY'])
+    """
+    def __init__(self, path: typing.Union[str, pathlib.Path], shard_size: int = 100000) -> None:
+        """ Create 'ColumnarWriter' object class.
+
+        :param path: Output directory.
+        :param shard_size: Number of samples per shard.
+        :return:
+        """
+        self.path = pathlib.Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.shard_size = shard_size
+        self.tokens, self.tags = StringTable(), StringTable()
+        self.shards = list()
+        self._reset_buffer()
+
+    def _reset_buffer(self) -> None:
+        self.buffer_tokens, self.buffer_tags, self.buffer_lengths = list(), list(), list()
+
+    def write(self, tokens_list: typing.List[list], tags_list: typing.List[list]) -> None:
+        """ Append samples (full shards are flushed to disk).
+
+        :param tokens_list: Samples tokens.
+        :param tags_list: Samples NER-tags.
+        :return:
+        """
+        for tokens, tags in zip(tokens_list, tags_list):
+            if len(tokens) != len(tags):
+                raise ValueError(f'Number of tokens ({len(tokens)}) and tags ({len(tags)}) differ')
+            self.buffer_tokens += self.tokens.encode(values=tokens)
+            self.buffer_tags += self.tags.encode(values=tags)
+            self.buffer_lengths += [len(tokens)]
+            if len(self.buffer_lengths) >= self.shard_size:
+                self._flush()
+
+    def _flush(self) -> None:
+        if not self.buffer_lengths:
+            return
+        name = f'shard_{len(self.shards):05d}'
+        (self.path/name).mkdir(exist_ok=True)
+        offsets = np.zeros(len(self.buffer_lengths) + 1, dtype=np.int64)
+        np.cumsum(self.buffer_lengths, out=offsets[1:])
+        np.save(file=str(self.path/name/'tokens.npy'), arr=np.array(self.buffer_tokens, dtype=np.int32))
+        np.save(file=str(self.path/name/'tags.npy'), arr=np.array(self.buffer_tags, dtype=np.int16))
+        np.save(file=str(self.path/name/'offsets.npy'), arr=offsets)
+        self.shards += [{'name': name, 'samples': len(self.buffer_lengths), 'tokens': int(offsets[-1])}]
+        self._reset_buffer()
+
+    def close(self) -> None:
+        self._flush()
+        _save_strings(table=self.tokens, path=self.path, name='tokens')
+        _save_strings(table=self.tags, path=self.path, name='tags')
+        manifest = {
+            'shards': self.shards,
+            'samples': sum(shard['samples'] for shard in self.shards),
+            'tokens': sum(shard['tokens'] for shard in self.shards),
+            'dictionary_size': len(self.tokens),
+            'shard_size': self.shard_size,
+        }
+        with (self.path/MANIFEST).open('w') as f:
+            json.dump(manifest, f, indent=2)
+
+    def __enter__(self) -> 'ColumnarWriter':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+class ColumnarCorpus:
+    """ Memory-mapped reader of corpus written by 'ColumnarWriter' with random access to samples. Shards are mapped on
+    first access, tokens are decoded only for requested samples. """
+    def __init__(self, path: typing.Union[str, pathlib.Path]) -> None:
+        """ Create 'ColumnarCorpus' object class.
+
+        :param path: Corpus directory.
+        :return:
+        """
+        self.path = pathlib.Path(path)
+        with (self.path/MANIFEST).open('r') as f:
+            self.manifest = json.load(f)
+        self.tokens = _MappedStrings(path=self.path, name='tokens')
+        self.tags = _MappedStrings(path=self.path, name='tags')
+        self.starts = np.cumsum([0] + [shard['samples'] for shard in self.manifest['shards']]).tolist()
+        self._shards = dict()
+
+    def __len__(self) -> int:
+        return self.manifest['samples']
+
+    def _shard(self, i: int) -> typing.Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        if i not in self._shards:
+            path = self.path/self.manifest['shards'][i]['name']
+            self._shards[i] = tuple(np.load(file=str(path/f'{column}.npy'), mmap_mode='r')
+                                    for column in ['tokens', 'tags', 'offsets'])
+        return self._shards[i]
+
+    def ids(self, i: int) -> typing.Tuple[np.ndarray, np.ndarray]:
+        """ Get sample as ids of dictionaries (without decoding).
+
+        :param i: Sample index.
+        :return: Token ids and tag ids.
+        """
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(f'Sample index {i} is out of range')
+        shard = bisect.bisect_right(self.starts, i) - 1
+        tokens, tags, offsets = self._shard(i=shard)
+        start, end = offsets[i - self.starts[shard]], offsets[i - self.starts[shard] + 1]
+        return tokens[start:end], tags[start:end]
+
+    def __getitem__(self, i: int) -> typing.Tuple[list, list]:
+        token_ids, tag_ids = self.ids(i=i)
+        return self.tokens.decode(ids=token_ids), self.tags.decode(ids=tag_ids)
+
+    def __iter__(self) -> typing.Iterator[typing.Tuple[list, list]]:
+        for i in range(len(self)):
+            yield self[i]
+
+
+def convert_corpus(
+        input_path: typing.Union[str, pathlib.Path],
+        output_path: typing.Union[str, pathlib.Path],
+        shard_size: int = 100000,
+        input_format: str = None,
+) -> int:
+    """ Convert corpus file (csv, jsonl, conll) to columnar corpus.
+
+    :param input_path: Path to input corpus.
+    :param output_path: Output directory.
+    :param shard_size: Number of samples per shard.
+    :param input_format: Input corpus format (if None, then it's detected by file extension).
+    :return: Number of samples.
+    """
+    n = 0
+    with ColumnarWriter(path=output_path, shard_size=shard_size) as writer:
+        for tokens, tags in read_corpus(path=input_path, corpus_format=input_format):
+            writer.write(tokens_list=[tokens], tags_list=[tags])
+            n += 1
+    return n
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Convert corpus (csv, jsonl, conll) to sharded columnar corpus.')
+    parser.add_argument('input', help='Path to input corpus.')
+    parser.add_argument('output', help='Output directory.')
+    parser.add_argument('--shard-size', type=int, default=100000, help='Number of samples per shard.')
+    parser.add_argument('--input-format', default=None, help='Input corpus format (default: by extension).')
+    args = parser.parse_args()
+    convert_corpus(input_path=args.input, output_path=args.output, shard_size=args.shard_size,
+                   input_format=args.input_format)
@@ -0,0 +1,136 @@
+import typing, os, ast, csv, json, pathlib
+
+FORMATS = ['csv', 'jsonl', 'conll']
+
+
+def detect_format(path: typing.Union[str, pathlib.Path]) -> str:
+    """ Detect corpus format by file extension ('.csv', '.jsonl', '.conll').
+
+    :param path: Path to corpus file.
+    :return: Corpus format.
+    """
+    suffix = pathlib.Path(path).suffix.lstrip('.').lower()
+    if suffix in ['json', 'ndjson']:
+        suffix = 'jsonl'
+    if suffix in ['conllu', 'txt']:
+        suffix = 'conll'
+    if suffix not in FORMATS:
+        raise ValueError(f'Unknown corpus format of file {path}, it must be one of: {FORMATS}')
+    return suffix
+
+
+def read_corpus(
+        path: typing.Union[str, pathlib.Path],
+        corpus_format: str = None,
+        skip: int = 0,
+        tokens_column: str = 'tokens',
+        tags_column: str = 'ner_tags',
+) -> typing.Iterator[typing.Tuple[list, list]]:
+    """ Read corpus lazily sample by sample. Supported formats:
+        * csv - columns with python list literals (like 'ner_samples.csv'),
+        * jsonl - one json object with tokens and tags lists per line,
+        * conll - one token and tag (the last column) per line, samples are separated by empty line.
+
+    :param path: Path to corpus file.
+    :param corpus_format: Corpus format (if None, then it's detected by file extension).
+    :param skip: Number of samples to skip from start (they aren't parsed).
+    :param tokens_column: Tokens column/key name (csv and jsonl).
+    :param tags_column: NER-tags column/key name (csv and jsonl).
+    :return: Iterator of pairs tokens and NER-tags.
+    """
+    corpus_format = corpus_format if corpus_format is not None else detect_format(path=path)
+    with open(str(path), 'r', encoding='utf-8', newline='' if corpus_format == 'csv' else None) as reader:
+        if corpus_format == 'csv':
+            for i, row in enumerate(csv.DictReader(reader)):
+                if i >= skip:
+                    yield ast.literal_eval(row[tokens_column]), ast.literal_eval(row[tags_column])
+        if corpus_format == 'jsonl':
+            i = 0
+            for line in reader:
+                if line.strip():
+                    if i >= skip:
+                        sample = json.loads(line)
+                        yield sample[tokens_column], sample[tags_column]
+                    i += 1
+        if corpus_format == 'conll':
+            i, tokens, tags = 0, list(), list()
+            for line in reader:
+                columns = line.split()
+                if columns:
+                    tokens += [columns[0]]
+                    tags += [columns[-1]]
+                elif tokens:
+                    if i >= skip:
+                        yield tokens, tags
+                    i, tokens, tags = i + 1, list(), list()
+            if tokens and i >= skip:
+                yield tokens, tags
+
+
+class CorpusWriter:
+    """ Incremental corpus writer (formats are the same as in 'read_corpus'). Samples are appended to file and flushed
+    after every 'write' call, so memory usage doesn't depend on corpus size.\n\n
+    Usage example:\n
+    with CorpusWriter(path='out.jsonl') as writer:\n
+        writer.write(tokens_list=[['Москва']], tags_list=[['U-DMN_CITY']])
+    """
+    def __init__(
+            self,
+            path: typing.Union[str, pathlib.Path],
+            corpus_format: str = None,
+            append: bool = False,
+            tokens_column: str = 'tokens',
+            tags_column: str = 'ner_tags',
+            header: bool = True,
+    ) -> None:
+        """ Create 'CorpusWriter' object class.
+
+        :param path: Path to output file.
+        :param corpus_format: Corpus format (if None, then it's detected by file extension).
+        :param append: Append samples to existing file (otherwise file is rewritten).
+        :param tokens_column: Tokens column/key name (csv and jsonl).
+        :param tags_column: NER-tags column/key name (csv and jsonl).
+        :param header: Write csv header to new file (False for part of corpus which is concatenated to other part).
+        :return:
+        """
+        self.corpus_format = corpus_format if corpus_format is not None else detect_format(path=path)
+        self.tokens_column, self.tags_column = tokens_column, tags_column
+        is_new = not append or not pathlib.Path(path).exists() or pathlib.Path(path).stat().st_size == 0
+        self.writer = open(str(path), 'a' if append else 'w', encoding='utf-8',
+                           newline='' if self.corpus_format == 'csv' else None)
+        self.csv_writer = csv.writer(self.writer) if self.corpus_format == 'csv' else None
+        if self.corpus_format == 'csv' and is_new and header:
+            self.csv_writer.writerow([tokens_column, tags_column])
+
+    def write(self, tokens_list: typing.List[list], tags_list: typing.List[list]) -> None:
+        """ Append samples to file.
+
+        :param tokens_list: Samples tokens.
+        :param tags_list: Samples NER-tags.
+        :return:
+        """
+        for tokens, tags in zip(tokens_list, tags_list):
+            if self.corpus_format == 'csv':
+                self.csv_writer.writerow([str(list(tokens)), str(list(tags))])
+            if self.corpus_format == 'jsonl':
+                self.writer.write(json.dumps({self.tokens_column: list(tokens), self.tags_column: list(tags)},
+                                             ensure_ascii=False) + '\n')
+            if self.corpus_format == 'conll':
+                self.writer.write(''.join(f'{token}\t{tag}\n' for token, tag in zip(tokens, tags)) + '\n')
+        self.writer.flush()
+
+    def tell(self) -> int:
+        """ Get current size of written file (in bytes).
+
+        :return: File position.
+        """
+        return os.fstat(self.writer.fileno()).st_size
+
+    def close(self) -> None:
+        self.writer.close()
+
+    def __enter__(self) -> 'CorpusWriter':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
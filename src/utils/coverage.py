@@ -0,0 +1,110 @@
+import typing, collections
+import numpy as np
+
+from src import CONFIGS
+from src.attrs.attributes import TAG_MAP
+from src.utils.tag_vocab import TAG_VOCAB, PREFIXES
+from src.utils.vocab import VOCAB_FILES, load_vocab
+
+
+class CoverageTracker:
+    """ Counters of generated data against coverage targets: minimum number of entities per output tag (for example,
+    'DMN_CITY'), minimum number of distinct drawn entries per vocab (for example, 'CITIES') and minimum number of
+    entities per inflection case (for example, 'gent'). Vocab draws are observed by 'RUNERAugmentor' (see its 'coverage'
+    argument), entities and cases are observed per augmented sample.\n\n
+    Usage example:\n
+    tracker = CoverageTracker(tags={'DMN_CITY': 10}, vocabs={'CITIES': 5}, cases={'gent': 3})\n
+    aug = RUNERAugmentor(coverage=tracker)\n
+    ...\n
+    print(tracker.done(), tracker.report())
+    """
+    def __init__(
+            self,
+            tags: typing.Dict[str, int] = None,
+            vocabs: typing.Dict[str, int] = None,
+            cases: typing.Dict[str, int] = None,
+    ) -> None:
+        """ Create 'CoverageTracker' object class.
+
+        :param tags: Minimum number of entities per output tag (if None, then targets from configs are used).
+        :param vocabs: Minimum number of distinct entries per vocab, it's capped by vocab size (if None, then targets
+        from configs are used).
+        :param cases: Minimum number of entities per inflection case (if None, then targets from configs are used).
+        :return:
+        """
+        tags = tags if tags is not None else CONFIGS['coverage']['tags']
+        vocabs = vocabs if vocabs is not None else CONFIGS['coverage']['vocabs']
+        cases = cases if cases is not None else CONFIGS['coverage']['cases']
+        tag_names = [TAG_MAP.get(label, label) for label in TAG_VOCAB.labels]
+        unknown = sorted(set(tags) - set(tag_names)) + sorted(set(vocabs) - set(VOCAB_FILES))
+        if unknown:
+            raise ValueError(f'Unknown coverage targets: {unknown}')
+        self.tag_targets = {tag: tags[tag] for tag in tag_names if tags.get(tag, 0) > 0}
+        self.vocab_targets = {name: min(n, len(load_vocab(name=name))) for name, n in vocabs.items() if n > 0}
+        self.case_targets = {case: n for case, n in cases.items() if n > 0}
+        # Output tag of every id and flag of entity start (B or U prefix):
+        self._tag_of = np.array([None] + [name for name in tag_names for _ in PREFIXES], dtype=object)
+        self._is_start = np.array([False] + [prefix in ['B', 'U'] for _ in tag_names for prefix in PREFIXES])
+        self.tag_counts = collections.Counter()
+        self.vocab_seen = {name: set() for name in self.vocab_targets}
+        self.case_counts = collections.Counter()
+        self.samples = 0
+
+    def observe_vocab(self, vocab: str, entry: str) -> None:
+        """ Count drawn vocab entry.
+
+        :param vocab: Vocab name.
+        :param entry: Vocab entry.
+        :return:
+        """
+        seen = self.vocab_seen.get(vocab)
+        if seen is not None:
+            seen.add(entry)
+
+    def observe_sample(self, ids: np.ndarray, cases: typing.List[str]) -> None:
+        """ Count entities and inflection cases of augmented sample.
+
+        :param ids: Ids of BIOLU sub-tags of sample.
+        :param cases: Inflection cases of replaced spans.
+        :return:
+        """
+        self.tag_counts.update(self._tag_of[ids[self._is_start[ids]]].tolist())
+        self.case_counts.update(cases)
+        self.samples += 1
+
+    def deficit(self, kind: str, key: str) -> float:
+        """ Get missing share of target.
+
+        :param kind: Target kind: 'tag', 'vocab' or 'case'.
+        :param key: Output tag, vocab name or inflection case.
+        :return: Missing share (0 if target is met or isn't set, 1 if nothing is counted).
+        """
+        if kind == 'tag':
+            target, count = self.tag_targets.get(key), self.tag_counts[key]
+        elif kind == 'vocab':
+            target, count = self.vocab_targets.get(key), len(self.vocab_seen.get(key, ()))
+        else:
+            target, count = self.case_targets.get(key), self.case_counts[key]
+        return max(0.0, 1.0 - count / target) if target else 0.0
+
+    def done(self) -> bool:
+        """ Check that all targets are met.
+
+        :return: True if all targets are met.
+        """
+        return all(self.tag_counts[tag] >= n for tag, n in self.tag_targets.items()) and \
+            all(len(self.vocab_seen[name]) >= n for name, n in self.vocab_targets.items()) and \
+            all(self.case_counts[case] >= n for case, n in self.case_targets.items())
+
+    def report(self) -> dict:
+        """ Get progress of targets.
+
+        :return: Number of observed samples and counts with targets for tags, vocabs and cases.
+        """
+        return {
+            'samples': self.samples,
+            'done': self.done(),
+            'tags': {tag: (self.tag_counts[tag], n) for tag, n in self.tag_targets.items()},
+            'vocabs': {name: (len(self.vocab_seen[name]), n) for name, n in self.vocab_targets.items()},
+            'cases': {case: (self.case_counts[case], n) for case, n in self.case_targets.items()},
+        }
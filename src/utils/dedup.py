@@ -0,0 +1,207 @@
+import copy, math, typing, hashlib
+import numpy as np
+
+from src import CONFIGS
+
+LEVELS = ['entity', 'sentence']
+
+
+class BloomFilter:
+    """ Bloom filter of strings with bounded memory. Number of bits and hash functions are chosen for expected number of
+    keys and false-positive rate (bits are capped by memory limit, then false-positive rate is higher). Filters with the
+    same size can be merged (union of key sets).\n\n
+    Usage example:\n
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)\n
+    print(bloom.add('Иванов Иван'), bloom.add('Иванов Иван'))\n
+    >>> True False
+    """
+    def __init__(self, capacity: int, error_rate: float = 0.001, max_bytes: int = None) -> None:
+        """ Create 'BloomFilter' object class.
+
+        :param capacity: Expected number of keys.
+        :param error_rate: False-positive rate for expected number of keys.
+        :param max_bytes: Memory limit of bit array (if None, then memory isn't limited).
+        :return:
+        """
+        n_bits = max(8, int(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)))
+        if max_bytes is not None:
+            n_bits = min(n_bits, max_bytes * 8)
+        self.n_bytes = (n_bits + 7) // 8
+        self.n_bits = self.n_bytes * 8
+        self.n_hashes = max(1, int(round(self.n_bits / max(capacity, 1) * math.log(2))))
+        self.bits = bytearray(self.n_bytes)
+        self.n_added = 0
+
+    def _positions(self, key: str) -> typing.List[int]:
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1, h2 = int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.n_bits for i in range(self.n_hashes)]
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[p >> 3] & (1 << (p & 7)) for p in self._positions(key=key))
+
+    def add(self, key: str) -> bool:
+        """ Add key to filter.
+
+        :param key: Key.
+        :return: True if key is new (False if it's probably added earlier).
+        """
+        is_new = False
+        for p in self._positions(key=key):
+            if not self.bits[p >> 3] & (1 << (p & 7)):
+                self.bits[p >> 3] |= 1 << (p & 7)
+                is_new = True
+        self.n_added += is_new
+        return is_new
+
+    def update(self, other: 'BloomFilter') -> None:
+        """ Merge other filter into this one (bitwise OR).
+
+        :param other: Filter with the same number of bits and hash functions.
+        :return:
+        """
+        if (other.n_bits, other.n_hashes) != (self.n_bits, self.n_hashes):
+            raise ValueError('Only filters with the same number of bits and hash functions can be merged')
+        self.bits = bytearray(np.bitwise_or(np.frombuffer(self.bits, dtype=np.uint8),
+                                            np.frombuffer(other.bits, dtype=np.uint8)).tobytes())
+        self.n_added += other.n_added
+
+    def cardinality(self) -> float:
+        """ Estimate number of unique keys by number of set bits.
+
+        :return: Estimated number of keys.
+        """
+        n_set = int(np.unpackbits(np.frombuffer(self.bits, dtype=np.uint8)).sum())
+        if n_set >= self.n_bits:
+            return float('inf')
+        return -self.n_bits / self.n_hashes * math.log(1 - n_set / self.n_bits)
+
+    def error_rate(self) -> float:
+        """ Estimate current false-positive rate.
+
+        :return: False-positive rate.
+        """
+        n_set = int(np.unpackbits(np.frombuffer(self.bits, dtype=np.uint8)).sum())
+        return (n_set / self.n_bits) ** self.n_hashes
+
+    def save(self, path: str) -> None:
+        """ Save filter to '.npz' file.
+
+        :param path: Path to file.
+        :return:
+        """
+        np.savez(str(path), bits=np.frombuffer(self.bits, dtype=np.uint8),
+                 meta=np.array([self.n_bits, self.n_hashes, self.n_added], dtype=np.int64))
+
+    @classmethod
+    def load(cls, path: str) -> 'BloomFilter':
+        """ Load filter from '.npz' file.
+
+        :param path: Path to file.
+        :return: Filter.
+        """
+        data = np.load(str(path))
+        bloom = cls.__new__(cls)
+        bloom.n_bits, bloom.n_hashes, bloom.n_added = [int(v) for v in data['meta']]
+        bloom.n_bytes = bloom.n_bits // 8
+        bloom.bits = bytearray(data['bits'].tobytes())
+        return bloom
+
+
+class Deduplicator:
+    """ Uniqueness guard for generated entities or whole augmented sentences. Keys are tracked by Bloom filter, on
+    collision 'RUNERAugmentor' re-draws entity (or sentence) up to retry budget, after that duplicate is accepted.
+    Counters show how many draws collided and how many were accepted as duplicates.\n\n
+    Usage example:\n
+    aug = RUNERAugmentor(dedup=Deduplicator(level='entity'))\n
+    aug.augment_corpus(tokens_list=tokens, tags_list=tags)\n
+    print(aug.dedup.stats())
+    """
+    def __init__(
+            self,
+            level: str = CONFIGS['dedup']['level'],
+            capacity: int = CONFIGS['dedup']['capacity'],
+            error_rate: float = CONFIGS['dedup']['error_rate'],
+            max_bytes: int = CONFIGS['dedup']['max_bytes'],
+            retries: int = CONFIGS['dedup']['retries'],
+    ) -> None:
+        """ Create 'Deduplicator' object class.
+
+        :param level: What is unique: 'entity' (generated entity string) or 'sentence' (whole augmented sentence).
+        :param capacity: Expected number of keys.
+        :param error_rate: False-positive rate of filter for expected number of keys.
+        :param max_bytes: Memory limit of filter.
+        :param retries: Max number of re-draws on collision.
+        :return:
+        """
+        if level not in LEVELS:
+            raise ValueError(f'Unknown dedup level: {level}. Possible levels: {LEVELS}')
+        self.level, self.retries = level, retries
+        self.bloom = BloomFilter(capacity=capacity, error_rate=error_rate, max_bytes=max_bytes)
+        self.checked, self.collisions, self.accepted_duplicates, self.cross_shard_duplicates = 0, 0, 0, 0
+
+    @staticmethod
+    def key(tokens: typing.List[str]) -> str:
+        return '\x1f'.join(tokens)
+
+    def check(self, tokens: typing.List[str], attempt: int) -> bool:
+        """ Add tokens to filter and decide whether they are accepted.
+
+        :param tokens: Tokens of entity or sentence.
+        :param attempt: Number of draw (starting from 0).
+        :return: True if tokens are new or retry budget is exhausted.
+        """
+        self.checked += 1
+        if self.bloom.add(key=self.key(tokens=tokens)):
+            return True
+        self.collisions += 1
+        if attempt >= self.retries:
+            self.accepted_duplicates += 1
+            return True
+        return False
+
+    def fork(self) -> 'Deduplicator':
+        """ Copy deduplicator with the same filter and zero counters (for example, for shard, so keys added before are
+        avoided by all shards).
+
+        :return: Copy.
+        """
+        forked = copy.deepcopy(self)
+        forked.checked, forked.collisions, forked.accepted_duplicates, forked.cross_shard_duplicates = 0, 0, 0, 0
+        return forked
+
+    def update(self, other: 'Deduplicator') -> None:
+        """ Merge filter and counters of other deduplicator (for example, of shard forked from this one). Keys accepted
+        by other deduplicator which were already added to this one are counted as cross-shard duplicates (estimate).
+
+        :param other: Deduplicator with the same filter size.
+        :return:
+        """
+        before = self.bloom.cardinality()
+        self.bloom.update(other=other.bloom)
+        added = self.bloom.cardinality() - before
+        self.checked += other.checked
+        self.collisions += other.collisions
+        self.accepted_duplicates += other.accepted_duplicates
+        self.cross_shard_duplicates += other.cross_shard_duplicates + \
+            max(0, int(round(other.checked - other.collisions - added)))
+
+    def stats(self) -> dict:
+        """ Get counters.
+
+        :return: Checked keys, collisions (re-draws and accepted duplicates), re-draws, accepted duplicates, estimated
+        duplicates between merged shards, collision rate, estimated unique keys, filter size and estimated
+        false-positive rate.
+        """
+        return {
+            'level': self.level,
+            'checked': self.checked,
+            'collisions': self.collisions,
+            'retries': self.collisions - self.accepted_duplicates,
+            'accepted_duplicates': self.accepted_duplicates,
+            'cross_shard_duplicates': self.cross_shard_duplicates,
+            'collision_rate': self.collisions / self.checked if self.checked else 0.0,
+            'unique_estimate': self.bloom.cardinality(),
+            'filter_bytes': self.bloom.n_bytes,
+            'error_rate_estimate': self.bloom.error_rate(),
+        }
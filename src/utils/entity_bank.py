@@ -0,0 +1,264 @@
+import typing, json, random, pathlib, argparse, threading, collections
+import numpy as np
+
+from src import CONFIGS
+from src.attrs.attributes import INPUT_TAG_MAP
+from src.utils.corpus_io import read_corpus
+
+
+class EntityBank:
+    """ Pools of pre-generated (finished, inflected and tagged) entities keyed by entity type and inflecting tags (see
+    'RUNERAugmentor.detect_case'). Draw from pool is O(1). Every entity can be drawn at most 'reuse_limit' times, then
+    it's removed from pool. Pools below low-water mark are refilled by background thread (or in place if background
+    refilling is disabled, then draws are reproducible for the same seed). Bank can be saved to disk and loaded for
+    warm start of workers. Background thread is stopped by 'close' (or on exit from 'with' block).\n\n
+    Usage example:\n
+    with EntityBank() as bank:\n
+        aug = RUNERAugmentor(entity_bank=bank)\n
+        print(aug.augment(s='Москве', tag='LOC'))\n
+        print(bank.stats())
+    """
+    def __init__(
+            self,
+            pool_size: int = CONFIGS['entity_bank']['pool_size'],
+            low_water: int = CONFIGS['entity_bank']['low_water'],
+            reuse_limit: int = CONFIGS['entity_bank']['reuse_limit'],
+            generator: typing.Any = None,
+            background: bool = True,
+            seed: int = None,
+            inflection_mode: str = 'morph',
+    ) -> None:
+        """ Create 'EntityBank' object class.
+
+        :param pool_size: Number of entities generated per pool refill.
+        :param low_water: Pool is refilled when number of its entities falls below this value.
+        :param reuse_limit: Max number of draws of one entity.
+        :param generator: Augmentor which generates entities (if None, then new 'RUNERAugmentor' is created).
+        :param background: Refill pools in background thread (otherwise pools are refilled in place on draw).
+        :param seed: Seed for generator (if None, then seed from configs is used).
+        :param inflection_mode: Inflection source of created generator (see 'RUNERAugmentor').
+        :return:
+        """
+        if generator is None:
+            from src.augmentor import RUNERAugmentor
+            generator = RUNERAugmentor(seed=seed, inflection_mode=inflection_mode)
+        self.generator = generator
+        self.pool_size, self.low_water, self.reuse_limit = pool_size, max(low_water, 1), reuse_limit
+        self.pools = dict()
+        self.draws, self.generated, self.misses, self.refills, self.retired = 0, 0, 0, 0, 0
+        # Pools lock and generator lock (generator isn't thread-safe), pools aren't locked while entities are generated:
+        self._lock, self._generator_lock = threading.Lock(), threading.Lock()
+        self._queue, self._queued, self._thread = collections.deque(), set(), None
+        self._wakeup, self._stop = threading.Condition(lock=threading.Lock()), threading.Event()
+        self.background = background
+        if background:
+            self._thread = threading.Thread(target=self._refill_loop, name='EntityBankRefill', daemon=True)
+            self._thread.start()
+
+    def _generate(self, key: tuple, n: int) -> typing.List[list]:
+        """ Generate entities for pool.
+
+        :param key: Entity type and inflecting tags.
+        :param n: Number of entities.
+        :return: Entities (tokens, tags ids and number of draws).
+        """
+        entities = list()
+        with self._generator_lock:
+            for tokens, ids in self.generator.generate_augmentation_batch(entity=key[0], inflecting_tags=key[1], n=n):
+                ids.flags.writeable = False
+                entities += [[tokens, ids, 0]]
+            self.generated += n
+        return entities
+
+    def reseed(self, seed: int) -> None:
+        """ Reset random generators of generator (for example, per shard, so banks of workers generate different
+        entities).
+
+        :param seed: Seed value.
+        :return:
+        """
+        with self._generator_lock:
+            self.generator.reseed(seed=seed)
+
+    def _refill(self, key: tuple) -> None:
+        with self._lock:
+            n = self.pool_size - len(self.pools.get(key, list()))
+        if n > self.pool_size - self.low_water:
+            entities = self._generate(key=key, n=n)
+            with self._lock:
+                self.pools.setdefault(key, list()).extend(entities)
+                self.refills += 1
+
+    def _refill_loop(self) -> None:
+        while True:
+            with self._wakeup:
+                while not self._queue and not self._stop.is_set():
+                    self._wakeup.wait()
+                if self._stop.is_set():
+                    return
+                key = self._queue.popleft()
+            self._refill(key=key)
+            with self._wakeup:
+                self._queued.discard(key)
+
+    def _schedule(self, key: tuple) -> None:
+        with self._wakeup:
+            if key not in self._queued:
+                self._queued.add(key)
+                self._queue.append(key)
+                self._wakeup.notify()
+
+    def warm(self, entities: typing.Iterable[str], inflecting_tags_list: typing.Iterable[tuple]) -> None:
+        """ Fill pools for all pairs of entity types and inflecting tags in place.
+
+        :param entities: Entity types.
+        :param inflecting_tags_list: Inflecting tags.
+        :return:
+        """
+        inflecting_tags_list = list(inflecting_tags_list)
+        for entity in entities:
+            for inflecting_tags in inflecting_tags_list:
+                self._refill(key=(entity, tuple(inflecting_tags)))
+
+    def warm_from_corpus(self, samples: typing.Iterable[typing.Tuple[list, list]]) -> None:
+        """ Fill pools in place for inflecting tags of PER and LOC spans of corpus (with all location entity types).
+
+        :param samples: Iterator of pairs tokens and NER-tags (BIO or BIOLU format).
+        :return:
+        """
+        from src.augmentor import LOC_ENTITIES
+        for tokens, tags in samples:
+            for span in self.generator.group_spans(tags=tags):
+                with self._generator_lock:
+                    inflecting_tags = self.generator.detect_case(s=self.generator._span_head(
+                        tokens=tokens[span[0]:span[1]]))
+                entities = ['full_name'] if span[2] == INPUT_TAG_MAP['PERSON'] else LOC_ENTITIES
+                self.warm(entities=entities, inflecting_tags_list=[inflecting_tags])
+
+    def draw(
+            self,
+            entity: str,
+            inflecting_tags: typing.Tuple[str, str, str, str],
+            rng: random.Random = None,
+    ) -> typing.Tuple[list, np.ndarray]:
+        """ Draw random entity from pool (see 'RUNERAugmentor.generate_augmentation_ids').
+
+        :param entity: Entity type.
+        :param inflecting_tags: Inflecting tags.
+        :param rng: Random generator (if None, then global 'random' state is used).
+        :return: Tokens and ids of BIOLU sub-tags.
+        """
+        rng = random if rng is None else rng
+        key = (entity, tuple(inflecting_tags))
+        while True:
+            with self._lock:
+                pool = self.pools.setdefault(key, list())
+                if pool:
+                    self.draws += 1
+                    i = rng.randrange(len(pool))
+                    item = pool[i]
+                    item[2] += 1
+                    if item[2] >= self.reuse_limit:
+                        # Swap with the last entity and remove it in O(1):
+                        pool[i] = pool[-1]
+                        pool.pop()
+                        self.retired += 1
+                    size = len(pool)
+                    break
+                self.misses += 1
+            # Cold pool is filled in place (with one entity if pools are refilled in background):
+            entities = self._generate(key=key, n=self.pool_size if not self.background else 1)
+            with self._lock:
+                self.pools[key].extend(entities)
+        if size < self.low_water:
+            if self.background:
+                self._schedule(key=key)
+            else:
+                self._refill(key=key)
+        return list(item[0]), item[1]
+
+    def close(self) -> None:
+        """ Stop background refilling (pools are refilled in place after that).
+
+        :return:
+        """
+        with self._wakeup:
+            self._stop.set()
+            self._wakeup.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.background = False
+
+    def __enter__(self) -> 'EntityBank':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return sum(len(pool) for pool in self.pools.values())
+
+    def stats(self) -> dict:
+        """ Get bank counters.
+
+        :return: Number of pools and entities, draws, misses (draws from empty pool), hit rate, generated entities,
+        refills and retired (reached reuse limit) entities.
+        """
+        with self._lock:
+            return {
+                'pools': len(self.pools),
+                'entities': len(self),
+                'draws': self.draws,
+                'misses': self.misses,
+                'hit_rate': 1 - self.misses / self.draws if self.draws else 0.0,
+                'generated': self.generated,
+                'refills': self.refills,
+                'retired': self.retired,
+            }
+
+    def save(self, path: typing.Union[str, pathlib.Path]) -> None:
+        """ Save pools to JSON file.
+
+        :param path: Path to file.
+        :return:
+        """
+        with self._lock:
+            pools = [
+                {'entity': key[0], 'inflecting_tags': list(key[1]),
+                 'entities': [[tokens, ids.tolist(), uses] for tokens, ids, uses in pool]}
+                for key, pool in self.pools.items()
+            ]
+        with open(str(path), 'w', encoding='utf-8') as f:
+            json.dump({'pools': pools}, f, ensure_ascii=False)
+
+    def load(self, path: typing.Union[str, pathlib.Path]) -> None:
+        """ Load pools from JSON file (they are added to current pools).
+
+        :param path: Path to file.
+        :return:
+        """
+        with open(str(path), 'r', encoding='utf-8') as f:
+            pools = json.load(f)['pools']
+        with self._lock:
+            for pool in pools:
+                key = (pool['entity'], tuple(pool['inflecting_tags']))
+                for tokens, ids, uses in pool['entities']:
+                    ids = np.array(ids, dtype=np.int32)
+                    ids.flags.writeable = False
+                    self.pools.setdefault(key, list()).append([tokens, ids, uses])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Pre-generate entity bank for inflecting tags of corpus spans.')
+    parser.add_argument('input', help='Path to corpus (csv, jsonl or conll).')
+    parser.add_argument('output', help='Path to output bank file (json).')
+    parser.add_argument('--pool-size', type=int, default=CONFIGS['entity_bank']['pool_size'])
+    parser.add_argument('--seed', type=int, default=CONFIGS['seed'], help='Seed of generator.')
+    parser.add_argument('--inflection-mode', default='morph', choices=['morph', 'table'])
+    args = parser.parse_args()
+    with EntityBank(pool_size=args.pool_size, background=False, seed=args.seed,
+                    inflection_mode=args.inflection_mode) as bank:
+        bank.warm_from_corpus(samples=read_corpus(path=args.input))
+        bank.save(path=args.output)
+        print(bank.stats())
@@ -0,0 +1,133 @@
+import typing, json, pathlib, argparse, itertools
+import numpy as np
+import marisa_trie
+
+from src import DIR_VOCABS
+from src.attrs.attributes import REPLACEMENT_MAP
+from src.utils.morphology import CachedMorphAnalyzer
+from src.utils.vocab import VOCAB_FILES, load_vocab
+
+DIR_INFLECTIONS = DIR_VOCABS/'inflections'
+
+# Grammemes grid which can be produced by 'RUNERAugmentor.detect_case' for vocab entities:
+POS = ['NOUN', 'ADJF']
+CASES = ['nomn', 'gent', 'datv', 'accs', 'ablt', 'loct', 'voct', 'gen2', 'acc2', 'loc2']
+GENDERS = ['masc', 'femn']
+NUMBERS = ['sing', 'plur']
+
+
+def vocab_tokens() -> typing.List[str]:
+    """ Collect all tokens of vocab entries (and abbreviations from replacement map).
+
+    :return: Sorted unique tokens.
+    """
+    tokens = set()
+    for name in VOCAB_FILES:
+        for key in load_vocab(name=name).keys():
+            tokens.update(filter(None, key.split(' ')))
+    for label in REPLACEMENT_MAP:
+        for rplcmnt in REPLACEMENT_MAP[label]:
+            tokens.update(filter(None, rplcmnt[1].split(' ')))
+            tokens.update(filter(None, rplcmnt[1].replace('.', '').split(' ')))
+    return sorted(tokens)
+
+
+def build_inflection_table(
+        out_dir: typing.Union[str, pathlib.Path] = DIR_INFLECTIONS,
+        tokens: typing.List[str] = None,
+        morph: CachedMorphAnalyzer = None,
+) -> None:
+    """ Precompute surface forms of tokens for every grammemes combination from grid (POS x case x gender x number)
+    and save them to directory:
+        * tokens.marisa - trie of tokens (row = token id),
+        * forms.marisa - trie of surface forms (value = form id),
+        * table.npy - int32 matrix [tokens x combinations] of form ids (-1 - token can't be inflected),
+        * meta.json - grammemes combinations (columns of table).
+
+    :param out_dir: Output directory.
+    :param tokens: Tokens for precomputing (if None, then all vocab tokens are used).
+    :param morph: Morphology analyzer (if None, then new one is created).
+    :return:
+    """
+    out_dir = pathlib.Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    analyzer = (morph if morph is not None else CachedMorphAnalyzer(maxsize=1)).analyzer
+    tokens_trie = marisa_trie.Trie(tokens if tokens is not None else vocab_tokens())
+    combinations = list(itertools.product(POS, CASES, GENDERS, NUMBERS))
+    table = np.full(shape=(len(tokens_trie), len(combinations)), fill_value=-1, dtype=np.int32)
+    forms = dict()
+    for token_id in range(len(tokens_trie)):
+        p = analyzer.parse(word=tokens_trie.restore_key(token_id))[0]
+        for i, combination in enumerate(combinations):
+            inflected = p.inflect(required_grammemes=set(combination))
+            if inflected is not None:
+                table[token_id, i] = forms.setdefault(inflected.word, len(forms))
+    # Remap form ids to ids of forms trie:
+    forms_trie = marisa_trie.Trie(list(forms))
+    remap = np.array([forms_trie[form] for form in forms] + [-1], dtype=np.int32)
+    table = remap[table]
+    tokens_trie.save(str(out_dir/'tokens.marisa'))
+    forms_trie.save(str(out_dir/'forms.marisa'))
+    np.save(file=str(out_dir/'table.npy'), arr=table)
+    with (out_dir/'meta.json').open('w') as f:
+        json.dump({'combinations': combinations}, f)
+
+
+class InflectionTable:
+    """ Precomputed (memory-mapped) inflection tables for vocab tokens (see 'build_inflection_table'). Has the same
+    'inflect' interface as 'CachedMorphAnalyzer', so it can replace analyzer in 'RUNERAugmentor' ('table' mode).
+    Tokens or grammemes combinations which are absent in table are inflected by fallback analyzer (if it's set).\n\n
+    Usage example:\n
+    table = InflectionTable()\n
+    print(table.inflect(word='Москва', grammemes={'NOUN', 'datv', 'femn', 'sing'}))\n
+    >>> москве
+    """
+    def __init__(
+            self,
+            path: typing.Union[str, pathlib.Path] = DIR_INFLECTIONS,
+            fallback: CachedMorphAnalyzer = None,
+    ) -> None:
+        """ Create 'InflectionTable' object class.
+
+        :param path: Directory with built tables.
+        :param fallback: Analyzer for tokens which are absent in table (if None, then such tokens aren't inflected).
+        :return:
+        """
+        path = pathlib.Path(path)
+        self.tokens = marisa_trie.Trie().mmap(str(path/'tokens.marisa'))
+        self.forms = marisa_trie.Trie().mmap(str(path/'forms.marisa'))
+        self.table = np.load(file=str(path/'table.npy'), mmap_mode='r')
+        with (path/'meta.json').open('r') as f:
+            self.columns = {frozenset(combination): i for i, combination in enumerate(json.load(f)['combinations'])}
+        self.fallback = fallback
+        self.hits, self.misses = 0, 0
+
+    def inflect(self, word: str, grammemes: typing.Iterable[str]) -> typing.Optional[str]:
+        """ Inflect word to required grammemes by lookup in table.
+
+        :param word: Input word.
+        :param grammemes: Required grammemes.
+        :return: Inflected word (None if word can't be inflected).
+        """
+        column = self.columns.get(frozenset(grammemes))
+        if column is not None and word in self.tokens:
+            self.hits += 1
+            form_id = int(self.table[self.tokens[word], column])
+            return self.forms.restore_key(form_id) if form_id >= 0 else None
+        self.misses += 1
+        return self.fallback.inflect(word=word, grammemes=grammemes) if self.fallback is not None else None
+
+    def stats(self) -> dict:
+        """ Get lookup counters.
+
+        :return: Hits (found in table), misses (fallback) and hit rate.
+        """
+        total = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'hit_rate': self.hits / total if total else 0.0}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build precomputed inflection tables for vocab tokens.')
+    parser.add_argument('--out-dir', default=str(DIR_INFLECTIONS), help='Output directory.')
+    args = parser.parse_args()
+    build_inflection_table(out_dir=args.out_dir)
@@ -11,3 +11,33 @@ def load_txt(path: typing.Union[str, pathlib.Path], encoding: str = 'utf-8') ->
     with open(str(path), 'r', encoding=encoding) as reader:
         content = list(filter(None, set([el.replace('\n', '').strip() for el in reader.readlines()])))
     return content
+
+
+def load_weighted_txt(
+        path: typing.Union[str, pathlib.Path],
+        encoding: str = 'utf-8',
+) -> typing.Tuple[list, typing.Optional[list]]:
+    """ Load vocab with optional weights from txt file. Weight is the last tab-separated column of line if it's positive
+    number (for example, 'Москва\\t12600000'), otherwise the whole line is entry with weight 1. Weights of repeated
+    entries are summed.
+
+    :param path: Path to txt file.
+    :param encoding: File encoding type (default: utf-8).
+    :return: Vocab (list of strings) and weights (None if file has no weights).
+    """
+    weights, weighted = dict(), False
+    with open(str(path), 'r', encoding=encoding) as reader:
+        for line in reader:
+            entry, weight = line.replace('\n', '').strip(), 1.0
+            if '\t' in entry:
+                head, tail = entry.rsplit('\t', 1)
+                try:
+                    weight = float(tail)
+                    entry, weighted = head.strip(), True
+                except ValueError:
+                    weight = 1.0
+                if weight <= 0:
+                    raise ValueError(f'Weight of vocab entry must be positive, got line: {line!r}')
+            if entry:
+                weights[entry] = weights.get(entry, 0.0) + weight
+    return list(weights), list(weights.values()) if weighted else None
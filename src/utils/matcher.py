@@ -0,0 +1,62 @@
+import re, random, typing
+
+from src.attrs.attributes import NOT_NER_TAG, REPLACEMENT_MAP
+from src.utils.tag_vocab import ANCHOR_SETS
+
+# All anchors (not NER words of entities, for example: 'улица', 'область'):
+ANCHORS = frozenset(anchor for label in NOT_NER_TAG for anchor in NOT_NER_TAG[label])
+
+
+class SuffixReplacer:
+    """ Replacer of full forms by abbreviations (for example, 'улица' -> 'ул.'), table is compiled into one regex, so
+    replacing is a single pass over string. Longer forms win ('автономная область' -> 'ао', not 'автономная обл.'),
+    only whole words are replaced.\n\n
+    Usage example:\n
+    replacer = SuffixReplacer(replacements=REPLACEMENT_MAP['STREET'])\n
+    print(replacer.replace(s='улица Ленина', dot=False))\n
+    >>> ул Ленина
+    """
+    def __init__(self, replacements: typing.List[typing.Tuple[str, str]]) -> None:
+        """ Create 'SuffixReplacer' object class.
+
+        :param replacements: Pairs (full form, abbreviation).
+        :return:
+        """
+        self.targets = dict(replacements)
+        self.targets_no_dot = {k: v.replace('.', '') for k, v in self.targets.items()}
+        forms = sorted(self.targets, key=lambda form: (-len(form), form))
+        self.pattern = re.compile(r'(?<!\w)(?:' + '|'.join(re.escape(form) for form in forms) + r')(?!\w)')
+
+    def replace(self, s: str, dot: bool = True) -> str:
+        """ Replace full forms in string by abbreviations.
+
+        :param s: Input string.
+        :param dot: Keep dots of abbreviations ('ул.' or 'ул').
+        :return: String with abbreviations.
+        """
+        targets = self.targets if dot else self.targets_no_dot
+        return self.pattern.sub(lambda m: targets[m.group(0)], s)
+
+    def __call__(self, s: str, rng: random.Random = None) -> str:
+        """ Replace full forms in string by abbreviations with random choice of dots (see 'replace').
+
+        :param s: Input string.
+        :param rng: Random generator (if None, then global 'random' state is used).
+        :return: String with abbreviations.
+        """
+        rng = random if rng is None else rng
+        return self.replace(s=s, dot=rng.choice(seq=[True, False])).strip()
+
+
+REPLACERS = {label: SuffixReplacer(replacements=replacements) for label, replacements in REPLACEMENT_MAP.items()}
+
+
+def strip_anchors(s: str, label: str) -> str:
+    """ Remove anchor words of label from string (whole words only, case-insensitive).
+
+    :param s: Input string.
+    :param label: Sub-tag (key of 'NOT_NER_TAG').
+    :return: String without anchors (or input string if it has only anchors).
+    """
+    anchors = ANCHOR_SETS[label]
+    return ' '.join(w for w in s.split() if w.lower() not in anchors) or s.strip()
@@ -0,0 +1,148 @@
+import typing, threading, collections
+import pymorphy2
+
+from src import CONFIGS
+
+_MISSING = object()
+
+
+class LRUCache:
+    """ Size-bounded LRU cache (thread-safe) with hit, miss and eviction counters. """
+    def __init__(self, maxsize: int) -> None:
+        """ Create 'LRUCache' object class.
+
+        :param maxsize: Max number of cached items.
+        :return:
+        """
+        self.maxsize = maxsize
+        self.hits, self.misses, self.evictions = 0, 0, 0
+        self._data = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: typing.Hashable, default: typing.Any = None) -> typing.Any:
+        """ Get cached value and mark it as recently used.
+
+        :param key: Cache key.
+        :param default: Returned value if key isn't cached.
+        :return: Cached value.
+        """
+        with self._lock:
+            value = self._data.get(key, _MISSING)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: typing.Hashable, value: typing.Any) -> None:
+        """ Put value to cache, the least recently used item is evicted if cache is full.
+
+        :param key: Cache key.
+        :param value: Cached value.
+        :return:
+        """
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """ Drop all cached items and reset counters.
+
+        :return:
+        """
+        with self._lock:
+            self._data.clear()
+            self.hits, self.misses, self.evictions = 0, 0, 0
+
+    def stats(self) -> dict:
+        """ Get cache counters.
+
+        :return: Size, hits, misses, evictions and hit rate.
+        """
+        total = self.hits + self.misses
+        return {
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / total if total else 0.0,
+        }
+
+
+class CachedMorphAnalyzer:
+    """ Memoized wrapper around 'pymorphy2.MorphAnalyzer'. Caches 'parse' results and inflected words for pairs
+    (token, grammemes) in size-bounded LRU caches. One object can be shared across 'RUNERAugmentor' objects (see
+    'get_shared_morph').\n\n
+    Usage example:\n
+    morph = CachedMorphAnalyzer()\n
+    print(morph.inflect(word='Москва', grammemes={'datv'}))\n
+    >>> москве
+    """
+    def __init__(self, maxsize: int = CONFIGS['morph_cache_size'], analyzer: pymorphy2.MorphAnalyzer = None) -> None:
+        """ Create 'CachedMorphAnalyzer' object class.
+
+        :param maxsize: Max number of cached items (for each cache).
+        :param analyzer: Wrapped analyzer (if None, then new russian 'pymorphy2.MorphAnalyzer' is created).
+        :return:
+        """
+        self.analyzer = analyzer if analyzer is not None else pymorphy2.MorphAnalyzer(lang='ru')
+        self.parse_cache = LRUCache(maxsize=maxsize)
+        self.inflect_cache = LRUCache(maxsize=maxsize)
+
+    def parse(self, word: str) -> list:
+        """ Parse word (cached 'pymorphy2.MorphAnalyzer.parse').
+
+        :param word: Input word.
+        :return: List of parses.
+        """
+        parses = self.parse_cache.get(key=word, default=_MISSING)
+        if parses is _MISSING:
+            parses = self.analyzer.parse(word=word)
+            self.parse_cache.put(key=word, value=parses)
+        return parses
+
+    def inflect(self, word: str, grammemes: typing.Iterable[str]) -> typing.Optional[str]:
+        """ Inflect the most probable parse of word to required grammemes.
+
+        :param word: Input word.
+        :param grammemes: Required grammemes.
+        :return: Inflected word (None if word can't be inflected).
+        """
+        key = (word, frozenset(grammemes))
+        inflected = self.inflect_cache.get(key=key, default=_MISSING)
+        if inflected is _MISSING:
+            p = self.parse(word=word)[0].inflect(required_grammemes=key[1])
+            inflected = p.word if p is not None else None
+            self.inflect_cache.put(key=key, value=inflected)
+        return inflected
+
+    def stats(self) -> dict:
+        """ Get counters of both caches.
+
+        :return: Counters for 'parse' and 'inflect' caches.
+        """
+        return {'parse': self.parse_cache.stats(), 'inflect': self.inflect_cache.stats()}
+
+
+_SHARED_MORPH = None
+_SHARED_MORPH_LOCK = threading.Lock()
+
+
+def get_shared_morph() -> CachedMorphAnalyzer:
+    """ Get process-wide 'CachedMorphAnalyzer' (it's created on first call).
+
+    :return: Shared analyzer.
+    """
+    global _SHARED_MORPH
+    with _SHARED_MORPH_LOCK:
+        if _SHARED_MORPH is None:
+            _SHARED_MORPH = CachedMorphAnalyzer()
+    return _SHARED_MORPH
@@ -0,0 +1,183 @@
+import os, typing, hashlib, collections, concurrent.futures
+
+from src import CONFIGS
+from src.augmentor import RUNERAugmentor
+from src.utils.dedup import Deduplicator
+from src.utils.entity_bank import EntityBank
+from src.utils.transformation import transform_batch
+
+# Worker's augmentor (it's created once per process in '_init_worker'):
+_AUGMENTOR = None
+
+
+def derive_seed(seed: int, index: int) -> int:
+    """ Derive seed for shard from master seed and shard index. Derived seeds don't depend on process, platform or
+    number of workers.
+
+    :param seed: Master seed.
+    :param index: Shard index.
+    :return: Shard seed (32-bit).
+    """
+    return int.from_bytes(hashlib.sha256(f'{seed}:{index}'.encode()).digest()[:4], byteorder='little')
+
+
+def _init_worker(
+        tagging_format: str,
+        inflection_mode: str,
+        entity_bank: str = None,
+        dedup: Deduplicator = None,
+) -> None:
+    """ Create worker's augmentor (vocabs and morphology analyzer are loaded once per worker).
+
+    :param tagging_format: Tagging format (see 'RUNERAugmentor').
+    :param inflection_mode: Inflection source (see 'RUNERAugmentor').
+    :param entity_bank: Path to saved entity bank for warm start (if None, then entity bank isn't used).
+    :param dedup: Deduplicator which is forked for every shard (if None, then dedup isn't used).
+    :return:
+    """
+    global _AUGMENTOR
+    # Augmentor of previous in-process run is replaced, so its bank thread is stopped:
+    _close_worker()
+    bank = None
+    if entity_bank is not None:
+        bank = EntityBank(inflection_mode=inflection_mode)
+        bank.load(path=entity_bank)
+    _AUGMENTOR = RUNERAugmentor(tagging_format=tagging_format, inflection_mode=inflection_mode, entity_bank=bank,
+                                dedup=dedup.fork() if dedup is not None else None)
+
+
+def _close_worker() -> None:
+    """ Stop background refilling of entity bank of worker's augmentor (if it's used).
+
+    :return:
+    """
+    if _AUGMENTOR is not None and _AUGMENTOR.entity_bank is not None:
+        _AUGMENTOR.entity_bank.close()
+
+
+def _augment_shard(
+        shard: typing.Tuple[int, typing.List[list], typing.List[list], int, bool],
+        augmentor: RUNERAugmentor = None,
+) -> typing.Tuple[list, list]:
+    """ Augment one shard with worker's augmentor.
+
+    :param shard: Shard seed, tokens, NER-tags, number of variants and transformation flag.
+    :param augmentor: Augmentor (if None, then worker's augmentor is used).
+    :return: Augmented tokens and NER-tags (and shard's deduplicator if augmentor has deduplicator).
+    """
+    augmentor = augmentor if augmentor is not None else _AUGMENTOR
+    seed, tokens_list, tags_list, n_variants, transformation = shard
+    augmentor.reseed(seed=seed)
+    if augmentor.entity_bank is not None:
+        # Banks of all workers are loaded from the same file, so they are reseeded per shard to refill with different
+        # entities (and with other stream than augmentor's one):
+        augmentor.entity_bank.reseed(seed=derive_seed(seed=seed, index=0))
+    dedup = augmentor.dedup
+    if dedup is not None:
+        # Every shard has own filter, so output doesn't depend on which shards were processed by worker before:
+        augmentor.dedup = dedup.fork()
+    try:
+        tokens, tags = augmentor.augment_corpus(tokens_list=tokens_list, tags_list=tags_list, n_variants=n_variants)
+        if transformation:
+            with augmentor.profiler.stage('transform'):
+                tokens = transform_batch(tokens_list=tokens, rng=augmentor.np_rng)
+        return (tokens, tags) if dedup is None else (tokens, tags, augmentor.dedup)
+    finally:
+        augmentor.dedup = dedup
+
+
+def imap_shards(
+        shards: typing.Iterable[typing.Tuple[int, typing.List[list], typing.List[list], int, bool]],
+        n_workers: int = None,
+        tagging_format: str = 'BIOLU',
+        inflection_mode: str = 'morph',
+        max_pending: int = None,
+        entity_bank: str = None,
+        dedup: Deduplicator = None,
+) -> typing.Iterator[typing.Tuple[list, list]]:
+    """ Augment shards lazily on process pool. Results are yielded in input order and at most 'max_pending' shards are
+    processed or waiting at once, so shards can be read from stream with bounded memory.
+
+    :param shards: Shards (seed, tokens, NER-tags, number of variants and transformation flag).
+    :param n_workers: Number of processes (if None, then number of CPUs; if 1, then shards are augmented in current
+    process).
+    :param tagging_format: Tagging format (see 'RUNERAugmentor').
+    :param inflection_mode: Inflection source (see 'RUNERAugmentor').
+    :param max_pending: Max number of submitted shards (if None, then doubled number of workers).
+    :param entity_bank: Path to saved entity bank for warm start of workers (if None, then entity bank isn't used;
+    with entity bank output depends on number of workers).
+    :param dedup: Deduplicator which is forked for every shard (if set, then result of shard has the third item -
+    shard's deduplicator, which can be merged by 'Deduplicator.update').
+    :return: Iterator of augmented tokens and NER-tags for every shard.
+    """
+    if n_workers == 1:
+        _init_worker(tagging_format=tagging_format, inflection_mode=inflection_mode, entity_bank=entity_bank,
+                     dedup=dedup)
+        try:
+            for shard in shards:
+                yield _augment_shard(shard=shard)
+        finally:
+            _close_worker()
+        return
+    n_workers = n_workers if n_workers is not None else os.cpu_count()
+    max_pending = max_pending if max_pending is not None else 2 * n_workers
+    with concurrent.futures.ProcessPoolExecutor(
+            max_workers=n_workers,
+            initializer=_init_worker,
+            initargs=(tagging_format, inflection_mode, entity_bank, dedup),
+    ) as executor:
+        pending = collections.deque()
+        for shard in shards:
+            pending.append(executor.submit(_augment_shard, shard))
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def augment_parallel(
+        tokens_list: typing.List[list],
+        tags_list: typing.List[list],
+        n_variants: int = 1,
+        n_workers: int = None,
+        shard_size: int = 1000,
+        seed: int = CONFIGS['seed'],
+        tagging_format: str = 'BIOLU',
+        inflection_mode: str = 'morph',
+        transformation: bool = False,
+        entity_bank: str = None,
+        dedup: Deduplicator = None,
+) -> typing.Tuple[list, list]:
+    """ Augment corpus on process pool. Corpus is split into shards of fixed size, every shard is augmented with seed
+    derived from master seed and shard index, so output is the same for any number of workers. Results are merged in
+    input order.
+
+    :param tokens_list: Sentences tokens.
+    :param tags_list: Sentences NER-tags (BIO or BIOLU format).
+    :param n_variants: Number of augmented variants per sentence.
+    :param n_workers: Number of processes (if None, then number of CPUs; if 1, then corpus is augmented in current
+    process).
+    :param shard_size: Number of sentences per shard.
+    :param seed: Master seed.
+    :param tagging_format: Tagging format (see 'RUNERAugmentor').
+    :param inflection_mode: Inflection source (see 'RUNERAugmentor').
+    :param transformation: Apply random transformation (see 'transform') to every augmented sentence.
+    :param entity_bank: Path to saved entity bank for warm start of workers (see 'imap_shards').
+    :param dedup: Deduplicator (it's forked for every shard and filters of shards are merged back to it, so after run it
+    has keys and counters of whole corpus).
+    :return: Augmented tokens and NER-tags (variants of each sentence follow in input order).
+    """
+    shards = (
+        (derive_seed(seed=seed, index=i // shard_size), tokens_list[i:i + shard_size], tags_list[i:i + shard_size],
+         n_variants, transformation)
+        for i in range(0, len(tokens_list), shard_size)
+    )
+    tokens, tags = list(), list()
+    # Pending shards are bounded by 'imap_shards', results are merged in input order:
+    for result in imap_shards(shards=shards, n_workers=n_workers, tagging_format=tagging_format,
+                              inflection_mode=inflection_mode, entity_bank=entity_bank, dedup=dedup):
+        tokens += result[0]
+        tags += result[1]
+        if dedup is not None:
+            dedup.update(other=result[2])
+    return tokens, tags
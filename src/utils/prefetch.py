@@ -0,0 +1,211 @@
+import time, queue, typing, itertools, threading
+import numpy as np
+
+from src import CONFIGS
+from src.augmentor import RUNERAugmentor
+from src.utils.parallel import derive_seed, imap_shards, _augment_shard
+
+# Marker of finished producer:
+_DONE = object()
+
+
+class _Failure:
+    """ Marker of failed producer, exception is re-raised by consumer. """
+    __slots__ = ('error',)
+
+    def __init__(self, error: BaseException) -> None:
+        self.error = error
+
+
+class AugmentationStream:
+    """ Endless (or limited by number of epochs) iterator of fresh augmented batches for training loops. Base corpus is
+    shuffled every epoch and split into batches, every batch is augmented (and transformed with probabilities from
+    configs) with seed derived from master seed and batch index, so stream is reproducible. Batches are prefetched by
+    worker threads or processes into bounded queue; stall time shows how long consumer waited for batches (if it's
+    large, augmentation doesn't keep up with consumption).\n\n
+    Usage example:\n
+    with AugmentationStream(tokens_list=tokens, tags_list=tags, batch_size=32, n_workers=4, backend='process') as
+    stream:\n
+        for step, (tokens_batch, tags_batch) in zip(range(1000), stream):\n
+            train_step(tokens_batch, tags_batch)\n
+        print(stream.stats())
+    """
+    def __init__(
+            self,
+            tokens_list: typing.List[list],
+            tags_list: typing.List[list],
+            batch_size: int = 32,
+            n_variants: int = 1,
+            transformation: bool = True,
+            epochs: int = None,
+            shuffle: bool = True,
+            n_workers: int = 1,
+            backend: str = 'thread',
+            queue_size: int = CONFIGS['prefetch_queue_size'],
+            seed: int = CONFIGS['seed'],
+            tagging_format: str = 'BIOLU',
+            inflection_mode: str = 'morph',
+    ) -> None:
+        """ Create 'AugmentationStream' object class.
+
+        :param tokens_list: Base corpus sentences tokens.
+        :param tags_list: Base corpus sentences NER-tags (BIO or BIOLU format).
+        :param batch_size: Number of base sentences per batch (batch has 'batch_size' * 'n_variants' samples).
+        :param n_variants: Number of augmented variants per sentence.
+        :param transformation: Apply random transformation (see 'transform') to every augmented sentence.
+        :param epochs: Number of passes over base corpus (if None, then stream is endless).
+        :param shuffle: Shuffle base corpus every epoch.
+        :param n_workers: Number of worker threads or processes.
+        :param backend: Workers type: 'thread' (every thread has own augmentor) or 'process' (see 'imap_shards'; single
+        worker is thread with own augmentor).
+        :param queue_size: Max number of prefetched batches.
+        :param seed: Master seed.
+        :param tagging_format: Tagging format (see 'RUNERAugmentor').
+        :param inflection_mode: Inflection source (see 'RUNERAugmentor').
+        :return:
+        """
+        if backend not in ['thread', 'process']:
+            raise ValueError(f'Unknown backend: {backend}. Possible backends: thread, process')
+        if not tokens_list:
+            raise ValueError('Base corpus is empty')
+        if len(tokens_list) != len(tags_list):
+            raise ValueError(f'Number of sentences ({len(tokens_list)}) and NER-tags ({len(tags_list)}) differ')
+        self.tokens_list, self.tags_list = tokens_list, tags_list
+        self.batch_size, self.n_variants, self.transformation = batch_size, n_variants, transformation
+        self.epochs, self.shuffle, self.seed = epochs, shuffle, seed
+        self.n_workers, self.backend, self.queue_size = max(n_workers, 1), backend, max(queue_size, 1)
+        self.tagging_format, self.inflection_mode = tagging_format, inflection_mode
+        self._threads, self._queues, self._stop, self._lock = list(), list(), threading.Event(), threading.Lock()
+        self.batches, self.stall_seconds, self.producer_wait_seconds = 0, 0.0, 0.0
+        self.started = None
+
+    def _jobs(self) -> typing.Iterator[typing.Tuple[int, typing.List[list], typing.List[list], int, bool]]:
+        """ Generate batches (the same format as shards of 'imap_shards').
+
+        :return: Iterator of batches (seed, tokens, NER-tags, number of variants and transformation flag).
+        """
+        k = 0
+        for epoch in itertools.count() if self.epochs is None else range(self.epochs):
+            order = np.arange(len(self.tokens_list))
+            if self.shuffle:
+                order = np.random.default_rng(seed=[self.seed, epoch]).permutation(order)
+            for i in range(0, len(order), self.batch_size):
+                indices = order[i:i + self.batch_size].tolist()
+                yield (derive_seed(seed=self.seed, index=k), [self.tokens_list[j] for j in indices],
+                       [self.tags_list[j] for j in indices], self.n_variants, self.transformation)
+                k += 1
+
+    def _put(self, q: queue.Queue, item: typing.Any) -> bool:
+        """ Put item into queue (waiting while queue is full).
+
+        :param q: Queue.
+        :param item: Item.
+        :return: False if stream was closed.
+        """
+        start = time.perf_counter()
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                with self._lock:
+                    self.producer_wait_seconds += time.perf_counter() - start
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce_thread(self, worker: int, q: queue.Queue) -> None:
+        try:
+            augmentor = RUNERAugmentor(tagging_format=self.tagging_format, inflection_mode=self.inflection_mode)
+            for job in itertools.islice(self._jobs(), worker, None, self.n_workers):
+                if not self._put(q=q, item=_augment_shard(shard=job, augmentor=augmentor)):
+                    return
+        except Exception as e:
+            # Consumer would wait for the next batch forever, so error is passed to it:
+            self._put(q=q, item=_Failure(error=e))
+            return
+        self._put(q=q, item=_DONE)
+
+    def _produce_process(self, q: queue.Queue) -> None:
+        if self.n_workers == 1:
+            # In-process 'imap_shards' would replace worker's augmentor of 'src.utils.parallel' (it may be used by other
+            # run), so single worker augments with own augmentor like thread backend:
+            self._produce_thread(worker=0, q=q)
+            return
+        results = imap_shards(shards=self._jobs(), n_workers=self.n_workers, tagging_format=self.tagging_format,
+                              inflection_mode=self.inflection_mode, max_pending=self.queue_size)
+        try:
+            for result in results:
+                if not self._put(q=q, item=result):
+                    return
+        except Exception as e:
+            self._put(q=q, item=_Failure(error=e))
+            return
+        finally:
+            results.close()
+        self._put(q=q, item=_DONE)
+
+    def start(self) -> None:
+        """ Start workers.
+
+        :return:
+        """
+        if self._threads:
+            return
+        self.started = time.perf_counter()
+        if self.backend == 'thread':
+            # Batch k is produced by thread k % n_workers, so batches are consumed in order:
+            size = -(-self.queue_size // self.n_workers)
+            self._queues = [queue.Queue(maxsize=size) for _ in range(self.n_workers)]
+            self._threads = [threading.Thread(target=self._produce_thread, args=(i, q), daemon=True)
+                             for i, q in enumerate(self._queues)]
+        else:
+            self._queues = [queue.Queue(maxsize=self.queue_size)]
+            self._threads = [threading.Thread(target=self._produce_process, args=(self._queues[0],), daemon=True)]
+        for thread in self._threads:
+            thread.start()
+
+    def __iter__(self) -> typing.Iterator[typing.Tuple[list, list]]:
+        self.start()
+        for q in itertools.cycle(self._queues):
+            start = time.perf_counter()
+            item = q.get()
+            self.stall_seconds += time.perf_counter() - start
+            if item is _DONE:
+                return
+            if isinstance(item, _Failure):
+                raise item.error
+            self.batches += 1
+            yield item
+
+    def close(self) -> None:
+        """ Stop workers.
+
+        :return:
+        """
+        self._stop.set()
+        for thread in self._threads:
+            thread.join()
+        self._threads = list()
+
+    def __enter__(self) -> 'AugmentationStream':
+        self.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def stats(self) -> dict:
+        """ Get stream counters.
+
+        :return: Consumed batches, elapsed time, consumer stall time (and its share of elapsed time), producers wait
+        time on full queue and current number of prefetched batches.
+        """
+        elapsed = time.perf_counter() - self.started if self.started is not None else 0.0
+        return {
+            'batches': self.batches,
+            'elapsed': elapsed,
+            'stall_seconds': self.stall_seconds,
+            'stall_ratio': self.stall_seconds / elapsed if elapsed > 0 else 0.0,
+            'producer_wait_seconds': self.producer_wait_seconds,
+            'queue_depth': sum(q.qsize() for q in self._queues),
+        }
@@ -0,0 +1,160 @@
+import time, threading, collections
+
+
+class _Stage:
+    """ Context manager which adds wall time of block to profiler's stage. """
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler: 'StageProfiler', name: str) -> None:
+        self.profiler, self.name, self.start = profiler, name, 0.0
+
+    def __enter__(self) -> '_Stage':
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.profiler.add(name=self.name, seconds=time.perf_counter() - self.start)
+
+
+class _NullStage:
+    """ No-op context manager (for disabled profiling). """
+    __slots__ = ()
+
+    def __enter__(self) -> '_NullStage':
+        return self
+
+    def __exit__(self, *args) -> None:
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+class StageProfiler:
+    """ Cumulative wall time and calls counters for pipeline stages (stages can be nested, time is inclusive) and
+    counters of generated entities by type.\n\n
+    Usage example:\n
+    profiler = StageProfiler()\n
+    aug = RUNERAugmentor(profiler=profiler)\n
+    aug.augment(s='Москве', tag='LOC')\n
+    print(profiler.snapshot())\n
+    print(profiler.to_prometheus())
+    """
+    enabled = True
+
+    def __init__(self) -> None:
+        """ Create 'StageProfiler' object class.
+
+        :return:
+        """
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """ Reset all counters.
+
+        :return:
+        """
+        with self._lock:
+            self.calls = collections.Counter()
+            self.seconds = collections.Counter()
+            self.entities = collections.Counter()
+            self.started = time.perf_counter()
+
+    def stage(self, name: str) -> _Stage:
+        """ Measure block of code as stage.
+
+        :param name: Stage name.
+        :return: Context manager.
+        """
+        return _Stage(profiler=self, name=name)
+
+    def add(self, name: str, seconds: float, calls: int = 1) -> None:
+        """ Add time to stage.
+
+        :param name: Stage name.
+        :param seconds: Wall time.
+        :param calls: Number of calls.
+        :return:
+        """
+        with self._lock:
+            self.calls[name] += calls
+            self.seconds[name] += seconds
+
+    def count_entity(self, entity: str, n: int = 1) -> None:
+        """ Count generated entities.
+
+        :param entity: Entity type (full_name, address, street, ...).
+        :param n: Number of entities.
+        :return:
+        """
+        with self._lock:
+            self.entities[entity] += n
+
+    def snapshot(self) -> dict:
+        """ Get counters.
+
+        :return: Stages (calls, total and mean time), entities by type, elapsed time and entities per second.
+        """
+        with self._lock:
+            elapsed = time.perf_counter() - self.started
+            n_entities = sum(self.entities.values())
+            return {
+                'stages': {
+                    name: {'calls': self.calls[name], 'seconds': self.seconds[name],
+                           'mean': self.seconds[name] / self.calls[name]}
+                    for name in sorted(self.calls)
+                },
+                'entities': dict(self.entities),
+                'elapsed': elapsed,
+                'entities_per_sec': n_entities / elapsed if elapsed > 0 else 0.0,
+            }
+
+    def to_prometheus(self, prefix: str = 'runer_augmentor') -> str:
+        """ Export counters in Prometheus text format.
+
+        :param prefix: Metrics names prefix.
+        :return: Metrics.
+        """
+        snapshot = self.snapshot()
+        lines = [
+            f'# HELP {prefix}_stage_seconds_total Cumulative wall time of pipeline stage.',
+            f'# TYPE {prefix}_stage_seconds_total counter',
+        ]
+        lines += [f'{prefix}_stage_seconds_total{{stage="{name}"}} {stats["seconds"]}'
+                  for name, stats in snapshot['stages'].items()]
+        lines += [
+            f'# HELP {prefix}_stage_calls_total Number of calls of pipeline stage.',
+            f'# TYPE {prefix}_stage_calls_total counter',
+        ]
+        lines += [f'{prefix}_stage_calls_total{{stage="{name}"}} {stats["calls"]}'
+                  for name, stats in snapshot['stages'].items()]
+        lines += [
+            f'# HELP {prefix}_entities_total Number of generated entities.',
+            f'# TYPE {prefix}_entities_total counter',
+        ]
+        lines += [f'{prefix}_entities_total{{entity="{entity}"}} {n}' for entity, n in snapshot['entities'].items()]
+        lines += [
+            f'# HELP {prefix}_entities_per_second Generated entities per second since reset.',
+            f'# TYPE {prefix}_entities_per_second gauge',
+            f'{prefix}_entities_per_second {snapshot["entities_per_sec"]}',
+        ]
+        return '\n'.join(lines) + '\n'
+
+
+class NullProfiler:
+    """ Disabled profiler with the same interface as 'StageProfiler' (all calls are no-op). """
+    enabled = False
+
+    def stage(self, name: str) -> _NullStage:
+        return _NULL_STAGE
+
+    def add(self, name: str, seconds: float, calls: int = 1) -> None:
+        pass
+
+    def count_entity(self, entity: str, n: int = 1) -> None:
+        pass
+
+
+NULL_PROFILER = NullProfiler()
+
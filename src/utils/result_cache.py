@@ -0,0 +1,262 @@
+import json, time, zlib, typing, sqlite3, hashlib, pathlib, argparse, functools, collections
+
+from src import CONFIGS, DIR_SRC, DIR_VOCABS, __version__
+from src.utils.vocab import VOCAB_FILES
+from src.utils.parallel import imap_shards
+
+
+@functools.lru_cache(maxsize=None)
+def config_hash() -> str:
+    """ Hash of configs and vocab files (cached results are invalidated if any of them is changed).
+
+    :return: Hex digest.
+    """
+    h = hashlib.sha256()
+    h.update((DIR_SRC.parent/'configs.yml').read_bytes())
+    for name in sorted(VOCAB_FILES):
+        h.update(name.encode())
+        h.update((DIR_VOCABS/VOCAB_FILES[name]).read_bytes())
+    return h.hexdigest()
+
+
+def sentence_key(
+        tokens: list,
+        tags: list,
+        seed: int,
+        occurrence: int = 0,
+        n_variants: int = 1,
+        transformation: bool = True,
+        tagging_format: str = 'BIOLU',
+        inflection_mode: str = 'morph',
+) -> str:
+    """ Content address of augmented variants of sentence.
+
+    :param tokens: Sentence tokens.
+    :param tags: Sentence NER-tags.
+    :param seed: Master seed.
+    :param occurrence: Number of the same sentence occurrences before this one (repeated sentences get different
+    variants).
+    :param n_variants: Number of augmented variants.
+    :param transformation: Transformation flag.
+    :param tagging_format: Tagging format.
+    :param inflection_mode: Inflection source.
+    :return: Hex digest of sentence, settings, configs and vocabs hash and library version.
+    """
+    payload = [tokens, tags, seed, occurrence, n_variants, transformation, tagging_format, inflection_mode,
+               config_hash(), __version__]
+    return hashlib.sha256(json.dumps(payload, ensure_ascii=False).encode()).hexdigest()
+
+
+def key_seed(key: str) -> int:
+    """ Derive seed of sentence from its content address (so variants don't depend on sentence position in corpus).
+
+    :param key: Content address (see 'sentence_key').
+    :return: Seed (32-bit).
+    """
+    return int.from_bytes(bytes.fromhex(key)[:4], byteorder='little')
+
+
+class ResultCache:
+    """ On-disk store (SQLite) of augmented variants by content address of source sentence. Least recently used entries
+    are evicted when store exceeds size limit.\n\n
+    Usage example:\n
+    with ResultCache(path='results.sqlite') as cache:\n
+        tokens, tags = augment_cached(tokens_list=tokens_list, tags_list=tags_list, cache=cache)\n
+        print(cache.stats())
+    """
+    def __init__(
+            self,
+            path: typing.Union[str, pathlib.Path],
+            max_bytes: int = CONFIGS['result_cache']['max_bytes'],
+            max_entries: int = CONFIGS['result_cache']['max_entries'],
+    ) -> None:
+        """ Create 'ResultCache' object class.
+
+        :param path: Path to SQLite file.
+        :param max_bytes: Max total size of stored values (if None, then size isn't limited).
+        :param max_entries: Max number of stored sentences (if None, then number isn't limited).
+        :return:
+        """
+        self.path, self.max_bytes, self.max_entries = str(path), max_bytes, max_entries
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('CREATE TABLE IF NOT EXISTS results '
+                          '(key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, used REAL NOT NULL)')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS results_used ON results (used)')
+        self.conn.commit()
+        self.hits, self.misses, self.evictions = 0, 0, 0
+
+    def get_many(self, keys: typing.List[str]) -> typing.Dict[str, typing.Tuple[list, list]]:
+        """ Get stored variants (and mark them as recently used).
+
+        :param keys: Content addresses.
+        :return: Variants (tokens and NER-tags) by found keys.
+        """
+        found, now = dict(), time.time()
+        keys = list(dict.fromkeys(keys))
+        # SQLite limits number of query parameters:
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            rows = self.conn.execute(f'SELECT key, value FROM results WHERE key IN ({",".join("?" * len(chunk))})',
+                                     chunk).fetchall()
+            for key, value in rows:
+                found[key] = tuple(json.loads(zlib.decompress(value)))
+            self.conn.executemany('UPDATE results SET used = ? WHERE key = ?', [(now, key) for key, _ in rows])
+        self.conn.commit()
+        return found
+
+    def put_many(self, items: typing.Dict[str, typing.Tuple[list, list]]) -> None:
+        """ Store variants and evict least recently used entries over limits.
+
+        :param items: Variants (tokens and NER-tags) by content addresses.
+        :return:
+        """
+        now = time.time()
+        rows = list()
+        for key, value in items.items():
+            blob = zlib.compress(json.dumps(value, ensure_ascii=False).encode(), 1)
+            rows += [(key, blob, len(blob), now)]
+        self.conn.executemany('INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)', rows)
+        self.conn.commit()
+        self.evict()
+
+    def evict(self) -> int:
+        """ Evict least recently used entries while store exceeds limits.
+
+        :return: Number of evicted entries.
+        """
+        n_entries, n_bytes = self.conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results').fetchone()
+        over_entries = n_entries - self.max_entries if self.max_entries is not None else 0
+        over_bytes = n_bytes - self.max_bytes if self.max_bytes is not None else 0
+        if over_entries <= 0 and over_bytes <= 0:
+            return 0
+        evicted, freed = list(), 0
+        for key, size in self.conn.execute('SELECT key, size FROM results ORDER BY used'):
+            if len(evicted) >= over_entries and freed >= over_bytes:
+                break
+            evicted += [(key,)]
+            freed += size
+        self.conn.executemany('DELETE FROM results WHERE key = ?', evicted)
+        self.conn.commit()
+        self.evictions += len(evicted)
+        return len(evicted)
+
+    def stats(self) -> dict:
+        """ Get cache counters.
+
+        :return: Hits, misses, hit rate, evictions, number of stored sentences and size of stored values (in bytes).
+        """
+        n_entries, n_bytes = self.conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results').fetchone()
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'entries': n_entries,
+            'bytes': n_bytes,
+        }
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> 'ResultCache':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+def augment_cached(
+        tokens_list: typing.List[list],
+        tags_list: typing.List[list],
+        cache: ResultCache,
+        n_variants: int = 1,
+        seed: int = CONFIGS['seed'],
+        transformation: bool = True,
+        n_workers: int = 1,
+        tagging_format: str = 'BIOLU',
+        inflection_mode: str = 'morph',
+        occurrences: collections.Counter = None,
+) -> typing.Tuple[list, list]:
+    """ Augment corpus reusing stored variants of unchanged sentences. Every sentence is augmented with seed derived
+    from its content address, so variants don't depend on other sentences and rerun on changed corpus gives the same
+    variants for unchanged sentences as full run. Only new or changed sentences are augmented (and stored).
+
+    :param tokens_list: Sentences tokens.
+    :param tags_list: Sentences NER-tags (BIO or BIOLU format).
+    :param cache: Result cache.
+    :param n_variants: Number of augmented variants per sentence.
+    :param seed: Master seed.
+    :param transformation: Apply random transformation (see 'transform') to every augmented sentence.
+    :param n_workers: Number of processes for new sentences (see 'imap_shards').
+    :param tagging_format: Tagging format (see 'RUNERAugmentor').
+    :param inflection_mode: Inflection source (see 'RUNERAugmentor').
+    :param occurrences: Counter of already seen sentences (for corpus augmented chunk by chunk, if None, then only
+    sentences of this call are counted).
+    :return: Augmented tokens and NER-tags (variants of each sentence follow in input order).
+    """
+    occurrences = occurrences if occurrences is not None else collections.Counter()
+    keys = list()
+    for tokens, tags in zip(tokens_list, tags_list):
+        content = (tuple(tokens), tuple(tags))
+        keys += [sentence_key(tokens=tokens, tags=tags, seed=seed, occurrence=occurrences[content],
+                              n_variants=n_variants, transformation=transformation, tagging_format=tagging_format,
+                              inflection_mode=inflection_mode)]
+        occurrences[content] += 1
+    found = cache.get_many(keys=keys)
+    missed = [i for i, key in enumerate(keys) if key not in found]
+    cache.hits += len(keys) - len(missed)
+    cache.misses += len(missed)
+    shards = ((key_seed(key=keys[i]), [tokens_list[i]], [tags_list[i]], n_variants, transformation) for i in missed)
+    new = dict()
+    for i, result in zip(missed, imap_shards(shards=shards, n_workers=n_workers, tagging_format=tagging_format,
+                                            inflection_mode=inflection_mode)):
+        new[keys[i]] = (result[0], result[1])
+    cache.put_many(items=new)
+    found.update(new)
+    augmented_tokens, augmented_tags = list(), list()
+    for key in keys:
+        augmented_tokens += found[key][0]
+        augmented_tags += found[key][1]
+    return augmented_tokens, augmented_tags
+
+
+if __name__ == '__main__':
+    from src.pipeline import iter_chunks
+    from src.utils.corpus_io import FORMATS, read_corpus, CorpusWriter
+
+    parser = argparse.ArgumentParser(description='Augment corpus reusing stored variants of unchanged sentences.')
+    parser.add_argument('input', help='Path to input corpus (csv, jsonl or conll).')
+    parser.add_argument('output', help='Path to output corpus (csv, jsonl or conll).')
+    parser.add_argument('--cache', required=True, help='Path to SQLite result cache.')
+    parser.add_argument('--max-mb', type=float, default=None, help='Max size of cache (in MB, default: from configs).')
+    parser.add_argument('--chunk-size', type=int, default=1000, help='Number of input samples per chunk.')
+    parser.add_argument('--variants', type=int, default=1, help='Number of augmented variants per sample.')
+    parser.add_argument('--seed', type=int, default=CONFIGS['seed'], help='Master seed.')
+    parser.add_argument('--workers', type=int, default=1, help='Number of processes (0 - number of CPUs).')
+    parser.add_argument('--no-transform', action='store_true', help='Disable random transformations.')
+    parser.add_argument('--tagging-format', default='BIOLU', choices=['BIOLU', 'BIO', 'single_token'])
+    parser.add_argument('--inflection-mode', default='morph', choices=['morph', 'table'])
+    parser.add_argument('--input-format', default=None, choices=FORMATS)
+    parser.add_argument('--output-format', default=None, choices=FORMATS)
+    args = parser.parse_args()
+    max_bytes = int(args.max_mb * 2 ** 20) if args.max_mb is not None else CONFIGS['result_cache']['max_bytes']
+    seen = collections.Counter()
+    with ResultCache(path=args.cache, max_bytes=max_bytes) as result_cache, \
+            CorpusWriter(path=args.output, corpus_format=args.output_format) as writer:
+        samples = read_corpus(path=args.input, corpus_format=args.input_format)
+        for chunk_tokens, chunk_tags in iter_chunks(samples=samples, chunk_size=args.chunk_size):
+            writer.write(*augment_cached(
+                tokens_list=chunk_tokens,
+                tags_list=chunk_tags,
+                cache=result_cache,
+                n_variants=args.variants,
+                seed=args.seed,
+                transformation=not args.no_transform,
+                n_workers=args.workers if args.workers > 0 else None,
+                tagging_format=args.tagging_format,
+                inflection_mode=args.inflection_mode,
+                occurrences=seen,
+            ))
+        print(result_cache.stats())
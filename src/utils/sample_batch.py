@@ -0,0 +1,281 @@
+import typing
+import numpy as np
+
+from src.utils.tag_vocab import TAG_VOCAB, TAGGING_FORMATS
+
+
+class StringTable:
+    """ Interned strings (id = order of first appearance), shared by batches, so every distinct token or tag is stored
+    once. Frozen table (for example, table of tagging format in 'TAG_TABLES') can't be extended.\n\n
+    Usage example:\n
+    table = StringTable()\n
+    print(table.encode(values=['ул.', 'Ленина', 'ул.']), table.decode(ids=[1]))\n
+    >>> [0, 1, 0] ['Ленина']
+    """
+    __slots__ = ('strings', 'ids', 'frozen')
+
+    def __init__(self, strings: typing.Iterable[str] = (), frozen: bool = False) -> None:
+        """ Create 'StringTable' object class.
+
+        :param strings: Initial strings (their ids are positions, repeated strings are decoded by every id).
+        :param frozen: Raise error on encoding of unknown strings instead of adding them.
+        :return:
+        """
+        self.strings, self.ids, self.frozen = list(), dict(), frozen
+        for value in strings:
+            self.ids.setdefault(value, len(self.strings))
+            self.strings += [value]
+
+    def __len__(self) -> int:
+        return len(self.strings)
+
+    def __getitem__(self, i: int) -> str:
+        return self.strings[i]
+
+    def encode(self, values: typing.Iterable[str]) -> typing.List[int]:
+        """ Get ids of strings (new strings are added unless table is frozen).
+
+        :param values: Strings.
+        :return: Ids.
+        """
+        ids, strings = self.ids, self.strings
+        encoded = list()
+        for value in values:
+            i = ids.get(value)
+            if i is None:
+                if self.frozen:
+                    raise ValueError(f'Unknown string for frozen table: {value}')
+                i = ids[value] = len(strings)
+                strings += [value]
+            encoded += [i]
+        return encoded
+
+    def decode(self, ids: typing.Union[np.ndarray, typing.List[int]]) -> typing.List[str]:
+        """ Get strings by ids.
+
+        :param ids: Ids.
+        :return: Strings.
+        """
+        strings = self.strings
+        return [strings[i] for i in (ids.tolist() if isinstance(ids, np.ndarray) else ids)]
+
+
+class Sample:
+    """ View of one sentence of 'SampleBatch' (nothing is copied until tokens or tags are requested). """
+    __slots__ = ('batch', 'index')
+
+    def __init__(self, batch: 'SampleBatch', index: int) -> None:
+        self.batch, self.index = batch, index
+
+    def _span(self) -> slice:
+        offsets = self.batch.offsets
+        return slice(int(offsets[self.index]), int(offsets[self.index + 1]))
+
+    def __len__(self) -> int:
+        return int(self.batch.offsets[self.index + 1] - self.batch.offsets[self.index])
+
+    @property
+    def token_ids(self) -> np.ndarray:
+        return self.batch.token_ids[self._span()]
+
+    @property
+    def tag_ids(self) -> np.ndarray:
+        return self.batch.tag_ids[self._span()]
+
+    @property
+    def tokens(self) -> typing.List[str]:
+        return self.batch.token_table.decode(ids=self.token_ids)
+
+    @property
+    def tags(self) -> typing.List[str]:
+        return self.batch.tag_table.decode(ids=self.tag_ids)
+
+    def __repr__(self) -> str:
+        return f'Sample(tokens={self.tokens}, tags={self.tags})'
+
+
+class SampleBatch:
+    """ Compact batch of sentences: tokens and NER-tags are interned by string tables and stored as int32 id buffers
+    with int64 offsets of sentences (sentence i is 'offsets[i]:offsets[i + 1]' of buffers). Slices share buffers
+    (zero-copy), lists and DataFrames are built only on demand.\n\n
+    Usage example:\n
+    batch = SampleBatch.from_lists(tokens_list=[['В', 'Москве'], ['Иванов']], tags_list=[['O', 'U-LOC'], ['U-PER']])\n
+    print(len(batch), batch[1].tokens, batch[1:].to_lists())\n
+    >>> 2 ['Иванов'] ([['Иванов']], [['U-PER']])
+    """
+    __slots__ = ('token_ids', 'tag_ids', 'offsets', 'token_table', 'tag_table')
+
+    def __init__(
+            self,
+            token_ids: np.ndarray,
+            tag_ids: np.ndarray,
+            offsets: np.ndarray,
+            token_table: StringTable,
+            tag_table: StringTable,
+    ) -> None:
+        """ Create 'SampleBatch' object class.
+
+        :param token_ids: Token ids buffer (int32).
+        :param tag_ids: Tag ids buffer (int32).
+        :param offsets: Starts of sentences in buffers and end of the last sentence (int64).
+        :param token_table: Table of tokens.
+        :param tag_table: Table of NER-tags.
+        :return:
+        """
+        self.token_ids, self.tag_ids, self.offsets = token_ids, tag_ids, offsets
+        self.token_table, self.tag_table = token_table, tag_table
+
+    @classmethod
+    def from_lists(
+            cls,
+            tokens_list: typing.List[list],
+            tags_list: typing.List[list],
+            token_table: StringTable = None,
+            tag_table: StringTable = None,
+    ) -> 'SampleBatch':
+        """ Create batch from lists of sentences.
+
+        :param tokens_list: Sentences tokens.
+        :param tags_list: Sentences NER-tags.
+        :param token_table: Table of tokens (if None, then new table is created).
+        :param tag_table: Table of NER-tags (if None, then new table is created).
+        :return: Batch.
+        """
+        tag_table = tag_table if tag_table is not None else StringTable()
+        return cls.from_ids(tokens_list=tokens_list, ids_list=[tag_table.encode(values=tags) for tags in tags_list],
+                            token_table=token_table, tag_table=tag_table)
+
+    @classmethod
+    def from_ids(
+            cls,
+            tokens_list: typing.List[list],
+            ids_list: typing.List[typing.Union[np.ndarray, list]],
+            tag_table: StringTable,
+            token_table: StringTable = None,
+    ) -> 'SampleBatch':
+        """ Create batch from tokens and encoded NER-tags (for example, ids of 'TAG_VOCAB.names').
+
+        :param tokens_list: Sentences tokens.
+        :param ids_list: Sentences NER-tags ids of tag table.
+        :param tag_table: Table of NER-tags.
+        :param token_table: Table of tokens (if None, then new table is created).
+        :return: Batch.
+        """
+        token_table = token_table if token_table is not None else StringTable()
+        offsets = np.zeros(len(tokens_list) + 1, dtype=np.int64)
+        np.cumsum([len(tokens) for tokens in tokens_list], out=offsets[1:])
+        token_ids = np.fromiter((i for tokens in tokens_list for i in token_table.encode(values=tokens)),
+                                dtype=np.int32, count=int(offsets[-1]))
+        tag_ids = np.concatenate([np.asarray(ids, dtype=np.int32) for ids in ids_list]) if ids_list else \
+            np.zeros(0, dtype=np.int32)
+        if len(tag_ids) != len(token_ids):
+            raise ValueError(f'Number of tags ({len(tag_ids)}) differs from number of tokens ({len(token_ids)})')
+        return cls(token_ids=token_ids, tag_ids=tag_ids.astype(np.int32, copy=False), offsets=offsets,
+                   token_table=token_table, tag_table=tag_table)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, item: typing.Union[int, slice]) -> typing.Union[Sample, 'SampleBatch']:
+        if isinstance(item, slice):
+            start, stop, step = item.indices(len(self))
+            if step != 1:
+                return self.take(indices=range(start, stop, step))
+            # Buffers are shared, only offsets are sliced:
+            return SampleBatch(token_ids=self.token_ids, tag_ids=self.tag_ids,
+                               offsets=self.offsets[start:max(start, stop) + 1], token_table=self.token_table,
+                               tag_table=self.tag_table)
+        if item < 0:
+            item += len(self)
+        if not 0 <= item < len(self):
+            raise IndexError(f'Sample index out of range: {item}')
+        return Sample(batch=self, index=item)
+
+    def __iter__(self) -> typing.Iterator[Sample]:
+        return (Sample(batch=self, index=i) for i in range(len(self)))
+
+    def take(self, indices: typing.Iterable[int]) -> 'SampleBatch':
+        """ Copy sentences by indices to new batch (with the same tables).
+
+        :param indices: Sentence indices.
+        :return: Batch.
+        """
+        indices = np.asarray(list(indices), dtype=np.int64)
+        starts, ends = self.offsets[indices], self.offsets[indices + 1]
+        offsets = np.zeros(len(indices) + 1, dtype=np.int64)
+        np.cumsum(ends - starts, out=offsets[1:])
+        positions = np.concatenate([np.arange(s, e) for s, e in zip(starts.tolist(), ends.tolist())]) if len(indices) \
+            else np.zeros(0, dtype=np.int64)
+        return SampleBatch(token_ids=self.token_ids[positions], tag_ids=self.tag_ids[positions], offsets=offsets,
+                           token_table=self.token_table, tag_table=self.tag_table)
+
+    def compact(self) -> 'SampleBatch':
+        """ Copy batch with buffers of its sentences only (slice of big batch keeps whole buffers alive).
+
+        :return: Batch.
+        """
+        start, end = int(self.offsets[0]), int(self.offsets[-1])
+        return SampleBatch(token_ids=self.token_ids[start:end].copy(), tag_ids=self.tag_ids[start:end].copy(),
+                           offsets=self.offsets - start, token_table=self.token_table, tag_table=self.tag_table)
+
+    @staticmethod
+    def concat(batches: typing.List['SampleBatch']) -> 'SampleBatch':
+        """ Concatenate batches (batches with other tables than the first one are re-encoded).
+
+        :param batches: Batches.
+        :return: Batch.
+        """
+        if not batches:
+            raise ValueError('Nothing to concatenate')
+        token_table, tag_table = batches[0].token_table, batches[0].tag_table
+        token_ids, tag_ids, offsets, total = list(), list(), [np.zeros(1, dtype=np.int64)], 0
+        for batch in batches:
+            start, end = int(batch.offsets[0]), int(batch.offsets[-1])
+            tokens, tags = batch.token_ids[start:end], batch.tag_ids[start:end]
+            if batch.token_table is not token_table:
+                tokens = np.asarray(token_table.encode(values=batch.token_table.decode(ids=tokens)), dtype=np.int32)
+            if batch.tag_table is not tag_table:
+                tags = np.asarray(tag_table.encode(values=batch.tag_table.decode(ids=tags)), dtype=np.int32)
+            token_ids += [tokens]
+            tag_ids += [tags]
+            offsets += [batch.offsets[1:] - start + total]
+            total += end - start
+        return SampleBatch(token_ids=np.concatenate(token_ids).astype(np.int32, copy=False),
+                           tag_ids=np.concatenate(tag_ids).astype(np.int32, copy=False),
+                           offsets=np.concatenate(offsets), token_table=token_table, tag_table=tag_table)
+
+    def to_lists(self) -> typing.Tuple[typing.List[list], typing.List[list]]:
+        """ Convert batch to lists of sentences.
+
+        :return: Sentences tokens and NER-tags.
+        """
+        start, end = int(self.offsets[0]), int(self.offsets[-1])
+        tokens = self.token_table.decode(ids=self.token_ids[start:end])
+        tags = self.tag_table.decode(ids=self.tag_ids[start:end])
+        bounds = (self.offsets - start).tolist()
+        return [tokens[s:e] for s, e in zip(bounds, bounds[1:])], [tags[s:e] for s, e in zip(bounds, bounds[1:])]
+
+    def to_pandas(self, tokens_column: str = 'tokens', tags_column: str = 'ner_tags') -> 'pandas.DataFrame':
+        """ Convert batch to DataFrame (like 'example.py' output).
+
+        :param tokens_column: Tokens column name.
+        :param tags_column: NER-tags column name.
+        :return: DataFrame with lists of tokens and NER-tags.
+        """
+        import pandas as pd
+        tokens_list, tags_list = self.to_lists()
+        return pd.DataFrame({tokens_column: tokens_list, tags_column: tags_list})
+
+    @property
+    def nbytes(self) -> int:
+        """ Size of id buffers and offsets (string tables aren't counted, they are shared by batches).
+
+        :return: Size in bytes.
+        """
+        return self.token_ids.nbytes + self.tag_ids.nbytes + self.offsets.nbytes
+
+
+# Tables of output NER-tags by tagging format (ids are the same as ids of 'TAG_VOCAB.names', tables are shared, so
+# they are frozen):
+TAG_TABLES = {tagging_format: StringTable(strings=TAG_VOCAB.names[tagging_format].tolist(), frozen=True)
+              for tagging_format in TAGGING_FORMATS}
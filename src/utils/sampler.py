@@ -0,0 +1,87 @@
+import typing, random
+import numpy as np
+import marisa_trie
+
+from src.utils.alias import AliasTable
+from src.utils.vocab import load_vocab, load_alias
+
+# Marker of alias table which isn't loaded yet:
+_NOT_LOADED = object()
+
+
+class VocabSampler:
+    """ Sampler over keys of 'marisa_trie.Trie' vocab. Keys are drawn by integer id and restored directly from trie, so
+    no list of all keys is built per draw. Draws are uniform, or weighted by alias table if vocab has weights (see
+    'src.utils.vocab.load_alias'), both are O(1). Vocab can be set by name, then it's loaded on first draw.\n\n
+    Usage example:\n
+    sampler = VocabSampler(vocab='STREETS', seed=42)\n
+    print(sampler.sample())\n
+    print(sampler.sample_batch(n=3))
+    """
+    def __init__(
+            self,
+            trie: marisa_trie.Trie = None,
+            seed: int = None,
+            vocab: str = None,
+            alias: AliasTable = None,
+    ) -> None:
+        """ Create 'VocabSampler' object class.
+
+        :param trie: Vocab trie.
+        :param seed: Seed for own random generator (if None, then global 'random' state is used).
+        :param vocab: Vocab name (see 'src.utils.vocab') which is loaded lazily (if trie is None).
+        :param alias: Alias table of weights aligned with trie ids (if None, then weights of named vocab are loaded
+        lazily; if vocab has no weights, then draws are uniform).
+        :return:
+        """
+        self._trie = trie
+        self._alias = alias if alias is not None or vocab is None else _NOT_LOADED
+        self.vocab = vocab
+        self.rng = random.Random(seed) if seed is not None else random
+
+    @property
+    def trie(self) -> marisa_trie.Trie:
+        if self._trie is None:
+            self._trie = load_vocab(name=self.vocab)
+        return self._trie
+
+    @property
+    def alias(self) -> typing.Optional[AliasTable]:
+        if self._alias is _NOT_LOADED:
+            self._alias = load_alias(name=self.vocab)
+        return self._alias
+
+    @property
+    def size(self) -> int:
+        return len(self.trie)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def sample(self, rng: random.Random = None) -> str:
+        """ Draw one random key from vocab.
+
+        :param rng: Random generator (if None, then sampler's generator is used).
+        :return: Random key.
+        """
+        rng = self.rng if rng is None else rng
+        if self.alias is not None:
+            return self.trie.restore_key(self.alias.sample(rng=rng))
+        return self.trie.restore_key(rng.randrange(self.size))
+
+    def sample_batch(self, n: int, rng: random.Random = None, np_rng: np.random.Generator = None) -> typing.List[str]:
+        """ Draw N random keys from vocab (with replacement) in one call.
+
+        :param n: Number of keys.
+        :param rng: Random generator (if None, then sampler's generator is used).
+        :param np_rng: NumPy random generator for vectorized draw of ids (if set, then it's used instead of 'rng').
+        :return: Random keys.
+        """
+        if np_rng is not None:
+            ids = self.alias.sample_batch(n=n, rng=np_rng) if self.alias is not None else \
+                np_rng.choice(a=self.size, size=n)
+            return [self.trie.restore_key(i) for i in ids.tolist()]
+        rng = self.rng if rng is None else rng
+        if self.alias is not None:
+            return [self.trie.restore_key(self.alias.sample(rng=rng)) for _ in range(n)]
+        return [self.trie.restore_key(i) for i in rng.choices(range(self.size), k=n)]
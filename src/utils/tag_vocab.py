@@ -0,0 +1,96 @@
+import typing
+import numpy as np
+
+from src.attrs.attributes import TAG_MAP, NOT_NER_TAG
+
+PREFIXES = ['B', 'I', 'L', 'U']
+TAGGING_FORMATS = ['BIOLU', 'BIO', 'single_token']
+
+
+class TagVocab:
+    """ Integer ids for NER-tags. Id 0 is 'O', every pair prefix (B, I, L, U) x sub-tag (key of 'TAG_MAP') has own id.
+    Relabelling to tagging formats (BIOLU, BIO, single-token) is precomputed lookup table applied to NumPy array of
+    ids, strings are produced only by 'decode'.\n\n
+    Usage example:\n
+    vocab = TagVocab()\n
+    ids = vocab.encode(tags=['B-STREET', 'L-STREET', 'U-HOUSE'])\n
+    print(vocab.decode(ids=ids, tagging_format='BIO'))\n
+    >>> ['B-DMN_STREET', 'I-DMN_STREET', 'B-DMN_HOUSE']
+    """
+    def __init__(self, labels: typing.List[str] = None) -> None:
+        """ Create 'TagVocab' object class.
+
+        :param labels: Sub-tags (if None, then keys of 'TAG_MAP').
+        :return:
+        """
+        self.labels = labels if labels is not None else list(TAG_MAP)
+        self.tags = ['O'] + [f'{prefix}-{label}' for label in self.labels for prefix in PREFIXES]
+        self.ids = {tag: i for i, tag in enumerate(self.tags)}
+        # Relabelling tables (internal id --> id of format) and names of format ids:
+        bio_prefixes = {'B': 'B', 'I': 'I', 'L': 'I', 'U': 'B'}
+        bio = [self.ids['O']] + [
+            self.ids[f'{bio_prefixes[prefix]}-{label}'] for label in self.labels for prefix in PREFIXES
+        ]
+        single = [0] + [1 + j for j in range(len(self.labels)) for _ in PREFIXES]
+        biolu_names = ['O'] + [f'{prefix}-{TAG_MAP.get(label, label)}' for label in self.labels for prefix in PREFIXES]
+        self.tables = {
+            'BIOLU': np.arange(len(self.tags), dtype=np.int32),
+            'BIO': np.array(bio, dtype=np.int32),
+            'single_token': np.array(single, dtype=np.int32),
+        }
+        self.names = {
+            'BIOLU': np.array(biolu_names, dtype=object),
+            'BIO': np.array(biolu_names, dtype=object),
+            'single_token': np.array(['O'] + [TAG_MAP.get(label, label) for label in self.labels], dtype=object),
+        }
+        self.sub_names = {
+            'BIOLU': np.array(self.tags, dtype=object),
+            'BIO': np.array(self.tags, dtype=object),
+            'single_token': np.array(['O'] + self.labels, dtype=object),
+        }
+
+    def __len__(self) -> int:
+        return len(self.tags)
+
+    def prefix_ids(self, label: str) -> typing.Tuple[int, int, int, int]:
+        """ Get ids of sub-tag with every prefix.
+
+        :param label: Sub-tag.
+        :return: Ids of B, I, L and U tags.
+        """
+        i = 1 + self.labels.index(label) * len(PREFIXES)
+        return i, i + 1, i + 2, i + 3
+
+    def encode(self, tags: typing.List[str]) -> np.ndarray:
+        """ Convert BIOLU sub-tags (for example, 'U-COUNTRY') to ids.
+
+        :param tags: NER-tags.
+        :return: Ids.
+        """
+        return np.array([self.ids[tag] for tag in tags], dtype=np.int32)
+
+    def convert(self, ids: np.ndarray, tagging_format: str = 'BIOLU') -> np.ndarray:
+        """ Relabel ids to tagging format.
+
+        :param ids: Ids of BIOLU sub-tags.
+        :param tagging_format: Tagging format: 'BIOLU', 'BIO', 'single_token'.
+        :return: Ids of tagging format (see 'names').
+        """
+        return self.tables[tagging_format][ids]
+
+    def decode(self, ids: np.ndarray, tagging_format: str = 'BIOLU', tag_map: bool = True) -> typing.List[str]:
+        """ Relabel ids to tagging format and convert them to NER-tags.
+
+        :param ids: Ids of BIOLU sub-tags.
+        :param tagging_format: Tagging format: 'BIOLU', 'BIO', 'single_token'.
+        :param tag_map: Map sub-tags to output NER-tags (values of 'TAG_MAP'), for example, 'U-DMN_COUNTRY' instead of
+        'U-COUNTRY'.
+        :return: NER-tags.
+        """
+        names = self.names if tag_map else self.sub_names
+        return names[tagging_format][self.convert(ids=ids, tagging_format=tagging_format)].tolist()
+
+
+TAG_VOCAB = TagVocab()
+# Tokens which aren't tagged as entity (anchors like 'улица', 'область') for every sub-tag:
+ANCHOR_SETS = {label: frozenset(NOT_NER_TAG[label]) for label in NOT_NER_TAG}
@@ -0,0 +1,83 @@
+import random, typing
+
+from src import CONFIGS
+
+# Slots of templates and their sub-tags:
+SLOTS = {
+    'LAST_NAME': 'LAST_NAME',
+    'FIRST_NAME': 'FIRST_NAME',
+    'MIDDLE_NAME': 'MIDDLE_NAME',
+    'COUNTRY': 'COUNTRY',
+    'COUNTRY_RU': 'COUNTRY',
+    'REGION': 'REGION',
+    'DISTRICT': 'DISTRICT',
+    'CITY': 'CITY',
+    'STREET': 'STREET',
+    'HOUSE': 'HOUSE',
+    'POSTCODE': 'O',
+}
+# Slots which depend on abbreviation mode:
+ABBREVIATED_SLOTS = frozenset(['REGION', 'DISTRICT', 'STREET'])
+# Abbreviation mode is drawn once per entity, once per abbreviated slot or isn't drawn at all:
+ABBREVIATION_MODES = ['entity', 'slot', 'none']
+
+
+class TemplatePlan:
+    """ Compiled templates of one entity type: layouts as tuples of slots with their sub-tags. Layout is chosen
+    uniformly, only slots of chosen layout are drawn.\n\n
+    Usage example:\n
+    plan = TemplatePlan(entity='street', layouts=[['STREET'], ['STREET', 'HOUSE']])\n
+    print(plan.labels[plan.choose(rng=random.Random(0))])\n
+    >>> ('STREET', 'HOUSE')
+    """
+    __slots__ = ('entity', 'layouts', 'labels', 'inflect', 'shuffle', 'abbreviation')
+
+    def __init__(
+            self,
+            entity: str,
+            layouts: typing.List[typing.List[str]],
+            inflect: bool = True,
+            shuffle: bool = False,
+            abbreviation: str = 'entity',
+    ) -> None:
+        """ Create 'TemplatePlan' object class.
+
+        :param entity: Augmentation type.
+        :param layouts: Layouts (lists of slots, see 'SLOTS').
+        :param inflect: Inflect drawn strings according to inflecting tags of input entity.
+        :param shuffle: Shuffle order of drawn strings.
+        :param abbreviation: Abbreviation mode of region, district and street (see 'ABBREVIATION_MODES').
+        :return:
+        """
+        if not layouts:
+            raise ValueError(f'Template of {entity!r} has no layouts')
+        unknown = sorted({slot for layout in layouts for slot in layout if slot not in SLOTS})
+        if unknown:
+            raise ValueError(f'Template of {entity!r} has unknown slots: {unknown}. Possible slots: {list(SLOTS)}')
+        if abbreviation not in ABBREVIATION_MODES:
+            raise ValueError(f'Unknown abbreviation mode of {entity!r}: {abbreviation}. '
+                             f'Possible modes: {ABBREVIATION_MODES}')
+        self.entity = entity
+        self.layouts = [tuple(layout) for layout in layouts]
+        self.labels = [tuple(SLOTS[slot] for slot in layout) for layout in self.layouts]
+        self.inflect, self.shuffle, self.abbreviation = inflect, shuffle, abbreviation
+
+    def choose(self, rng: random.Random) -> int:
+        """ Choose layout (random generator isn't used if template has only one layout).
+
+        :param rng: Random generator.
+        :return: Index of layout.
+        """
+        return 0 if len(self.layouts) == 1 else rng.randint(a=0, b=len(self.layouts) - 1)
+
+
+def compile_templates(templates: dict) -> typing.Dict[str, TemplatePlan]:
+    """ Compile templates from configs into plans.
+
+    :param templates: Templates by entity type (keys 'layouts', 'inflect', 'shuffle' and 'abbreviation').
+    :return: Plans by entity type.
+    """
+    return {entity: TemplatePlan(entity=entity, **template) for entity, template in templates.items()}
+
+
+TEMPLATES = compile_templates(templates=CONFIGS['templates'])
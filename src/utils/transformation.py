@@ -1,10 +1,82 @@
+import re, typing
 import numpy as np
-import transliterate
+from transliterate.base import registry
+from transliterate.utils import ensure_autodiscover
 
 from src.attrs.attributes import TRANSFORMATION_CASES
 
+# Tokens separator for processing whole sentence as one string (it isn't changed by casing or transliterating):
+_SEP = '\x1f'
 
-def transform(tokens: list, transformation_case: str = None) -> list:
+
+class Transliterator:
+    """ Reversed transliteration (to latin) compiled once from 'transliterate' language pack into one 'str.translate'
+    table and small set of multi-character rules. Output is identical to
+    'transliterate.translit(value, language_code, reversed=True)'.\n\n
+    Usage example:\n
+    transliterator = Transliterator(language_code='ru')\n
+    print(transliterator.translit(value='Задача'))\n
+    >>> Zadacha
+    """
+    def __init__(self, language_code: str = 'ru') -> None:
+        """ Create 'Transliterator' object class.
+
+        :param language_code: Language code of 'transliterate' language pack.
+        :return:
+        """
+        ensure_autodiscover()
+        pack = registry.get(language_code)()
+        # Multi-character rules are applied before translation table:
+        rules = dict()
+        for mapping in [pack.reversed_specific_pre_processor_mapping, pack.reversed_pre_processor_mapping]:
+            for key in mapping or dict():
+                if len(key) > 1:
+                    rules[key] = pack.translit(key, reversed=True)
+        self.rules = rules
+        self.rules_pattern = re.compile('|'.join(re.escape(k) for k in sorted(rules, key=len, reverse=True))) \
+            if rules else None
+        # Single characters are translated independently, so their translation is one table:
+        self.table = dict()
+        for start, end in pack.character_ranges:
+            for code in range(start, end + 1):
+                translated = pack.translit(chr(code), reversed=True)
+                if translated != chr(code):
+                    self.table[code] = translated
+
+    def translit(self, value: str) -> str:
+        """ Transliterate string to latin.
+
+        :param value: Input string.
+        :return: Transliterated string.
+        """
+        if self.rules_pattern is not None:
+            value = self.rules_pattern.sub(lambda m: self.rules[m.group(0)], value)
+        return value.translate(self.table)
+
+
+TRANSLITERATOR = Transliterator(language_code='ru')
+
+
+def _apply_case(tokens: list, case: str) -> list:
+    """ Apply transformation to all tokens at once (tokens are joined to one string).
+
+    :param tokens: Input tokens.
+    :param case: Type of transformations.
+    :return: Transformed tokens.
+    """
+    if case == 'orig' or not tokens:
+        return tokens
+    s = _SEP.join(tokens)
+    if case.endswith('lowercase'):
+        s = s.lower()
+    if case.endswith('uppercase'):
+        s = s.upper()
+    if case.startswith('transliterated'):
+        s = TRANSLITERATOR.translit(value=s)
+    return s.split(_SEP)
+
+
+def transform(tokens: list, transformation_case: str = None, rng: np.random.Generator = None) -> list:
     """ Transform input tokens to:
         * original (no transformations)
         * lowercase
@@ -15,20 +87,32 @@ def transform(tokens: list, transformation_case: str = None) -> list:
 
     :param tokens: Input tokens.
     :param transformation_case: Type of transformations (can be None, then it will be chosen random).
+    :param rng: Random generator for choosing type of transformations (if None, then global NumPy state is used).
     :return: Transformed tokens.
     """
     if transformation_case is None or transformation_case not in TRANSFORMATION_CASES[0]:
-        case = np.random.choice(a=TRANSFORMATION_CASES[0], p=TRANSFORMATION_CASES[1])
+        case = (np.random if rng is None else rng).choice(a=TRANSFORMATION_CASES[0], p=TRANSFORMATION_CASES[1])
     else:
         case = transformation_case
-    if case == 'orig_lowercase':
-        tokens = [token.lower() for token in tokens]
-    if case == 'orig_uppercase':
-        tokens = [token.upper() for token in tokens]
-    if case == 'transliterated':
-        tokens = [transliterate.translit(value=token, language_code='ru', reversed=True) for token in tokens]
-    if case == 'transliterated_lowercase':
-        tokens = [transliterate.translit(value=token.lower(), language_code='ru', reversed=True) for token in tokens]
-    if case == 'transliterated_uppercase':
-        tokens = [transliterate.translit(value=token.upper(), language_code='ru', reversed=True) for token in tokens]
-    return tokens
+    return _apply_case(tokens=tokens, case=case)
+
+
+def transform_batch(
+        tokens_list: typing.List[list],
+        transformation_case: str = None,
+        rng: np.random.Generator = None,
+) -> typing.List[list]:
+    """ Transform batch of sentences (see 'transform'). Types of transformations for all sentences are chosen by one
+    vectorized draw.
+
+    :param tokens_list: Sentences tokens.
+    :param transformation_case: Type of transformations for all sentences (can be None, then it will be chosen random
+    for every sentence).
+    :param rng: Random generator for choosing types of transformations (if None, then global NumPy state is used).
+    :return: Transformed sentences tokens.
+    """
+    if transformation_case is None or transformation_case not in TRANSFORMATION_CASES[0]:
+        cases = (np.random if rng is None else rng).choice(a=len(TRANSFORMATION_CASES[0]), size=len(tokens_list),
+                                                           p=TRANSFORMATION_CASES[1])
+        return [_apply_case(tokens=tokens, case=TRANSFORMATION_CASES[0][i]) for tokens, i in zip(tokens_list, cases)]
+    return [_apply_case(tokens=tokens, case=transformation_case) for tokens in tokens_list]
@@ -0,0 +1,121 @@
+import typing, pathlib, argparse, threading
+import numpy as np
+import marisa_trie
+
+from src import DIR_VOCABS
+from src.utils.alias import AliasTable
+from src.utils.load_txt import load_weighted_txt
+
+VOCAB_FILES = {
+    'COUNTRIES': 'location/countries.txt',
+    'REGIONS': 'location/regions.txt',
+    'CITIES': 'location/cities.txt',
+    'DISTRICTS': 'location/districts.txt',
+    'STREETS': 'location/streets.txt',
+    'LAST_NAMES_MALE': 'names/last_names_male.txt',
+    'LAST_NAMES_FEMALE': 'names/last_names_female.txt',
+    'FIRST_NAMES_MALE': 'names/first_names_male.txt',
+    'FIRST_NAMES_FEMALE': 'names/first_names_female.txt',
+    'MIDDLE_NAMES_MALE': 'names/middle_names_male.txt',
+    'MIDDLE_NAMES_FEMALE': 'names/middle_names_female.txt',
+}
+
+_VOCABS, _ALIASES = dict(), dict()
+_VOCABS_LOCK = threading.RLock()
+
+
+def trie_path(name: str) -> pathlib.Path:
+    """ Get path to prebuilt trie of vocab.
+
+    :param name: Vocab name (key of 'VOCAB_FILES').
+    :return: Path to '.marisa' file.
+    """
+    return (DIR_VOCABS/VOCAB_FILES[name]).with_suffix('.marisa')
+
+
+def weights_path(name: str) -> pathlib.Path:
+    """ Get path to prebuilt weights of vocab entries (aligned with ids of prebuilt trie).
+
+    :param name: Vocab name (key of 'VOCAB_FILES').
+    :return: Path to '.weights.npy' file.
+    """
+    return (DIR_VOCABS/VOCAB_FILES[name]).with_suffix('.weights.npy')
+
+
+def _is_fresh(path: pathlib.Path, name: str) -> bool:
+    return path.exists() and path.stat().st_mtime >= (DIR_VOCABS/VOCAB_FILES[name]).stat().st_mtime
+
+
+def _align_weights(trie: marisa_trie.Trie, keys: list, weights: list) -> np.ndarray:
+    """ Order weights by trie ids of keys.
+
+    :param trie: Vocab trie.
+    :param keys: Vocab entries.
+    :param weights: Weights of entries.
+    :return: Weights array (index = trie id).
+    """
+    aligned = np.zeros(len(trie), dtype=np.float64)
+    for key, weight in zip(keys, weights):
+        aligned[trie[key]] = weight
+    return aligned
+
+
+def load_vocab(name: str) -> marisa_trie.Trie:
+    """ Load vocab trie on first access (next calls return the same object). If prebuilt '.marisa' file exists and it
+    isn't older than txt file, then trie is memory-mapped (pages are shared between processes), otherwise trie is built
+    from txt file.
+
+    :param name: Vocab name (key of 'VOCAB_FILES').
+    :return: Vocab trie.
+    """
+    with _VOCABS_LOCK:
+        if name not in _VOCABS:
+            if _is_fresh(path=trie_path(name=name), name=name):
+                _VOCABS[name] = marisa_trie.Trie().mmap(str(trie_path(name=name)))
+            else:
+                keys, weights = load_weighted_txt(path=DIR_VOCABS/VOCAB_FILES[name])
+                _VOCABS[name] = marisa_trie.Trie(keys)
+                # Weights are parsed with keys, so alias table is built at once:
+                _ALIASES[name] = AliasTable(weights=_align_weights(trie=_VOCABS[name], keys=keys, weights=weights)) \
+                    if weights is not None else None
+        return _VOCABS[name]
+
+
+def load_alias(name: str) -> typing.Optional[AliasTable]:
+    """ Load alias table of vocab weights on first access (next calls return the same object). Weights are the last
+    tab-separated column of vocab txt file (see 'load_weighted_txt'), table is aligned with trie ids of entries.
+
+    :param name: Vocab name (key of 'VOCAB_FILES').
+    :return: Alias table (None if vocab has no weights, then sampling is uniform).
+    """
+    with _VOCABS_LOCK:
+        load_vocab(name=name)
+        if name not in _ALIASES:
+            # Trie is prebuilt, so weights are prebuilt too (if vocab has them):
+            path = weights_path(name=name)
+            _ALIASES[name] = AliasTable(weights=np.load(file=str(path))) if _is_fresh(path=path, name=name) else None
+        return _ALIASES[name]
+
+
+def build_tries(names: typing.List[str] = None) -> None:
+    """ Build vocab tries from txt files and save them next to txt files (as '.marisa' files, weights of weighted
+    vocabs are saved as '.weights.npy' files).
+
+    :param names: Vocab names (if None, then all vocabs are built).
+    :return:
+    """
+    for name in names if names is not None else VOCAB_FILES:
+        keys, weights = load_weighted_txt(path=DIR_VOCABS/VOCAB_FILES[name])
+        trie = marisa_trie.Trie(keys)
+        trie.save(str(trie_path(name=name)))
+        if weights is not None:
+            np.save(file=str(weights_path(name=name)), arr=_align_weights(trie=trie, keys=keys, weights=weights))
+        elif weights_path(name=name).exists():
+            weights_path(name=name).unlink()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build prebuilt vocab tries for memory-mapped loading.')
+    parser.add_argument('names', nargs='*', help=f'Vocab names: {", ".join(VOCAB_FILES)} (default: all).')
+    args = parser.parse_args()
+    build_tries(names=args.names if args.names else None)
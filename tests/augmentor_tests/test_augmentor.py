@@ -0,0 +1,53 @@
+import asyncio
+import pytest
+
+from src.augmentor import RUNERAugmentor
+
+
+def test_group_spans_bio():
+    assert RUNERAugmentor.group_spans(
+        tags=['O', 'B-PER', 'I-PER', 'O', 'B-LOC', 'B-LOC', 'I-LOC', 'B-ORG', 'I-ORG']
+    ) == [(1, 3, 'PER'), (4, 5, 'LOC'), (5, 7, 'LOC')]
+
+
+def test_group_spans_biolu():
+    assert RUNERAugmentor.group_spans(
+        tags=['U-LOC', 'U-LOC', 'B-PER', 'L-PER', 'I-PER', 'O']
+    ) == [(0, 1, 'LOC'), (1, 2, 'LOC'), (2, 4, 'PER'), (4, 5, 'PER')]
+
+
+def test_tagging():
+    tokens, tags = RUNERAugmentor.tagging(s=['123456', 'улица Ленина', 'Москва'], t=['O', 'STREET', 'CITY'])
+    assert tokens == ['123456', 'улица', 'Ленина', 'Москва']
+    assert tags == ['O', 'O', 'U-STREET', 'U-CITY']
+
+
+def test_augment_async_matches_sync():
+    inputs = [('Москве', 'LOC'), ('Иванову', 'PER'), ('Тверь', 'LOC')]
+    aug_sync, aug_async = RUNERAugmentor(seed=5), RUNERAugmentor(seed=5)
+
+    async def run() -> list:
+        return [await aug_async.augment_async(s=s, tag=tag) for s, tag in inputs]
+
+    assert asyncio.run(run()) == [aug_sync.augment(s=s, tag=tag) for s, tag in inputs]
+
+
+def test_augment_corpus():
+    tokens_list = [['Я', 'встретил', 'Ивана', 'Петрова', 'в', 'Москве', '.'], ['Привет', '!']]
+    tags_list = [['O', 'O', 'B-PER', 'I-PER', 'O', 'B-LOC', 'O'], ['O', 'O']]
+    tokens, tags = RUNERAugmentor(seed=1).augment_corpus(tokens_list=tokens_list, tags_list=tags_list, n_variants=3)
+    assert len(tokens) == len(tags) == 6
+    # Variants follow in input order, sentence without entities is kept:
+    assert tokens[3:] == [['Привет', '!']] * 3 and tags[3:] == [['O', 'O']] * 3
+    for t, g in zip(tokens[:3], tags[:3]):
+        assert len(t) == len(g) and t[:2] == ['Я', 'встретил'] and t[-1] == '.' and g[:2] == ['O', 'O'] and g[-1] == 'O'
+        assert not {'Ивана', 'Петрова', 'Москве'} & set(t)
+        # Person span is replaced by name tokens, then 'в' is kept and location span is replaced:
+        end = 2 + next(i for i, tag in enumerate(g[2:]) if tag == 'O')
+        assert end > 2 and all('NAME' in tag for tag in g[2:end])
+        assert t[end] == 'в' and any(tag != 'O' for tag in g[end + 1:-1])
+    assert (tokens, tags) == RUNERAugmentor(seed=1).augment_corpus(tokens_list=tokens_list, tags_list=tags_list,
+                                                                   n_variants=3)
+    for n_variants in [0, -1]:
+        with pytest.raises(ValueError):
+            RUNERAugmentor(seed=1).augment_corpus(tokens_list=tokens_list, tags_list=tags_list, n_variants=n_variants)
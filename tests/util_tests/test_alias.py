@@ -0,0 +1,14 @@
+import random
+import numpy as np
+
+from src.utils.alias import AliasTable
+
+
+def test_alias_table_distribution():
+    weights = [5, 1, 0, 2, 2]
+    table = AliasTable(weights=weights)
+    counts = np.bincount(table.sample_batch(n=100000, rng=np.random.default_rng(0)), minlength=len(weights))
+    assert np.allclose(counts / counts.sum(), np.array(weights) / sum(weights), atol=0.01)
+    rng = random.Random(0)
+    counts = np.bincount([table.sample(rng=rng) for _ in range(100000)], minlength=len(weights))
+    assert np.allclose(counts / counts.sum(), np.array(weights) / sum(weights), atol=0.01)
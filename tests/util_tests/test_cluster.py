@@ -0,0 +1,63 @@
+import json
+import pytest
+
+from src.cluster import plan_shards, shard_path, run_shard, merge_shards, file_sha256, manifest_sha256, parse_shard
+from src.pipeline import augment_stream, save_checkpoint
+
+
+def test_plan_and_merge_shards(tmp_path):
+    input_path = tmp_path/'corpus.jsonl'
+    input_path.write_text(''.join(json.dumps({'tokens': [str(i)], 'ner_tags': ['O']}) + '\n' for i in range(10)))
+    manifest = plan_shards(input_path=input_path, n_shards=3, chunk_size=3)
+    assert [shard['chunks'] for shard in manifest['shards']] == [[0, 1], [1, 2], [2, 4]]
+    assert [shard['rows'] for shard in manifest['shards']] == [[0, 3], [3, 6], [6, 10]]
+    assert parse_shard(shard='2/3') == (2, 3)
+    for shard in manifest['shards']:
+        path = shard_path(manifest=manifest, output_dir=tmp_path/'out', index=shard['index'])
+        path.parent.mkdir(exist_ok=True)
+        path.write_text(f'{shard["index"]}\n' * (shard['rows'][1] - shard['rows'][0]))
+        save_checkpoint(path=f'{path}.done.json', checkpoint={
+            'index': shard['index'], 'rows': shard['rows'][1] - shard['rows'][0], 'bytes': path.stat().st_size,
+            'sha256': file_sha256(path=path), 'manifest_sha256': manifest_sha256(manifest=manifest),
+        })
+    merged = merge_shards(manifest=manifest, output_dir=tmp_path/'out', output_path=tmp_path/'merged.jsonl')
+    assert merged['rows'] == 10 and (tmp_path/'merged.jsonl').read_text() == '0\n' * 3 + '1\n' * 3 + '2\n' * 4
+    shard_path(manifest=manifest, output_dir=tmp_path/'out', index=1).write_text('x\n' * 3)
+    with pytest.raises(RuntimeError):
+        merge_shards(manifest=manifest, output_dir=tmp_path/'out', output_path=tmp_path/'merged.jsonl')
+
+
+def test_run_shards_more_than_chunks_csv(tmp_path):
+    input_path = tmp_path/'corpus.csv'
+    input_path.write_text('tokens,ner_tags\n' + ''.join(
+        f'"[\'в\', \'{city}\']","[\'O\', \'U-LOC\']"\n' for city in ['Москве', 'Твери']
+    ), encoding='utf-8')
+    # 2 chunks, 5 shards: 3 shards are empty
+    manifest = plan_shards(input_path=input_path, n_shards=5, chunk_size=1, n_variants=2)
+    assert [shard['chunks'] for shard in manifest['shards']] == [[0, 0], [0, 0], [0, 1], [1, 1], [1, 2]]
+    for i in range(5):
+        run_shard(manifest=manifest, index=i, output_dir=tmp_path/'out')
+    merge_shards(manifest=manifest, output_dir=tmp_path/'out', output_path=tmp_path/'merged.csv')
+    augment_stream(input_path=input_path, output_path=tmp_path/'single.csv', chunk_size=1, n_variants=2)
+    merged = (tmp_path/'merged.csv').read_bytes()
+    assert merged == (tmp_path/'single.csv').read_bytes() and merged.count(b'tokens,ner_tags') == 1
+    assert len(merged.decode('utf-8').splitlines()) == 5
+
+
+def test_stale_shards_are_rejected(tmp_path):
+    input_path = tmp_path/'corpus.jsonl'
+    input_path.write_text(''.join(json.dumps({'tokens': ['в', city], 'ner_tags': ['O', 'U-LOC']}, ensure_ascii=False)
+                                  + '\n' for city in ['Москве', 'Твери', 'Туле']), encoding='utf-8')
+    manifest = plan_shards(input_path=input_path, n_shards=2, chunk_size=1)
+    for i in range(2):
+        run_shard(manifest=manifest, index=i, output_dir=tmp_path/'out')
+    # The same outputs and checkpoints with other plan:
+    other = plan_shards(input_path=input_path, n_shards=2, chunk_size=1, seed=manifest['seed'] + 1)
+    with pytest.raises(RuntimeError):
+        merge_shards(manifest=other, output_dir=tmp_path/'out', output_path=tmp_path/'merged.jsonl')
+    with pytest.raises(ValueError):
+        run_shard(manifest=other, index=0, output_dir=tmp_path/'out')
+    other['shards'][1]['seeds'][0] += 1
+    with pytest.raises(ValueError):
+        run_shard(manifest=other, index=1, output_dir=tmp_path/'out2')
+    assert merge_shards(manifest=manifest, output_dir=tmp_path/'out', output_path=tmp_path/'merged.jsonl')['rows'] == 3
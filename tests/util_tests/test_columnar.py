@@ -0,0 +1,14 @@
+from src.utils.columnar import ColumnarWriter, ColumnarCorpus
+
+
+def test_columnar_corpus(tmp_path):
+    tokens_list = [['Я', 'живу', 'в', 'Москве'], ['Москва'], [], ['Иван', 'Петров']]
+    tags_list = [['O', 'O', 'O', 'U-DMN_CITY'], ['U-DMN_CITY'], [], ['B-DMN_FIRST_NAME', 'L-DMN_LAST_NAME']]
+    with ColumnarWriter(path=tmp_path, shard_size=3) as writer:
+        writer.write(tokens_list=tokens_list[:1], tags_list=tags_list[:1])
+        writer.write(tokens_list=tokens_list[1:], tags_list=tags_list[1:])
+    corpus = ColumnarCorpus(path=tmp_path)
+    assert len(corpus) == 4 and len(corpus.manifest['shards']) == 2
+    assert list(corpus) == list(zip(tokens_list, tags_list))
+    assert corpus[-1] == (['Иван', 'Петров'], ['B-DMN_FIRST_NAME', 'L-DMN_LAST_NAME'])
+    assert corpus.ids(i=1)[0].tolist() == [4]
@@ -0,0 +1,23 @@
+import pytest
+
+from src.utils.corpus_io import read_corpus, CorpusWriter
+
+samples = [
+    (['Татьяна', 'Голикова', 'рассказала'], ['B-PER', 'I-PER', 'O']),
+    (['в', 'Севастополе', ',', "'", '"'], ['O', 'B-LOC', 'O', 'O', 'O']),
+]
+
+
+@pytest.mark.parametrize('corpus_format', ['csv', 'jsonl', 'conll'])
+def test_corpus_roundtrip(tmp_path, corpus_format):
+    path = tmp_path/f'corpus.{corpus_format}'
+    with CorpusWriter(path=path) as writer:
+        writer.write(tokens_list=[samples[0][0]], tags_list=[samples[0][1]])
+    with CorpusWriter(path=path, append=True) as writer:
+        writer.write(tokens_list=[samples[1][0]], tags_list=[samples[1][1]])
+    assert list(read_corpus(path=path)) == samples
+    assert list(read_corpus(path=path, skip=1)) == samples[1:]
+
+
+def test_read_ner_samples():
+    assert len(list(read_corpus(path='ner_samples.csv'))) == 100
@@ -0,0 +1,19 @@
+import pytest
+
+from src.utils.coverage import CoverageTracker
+from src.utils.tag_vocab import TAG_VOCAB
+
+
+def test_coverage_tracker():
+    tracker = CoverageTracker(tags={'DMN_CITY': 2, 'DMN_STREET': 1}, vocabs={'CITIES': 2}, cases={'gent': 1})
+    ids = TAG_VOCAB.encode(tags=['O', 'B-STREET', 'L-STREET', 'U-CITY'])
+    tracker.observe_sample(ids=ids, cases=['gent', 'gent'])
+    tracker.observe_vocab(vocab='CITIES', entry='Тверь')
+    tracker.observe_vocab(vocab='STREETS', entry='Тверская')
+    assert tracker.deficit(kind='tag', key='DMN_CITY') == 0.5 and tracker.deficit(kind='tag', key='DMN_STREET') == 0
+    assert tracker.deficit(kind='vocab', key='CITIES') == 0.5 and not tracker.done()
+    tracker.observe_sample(ids=TAG_VOCAB.encode(tags=['U-CITY']), cases=['nomn'])
+    tracker.observe_vocab(vocab='CITIES', entry='Орёл')
+    assert tracker.done() and tracker.report()['tags']['DMN_CITY'] == (2, 2)
+    with pytest.raises(ValueError):
+        CoverageTracker(tags={'DMN_PLANET': 1})
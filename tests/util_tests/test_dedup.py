@@ -0,0 +1,27 @@
+from src.utils.dedup import BloomFilter, Deduplicator
+
+
+def test_bloom_filter(tmp_path):
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    assert all(bloom.add(key=str(i)) for i in range(1000))
+    assert not bloom.add(key='1') and '999' in bloom
+    assert sum(str(i) in bloom for i in range(1000, 11000)) < 300
+    assert abs(bloom.cardinality() - 1000) < 50
+    bloom.save(path=tmp_path/'bloom.npz')
+    loaded = BloomFilter.load(path=tmp_path/'bloom.npz')
+    assert loaded.bits == bloom.bits and '5' in loaded
+    assert BloomFilter(capacity=10 ** 6, error_rate=0.001, max_bytes=1024).n_bytes == 1024
+
+
+def test_deduplicator_retries_and_merge():
+    dedup = Deduplicator(level='entity', capacity=100, retries=2)
+    assert dedup.check(tokens=['Иванов'], attempt=0)
+    assert not dedup.check(tokens=['Иванов'], attempt=0)
+    assert dedup.check(tokens=['Иванов'], attempt=2)
+    assert dedup.stats()['collisions'] == 2 and dedup.stats()['accepted_duplicates'] == 1
+    shard_1, shard_2 = dedup.fork(), dedup.fork()
+    assert not shard_1.check(tokens=['Иванов'], attempt=0)
+    assert shard_1.check(tokens=['Петров'], attempt=0) and shard_2.check(tokens=['Петров'], attempt=0)
+    dedup.update(other=shard_1)
+    dedup.update(other=shard_2)
+    assert 'Петров' in dedup.bloom and dedup.stats()['cross_shard_duplicates'] == 1
@@ -0,0 +1,49 @@
+import random
+import numpy as np
+
+from src.utils.entity_bank import EntityBank
+
+
+class CountingGenerator:
+    def __init__(self) -> None:
+        self.n = 0
+
+    def generate_augmentation_ids(self, entity: str, inflecting_tags: tuple) -> tuple:
+        self.n += 1
+        return [f'{entity}{self.n}'], np.array([1], dtype=np.int32)
+
+    def generate_augmentation_batch(self, entity: str, inflecting_tags: tuple, n: int) -> list:
+        return [self.generate_augmentation_ids(entity=entity, inflecting_tags=inflecting_tags) for _ in range(n)]
+
+
+def test_entity_bank_reuse_limit():
+    bank = EntityBank(pool_size=4, low_water=1, reuse_limit=2, generator=CountingGenerator(), background=False)
+    rng = random.Random(0)
+    drawn = [bank.draw(entity='city', inflecting_tags=('NOUN', 'datv', 'femn', 'sing'), rng=rng)[0][0]
+             for _ in range(40)]
+    assert max(drawn.count(token) for token in set(drawn)) <= 2
+    assert bank.stats()['draws'] == 40 and bank.stats()['misses'] == 1
+
+
+def test_entity_bank_save_load(tmp_path):
+    bank = EntityBank(pool_size=3, low_water=1, reuse_limit=2, generator=CountingGenerator(), background=False)
+    bank.warm(entities=['city', 'street'], inflecting_tags_list=[('NOUN', 'nomn', 'masc', 'sing')])
+    bank.save(path=tmp_path/'bank.json')
+    loaded = EntityBank(pool_size=3, low_water=1, generator=CountingGenerator(), background=False)
+    loaded.load(path=tmp_path/'bank.json')
+    assert len(loaded) == 6
+    tokens, ids = loaded.draw(entity='street', inflecting_tags=('NOUN', 'nomn', 'masc', 'sing'))
+    assert tokens[0].startswith('street') and ids.tolist() == [1]
+    assert loaded.generator.n == 0
+
+
+def test_entity_bank_close_stops_thread():
+    with EntityBank(pool_size=4, low_water=3, generator=CountingGenerator()) as bank:
+        thread = bank._thread
+        for _ in range(10):
+            bank.draw(entity='city', inflecting_tags=('NOUN', 'nomn', 'femn', 'sing'))
+        assert thread.is_alive()
+    assert not thread.is_alive() and bank._thread is None
+    # Closed bank is refilled in place:
+    assert bank.draw(entity='street', inflecting_tags=('NOUN', 'nomn', 'femn', 'sing'))[0][0].startswith('street')
+    bank.close()
@@ -0,0 +1,37 @@
+import json, itertools
+import numpy as np
+import marisa_trie
+
+from src.augmentor import RUNERAugmentor
+from src.utils.inflection_table import InflectionTable, build_inflection_table, POS, CASES, GENDERS, NUMBERS
+from src.utils.vocab import load_vocab
+
+
+def test_inflection_table_lookup(tmp_path):
+    tokens, forms = marisa_trie.Trie(['Москва', 'Сочи']), marisa_trie.Trie(['москве', 'москвой'])
+    combinations = [['NOUN', 'datv', 'femn', 'sing'], ['NOUN', 'ablt', 'femn', 'sing']]
+    table = np.full(shape=(2, 2), fill_value=-1, dtype=np.int32)
+    table[tokens['Москва']] = [forms['москве'], forms['москвой']]
+    tokens.save(str(tmp_path/'tokens.marisa'))
+    forms.save(str(tmp_path/'forms.marisa'))
+    np.save(file=str(tmp_path/'table.npy'), arr=table)
+    with (tmp_path/'meta.json').open('w') as f:
+        json.dump({'combinations': combinations}, f)
+    inflection_table = InflectionTable(path=tmp_path)
+    assert inflection_table.inflect(word='Москва', grammemes={'NOUN', 'datv', 'femn', 'sing'}) == 'москве'
+    assert inflection_table.inflect(word='Москва', grammemes=('sing', 'femn', 'ablt', 'NOUN')) == 'москвой'
+    assert inflection_table.inflect(word='Сочи', grammemes={'NOUN', 'datv', 'femn', 'sing'}) is None
+    assert inflection_table.inflect(word='Тверь', grammemes={'NOUN', 'datv', 'femn', 'sing'}) is None
+    assert inflection_table.stats() == {'hits': 3, 'misses': 1, 'hit_rate': 0.75}
+
+
+def test_built_table_matches_morph(tmp_path):
+    tokens = sorted({token for name in ['CITIES', 'REGIONS', 'STREETS', 'LAST_NAMES_FEMALE']
+                     for key in list(load_vocab(name=name).keys())[:10] for token in key.split(' ') if token})
+    build_inflection_table(out_dir=tmp_path, tokens=tokens)
+    morph = RUNERAugmentor(inflection_mode='morph')
+    table = RUNERAugmentor(inflection_mode='table', inflection_table=InflectionTable(path=tmp_path))
+    for token in tokens:
+        for combination in itertools.product(POS, CASES, GENDERS, NUMBERS):
+            assert table.inflect(s=token, tags=set(combination)) == morph.inflect(s=token, tags=set(combination))
+    assert table.inflector.stats()['misses'] == 0
@@ -1,4 +1,4 @@
-from src.utils.load_txt import load_txt
+from src.utils.load_txt import load_txt, load_weighted_txt
 from src import DIR_VOCABS, COUNTRIES, REGIONS, CITIES, DISTRICTS, STREETS, LAST_NAMES_MALE, LAST_NAMES_FEMALE, \
     FIRST_NAMES_MALE, FIRST_NAMES_FEMALE, MIDDLE_NAMES_MALE, MIDDLE_NAMES_FEMALE
 
@@ -16,3 +16,12 @@ def test_load_txt_file():
     assert sorted(set(load_txt(path=f'{DIR_VOCABS}/names/middle_names_male.txt'))) == sorted(MIDDLE_NAMES_MALE.keys())
     assert sorted(set(load_txt(path=f'{DIR_VOCABS}/names/middle_names_female.txt'))) == sorted(MIDDLE_NAMES_FEMALE.keys())
     assert sorted(set(load_txt(path=f'{DIR_VOCABS}/location/countries.txt'))) == sorted(COUNTRIES.keys())
+
+
+def test_load_weighted_txt(tmp_path):
+    path = tmp_path/'vocab.txt'
+    path.write_text('Москва\t100\nСан-Марино\tРеспублика Сан-Марино\nТверь\t2.5\nМосква\t20\n', encoding='utf-8')
+    keys, weights = load_weighted_txt(path=path)
+    assert dict(zip(keys, weights)) == {'Москва': 120.0, 'Сан-Марино\tРеспублика Сан-Марино': 1.0, 'Тверь': 2.5}
+    path.write_text('Москва\nТверь\n', encoding='utf-8')
+    assert load_weighted_txt(path=path) == (['Москва', 'Тверь'], None)
@@ -0,0 +1,16 @@
+import random
+
+from src.utils.matcher import REPLACERS, strip_anchors
+
+
+def test_replacers():
+    assert REPLACERS['STREET'].replace(s='улица Мостовая', dot=True) == 'ул. Мостовая'
+    assert REPLACERS['STREET'].replace(s='улица Мостовая', dot=False) == 'ул Мостовая'
+    assert REPLACERS['REGION'].replace(s='Еврейская автономная область') == 'Еврейская ао'
+    assert REPLACERS['DISTRICT'](s='Курский район ', rng=random.Random(0)) == 'Курский р-н'
+
+
+def test_strip_anchors():
+    assert strip_anchors(s='улица Шамшиных', label='STREET') == 'Шамшиных'
+    assert strip_anchors(s='Тверская Улица', label='STREET') == 'Тверская'
+    assert strip_anchors(s='улица', label='STREET') == 'улица'
@@ -0,0 +1,19 @@
+from src.utils.morphology import LRUCache
+
+
+def test_lru_cache_counters():
+    cache = LRUCache(maxsize=2)
+    cache.put(key='a', value=1)
+    cache.put(key='b', value=2)
+    assert cache.get(key='a') == 1
+    cache.put(key='c', value=3)
+    assert cache.get(key='b') is None
+    assert cache.get(key='c') == 3
+    assert cache.stats() == {'size': 2, 'maxsize': 2, 'hits': 2, 'misses': 1, 'evictions': 1, 'hit_rate': 2 / 3}
+
+
+def test_lru_cache_stores_none():
+    cache = LRUCache(maxsize=1)
+    cache.put(key='a', value=None)
+    assert cache.get(key='a', default=-1) is None
+    assert cache.hits == 1
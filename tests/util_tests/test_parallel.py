@@ -0,0 +1,37 @@
+from src.augmentor import RUNERAugmentor
+from src.utils.entity_bank import EntityBank
+from src.utils.parallel import derive_seed, augment_parallel, _augment_shard
+
+
+def test_derive_seed():
+    assert derive_seed(seed=42, index=0) == derive_seed(seed=42, index=0)
+    assert len({derive_seed(seed=42, index=i) for i in range(1000)}) == 1000
+    assert all(0 <= derive_seed(seed=s, index=0) < 2 ** 32 for s in range(100))
+
+
+def test_augment_parallel_does_not_depend_on_workers():
+    cities = ['Москве', 'Твери', 'Туле', 'Казани', 'Перми', 'Омске', 'Уфе']
+    tokens_list = [['Я', 'живу', 'в', city] for city in cities]
+    tags_list = [['O', 'O', 'O', 'U-LOC']] * len(cities)
+    kwargs = {'tokens_list': tokens_list, 'tags_list': tags_list, 'n_variants': 2, 'shard_size': 2, 'seed': 3,
+              'transformation': True}
+    tokens, tags = augment_parallel(n_workers=1, **kwargs)
+    assert len(tokens) == len(tags) == 14 and all(len(t) == len(g) for t, g in zip(tokens, tags))
+    assert (tokens, tags) == augment_parallel(n_workers=2, **kwargs)
+
+
+def test_worker_banks_refill_different_entities(tmp_path):
+    key = ('city', ('NOUN', 'gent', 'femn', 'sing'))
+    with EntityBank(pool_size=2, background=False) as bank:
+        bank.warm(entities=['street'], inflecting_tags_list=[key[1]])
+        bank.save(path=tmp_path/'bank.json')
+    refilled = list()
+    # Two workers with banks loaded from the same file start different shards and refill the same pool:
+    for i in range(2):
+        with EntityBank(pool_size=4, background=False) as bank:
+            bank.load(path=tmp_path/'bank.json')
+            _augment_shard(shard=(derive_seed(seed=7, index=i), [], [], 1, False),
+                           augmentor=RUNERAugmentor(entity_bank=bank))
+            bank.warm(entities=[key[0]], inflecting_tags_list=[key[1]])
+            refilled += [[entity[0] for entity in bank.pools[key]]]
+    assert len(refilled[0]) == len(refilled[1]) == 4 and refilled[0] != refilled[1]
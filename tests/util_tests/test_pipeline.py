@@ -0,0 +1,62 @@
+import json, argparse
+import pytest
+
+import src.pipeline
+from src.pipeline import augment_stream, positive_int
+
+
+def _write_corpus(path, cities) -> None:
+    path.write_text(''.join(json.dumps({'tokens': ['Я', 'живу', 'в', city], 'ner_tags': ['O', 'O', 'O', 'U-LOC']},
+                                       ensure_ascii=False) + '\n' for city in cities), encoding='utf-8')
+
+
+def test_resumed_stream_is_identical(tmp_path, monkeypatch):
+    input_path = tmp_path/'corpus.jsonl'
+    _write_corpus(path=input_path, cities=['Москве', 'Твери', 'Туле', 'Казани', 'Перми', 'Омске', 'Уфе'])
+    kwargs = {'input_path': input_path, 'chunk_size': 2, 'n_variants': 2, 'seed': 7}
+    augment_stream(output_path=tmp_path/'full.jsonl', **kwargs)
+
+    imap_shards = src.pipeline.imap_shards
+
+    def interrupted(*args, **kw):
+        for i, result in enumerate(imap_shards(*args, **kw)):
+            if i == 2:
+                # Output written after the last checkpoint is dropped on resume:
+                with open(str(tmp_path/'resumed.jsonl'), 'a') as f:
+                    f.write('{"tokens": ["partial')
+                raise KeyboardInterrupt
+            yield result
+
+    monkeypatch.setattr(src.pipeline, 'imap_shards', interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        augment_stream(output_path=tmp_path/'resumed.jsonl', checkpoint_path=tmp_path/'checkpoint.json', **kwargs)
+    assert json.loads((tmp_path/'checkpoint.json').read_text())['chunks'] == 2
+    monkeypatch.setattr(src.pipeline, 'imap_shards', imap_shards)
+    with pytest.raises(ValueError):
+        augment_stream(output_path=tmp_path/'resumed.jsonl', checkpoint_path=tmp_path/'checkpoint.json',
+                       **{**kwargs, 'seed': 8})
+    checkpoint = augment_stream(output_path=tmp_path/'resumed.jsonl', checkpoint_path=tmp_path/'checkpoint.json',
+                                **kwargs)
+    assert checkpoint['rows'] == 7 and checkpoint['chunks'] == 4
+    assert (tmp_path/'resumed.jsonl').read_bytes() == (tmp_path/'full.jsonl').read_bytes()
+
+
+def test_resume_with_changed_input_fails(tmp_path):
+    input_path = tmp_path/'corpus.jsonl'
+    _write_corpus(path=input_path, cities=['Москве', 'Твери'])
+    augment_stream(input_path=input_path, output_path=tmp_path/'out.jsonl', chunk_size=1,
+                   checkpoint_path=tmp_path/'checkpoint.json')
+    _write_corpus(path=input_path, cities=['Москве', 'Туле'])
+    with pytest.raises(ValueError):
+        augment_stream(input_path=input_path, output_path=tmp_path/'out.jsonl', chunk_size=1,
+                       checkpoint_path=tmp_path/'checkpoint.json')
+
+
+def test_stream_rejects_bad_variants(tmp_path):
+    input_path = tmp_path/'corpus.jsonl'
+    _write_corpus(path=input_path, cities=['Москве'])
+    with pytest.raises(ValueError):
+        augment_stream(input_path=input_path, output_path=tmp_path/'out.jsonl', n_variants=0)
+    with pytest.raises(argparse.ArgumentTypeError):
+        positive_int(value='0')
+    assert positive_int(value='3') == 3
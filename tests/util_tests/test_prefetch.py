@@ -0,0 +1,46 @@
+import pytest
+
+from src.utils import parallel
+from src.utils.prefetch import AugmentationStream
+
+
+def test_stream_batches_cover_corpus_every_epoch():
+    tokens_list = [[str(i)] for i in range(10)]
+    stream = AugmentationStream(tokens_list=tokens_list, tags_list=[['O']] * 10, batch_size=4, epochs=2)
+    jobs = list(stream._jobs())
+    assert [len(job[1]) for job in jobs] == [4, 4, 2, 4, 4, 2]
+    assert sorted(t[0] for job in jobs[:3] for t in job[1]) == sorted(str(i) for i in range(10))
+    assert len({job[0] for job in jobs}) == 6
+    assert [job[1] for job in jobs] == [job[1] for job in stream._jobs()]
+
+
+def test_stream_raises_producer_error():
+    # The second sentence has more tags than tokens:
+    tokens_list, tags_list = [['Москва'], ['в']], [['U-LOC'], ['O', 'U-LOC']]
+    for backend in ['thread', 'process']:
+        stream = AugmentationStream(tokens_list=tokens_list, tags_list=tags_list, batch_size=1, epochs=1,
+                                    shuffle=False, n_workers=1, backend=backend, transformation=False)
+        batches = list()
+        try:
+            with pytest.raises(IndexError):
+                for batch in stream:
+                    batches += [batch]
+        finally:
+            stream.close()
+        assert len(batches) == 1
+
+
+def test_stream_rejects_bad_corpus():
+    with pytest.raises(ValueError):
+        AugmentationStream(tokens_list=[], tags_list=[])
+    with pytest.raises(ValueError):
+        AugmentationStream(tokens_list=[['Москва']], tags_list=[])
+
+
+def test_single_process_stream_keeps_worker_augmentor():
+    parallel._init_worker(tagging_format='BIOLU', inflection_mode='morph')
+    augmentor = parallel._AUGMENTOR
+    with AugmentationStream(tokens_list=[['в', 'Москве']], tags_list=[['O', 'U-LOC']], epochs=1, n_workers=1,
+                            backend='process') as stream:
+        assert len(list(stream)) == 1
+    assert parallel._AUGMENTOR is augmentor
@@ -0,0 +1,20 @@
+from src.utils.profiling import StageProfiler, NULL_PROFILER
+
+
+def test_stage_profiler():
+    profiler = StageProfiler()
+    for _ in range(3):
+        with profiler.stage('sample'):
+            pass
+    profiler.count_entity(entity='address', n=2)
+    snapshot = profiler.snapshot()
+    assert snapshot['stages']['sample']['calls'] == 3
+    assert snapshot['entities'] == {'address': 2}
+    assert 'runer_augmentor_stage_calls_total{stage="sample"} 3' in profiler.to_prometheus()
+    assert 'runer_augmentor_entities_total{entity="address"} 2' in profiler.to_prometheus()
+
+
+def test_null_profiler():
+    with NULL_PROFILER.stage('sample'):
+        NULL_PROFILER.count_entity(entity='address')
+    assert not NULL_PROFILER.enabled
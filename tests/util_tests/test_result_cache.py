@@ -0,0 +1,35 @@
+from src.utils.result_cache import ResultCache, sentence_key, augment_cached
+
+
+def test_sentence_key():
+    key = sentence_key(tokens=['В', 'Москве'], tags=['O', 'U-LOC'], seed=42)
+    assert key == sentence_key(tokens=['В', 'Москве'], tags=['O', 'U-LOC'], seed=42)
+    assert key != sentence_key(tokens=['В', 'Москве'], tags=['O', 'U-LOC'], seed=43)
+    assert key != sentence_key(tokens=['В', 'Москве'], tags=['O', 'U-LOC'], seed=42, occurrence=1)
+
+
+def test_result_cache(tmp_path):
+    with ResultCache(path=tmp_path/'cache.sqlite', max_bytes=None, max_entries=2) as cache:
+        cache.put_many(items={'a': ([['Иванов']], [['U-DMN_LAST_NAME']]), 'b': ([['Орёл']], [['U-DMN_CITY']])})
+        assert cache.get_many(keys=['a'])['a'] == ([['Иванов']], [['U-DMN_LAST_NAME']])
+        cache.put_many(items={'c': ([['Тверь']], [['U-DMN_CITY']])})
+        assert set(cache.get_many(keys=['a', 'b', 'c'])) == {'a', 'c'}
+        assert cache.stats()['evictions'] == 1 and cache.stats()['entries'] == 2
+
+
+def test_augment_cached_rerun(tmp_path):
+    cities = ['Москве', 'Твери', 'Туле', 'Казани']
+    tokens_list = [['Я', 'живу', 'в', city] for city in cities]
+    tags_list = [['O', 'O', 'O', 'U-LOC']] * len(cities)
+    kwargs = {'n_variants': 2, 'seed': 3}
+    with ResultCache(path=tmp_path/'cache.sqlite') as cache:
+        tokens, tags = augment_cached(tokens_list=tokens_list, tags_list=tags_list, cache=cache, **kwargs)
+        assert (cache.hits, cache.misses) == (0, 4) and len(tokens) == len(tags) == 8
+        # The third sentence is changed:
+        tokens_list[2] = ['Я', 'живу', 'в', 'Перми']
+        tokens_new, tags_new = augment_cached(tokens_list=tokens_list, tags_list=tags_list, cache=cache, **kwargs)
+        assert (cache.hits, cache.misses) == (3, 5)
+    assert tokens_new[:4] == tokens[:4] and tokens_new[6:] == tokens[6:] and tags_new[:4] == tags[:4]
+    with ResultCache(path=tmp_path/'other.sqlite') as cache:
+        assert augment_cached(tokens_list=tokens_list, tags_list=tags_list, cache=cache, n_workers=2, **kwargs) == \
+            (tokens_new, tags_new)
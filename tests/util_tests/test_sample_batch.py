@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+
+from src.utils.sample_batch import SampleBatch, StringTable, TAG_TABLES
+from src.utils.tag_vocab import TAG_VOCAB
+
+
+def test_sample_batch():
+    tokens_list = [['В', 'Москве'], ['Иванов', 'и', 'Петров'], ['Ок']]
+    tags_list = [['O', 'U-LOC'], ['U-PER', 'O', 'U-PER'], ['O']]
+    batch = SampleBatch.from_lists(tokens_list=tokens_list, tags_list=tags_list)
+    assert len(batch) == 3 and len(batch.tag_table) == 3
+    assert batch[1].tokens == ['Иванов', 'и', 'Петров'] and batch[-1].tags == ['O']
+    tail = batch[1:]
+    assert np.shares_memory(tail.token_ids, batch.token_ids)
+    assert tail.to_lists() == (tokens_list[1:], tags_list[1:])
+    assert batch[::2].to_lists() == (tokens_list[::2], tags_list[::2])
+    assert tail.compact().to_lists() == tail.to_lists() and tail.compact().nbytes < batch.nbytes
+    other = SampleBatch.from_lists(tokens_list=[['Москве']], tags_list=[['U-DMN_CITY']], token_table=StringTable())
+    merged = SampleBatch.concat(batches=[tail, other])
+    assert merged.to_lists() == (tokens_list[1:] + [['Москве']], tags_list[1:] + [['U-DMN_CITY']])
+    assert list(merged.to_pandas().columns) == ['tokens', 'ner_tags']
+
+
+def test_tag_tables():
+    ids = TAG_VOCAB.convert(ids=np.array([1, 3]), tagging_format='BIO')
+    batch = SampleBatch.from_ids(tokens_list=[['ул', 'Ленина']], ids_list=[ids], tag_table=TAG_TABLES['BIO'])
+    assert batch[0].tags == ['B-DMN_COUNTRY', 'I-DMN_COUNTRY']
+    with pytest.raises(ValueError):
+        SampleBatch.from_lists(tokens_list=[['ул']], tags_list=[['B-UNKNOWN']], tag_table=TAG_TABLES['BIO'])
+    assert len(TAG_TABLES['BIO']) == len(TAG_VOCAB.names['BIO'])
@@ -0,0 +1,29 @@
+import numpy as np
+import marisa_trie
+
+from src import STREETS, COUNTRIES
+from src.utils.alias import AliasTable
+from src.utils.sampler import VocabSampler
+
+
+def test_sampler_draws_vocab_keys():
+    sampler = VocabSampler(trie=STREETS, seed=0)
+    assert len(sampler) == len(STREETS)
+    assert sampler.sample() in STREETS
+    assert all(key in STREETS for key in sampler.sample_batch(n=100))
+
+
+def test_sampler_seeded():
+    assert VocabSampler(trie=COUNTRIES, seed=1).sample_batch(n=10) == \
+           VocabSampler(trie=COUNTRIES, seed=1).sample_batch(n=10)
+
+
+def test_sampler_weighted():
+    trie = marisa_trie.Trie(['Москва', 'Тверь'])
+    weights = np.zeros(len(trie))
+    weights[trie['Москва']] = 1.0
+    sampler = VocabSampler(trie=trie, seed=0, alias=AliasTable(weights=weights))
+    assert set(sampler.sample_batch(n=50)) == {'Москва'}
+    assert set(sampler.sample_batch(n=50, np_rng=np.random.default_rng(0))) == {'Москва'}
+    uniform = VocabSampler(trie=trie, seed=0)
+    assert set(uniform.sample_batch(n=50, np_rng=np.random.default_rng(0))) == {'Москва', 'Тверь'}
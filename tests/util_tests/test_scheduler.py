@@ -0,0 +1,29 @@
+from src.scheduler import CoverageScheduler
+
+
+def _corpus() -> tuple:
+    tokens_list = [['Я', 'живу', 'в', 'Москве'], ['Иван', 'Петров', 'приехал'], ['Привет', '!'],
+                   ['Улица', 'Ленина', 'в', 'Туле']]
+    tags_list = [['O', 'O', 'O', 'B-LOC'], ['B-PER', 'I-PER', 'O'], ['O', 'O'], ['B-LOC', 'I-LOC', 'O', 'B-LOC']]
+    return tokens_list, tags_list
+
+
+def test_scheduler_meets_targets():
+    tokens_list, tags_list = _corpus()
+    scheduler = CoverageScheduler(tokens_list=tokens_list, tags_list=tags_list, tags={'DMN_STREET': 3, 'DMN_CITY': 3},
+                                  vocabs={}, cases={}, seed=1)
+    tokens, tags = scheduler.run()
+    report = scheduler.report(compare_blind=True)
+    assert report['coverage']['done'] and report['blind_done']
+    assert len(tokens) == len(tags) == report['samples'] <= report['blind_samples']
+    assert all(len(t) == len(g) for t, g in zip(tokens, tags))
+
+
+def test_scheduler_stops_at_max_samples():
+    tokens_list, tags_list = _corpus()
+    # Corpus has no spans in instrumental case, so target can't be met:
+    scheduler = CoverageScheduler(tokens_list=tokens_list, tags_list=tags_list, tags={}, vocabs={},
+                                  cases={'ablt': 1}, max_samples=5, seed=1)
+    tokens, _ = scheduler.run()
+    report = scheduler.report()
+    assert len(tokens) == report['samples'] == 5 and not report['coverage']['done']
@@ -0,0 +1,101 @@
+import json, asyncio
+
+from src.server import AugmentationServer
+from src.utils import parallel
+
+
+async def _request(port: int, request: dict) -> dict:
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(json.dumps(request, ensure_ascii=False).encode('utf-8') + b'\n')
+    await writer.drain()
+    response = json.loads(await reader.readline())
+    writer.close()
+    return response
+
+
+def test_server_coalesces_requests():
+    async def run() -> tuple:
+        server = AugmentationServer(max_batch=64, max_latency=0.2)
+        await server.start(port=0)
+        port = server.server.sockets[0].getsockname()[1]
+        try:
+            responses = await asyncio.gather(*[
+                _request(port=port, request={'id': i, 'tokens': [['Я', 'живу', 'в', 'Москве']],
+                                             'tags': [['O', 'O', 'O', 'B-LOC']], 'n_variants': 2})
+                for i in range(8)
+            ])
+            stats = (await _request(port=port, request={'op': 'stats'}))['stats']
+        finally:
+            await server.close()
+        return responses, stats
+
+    responses, stats = asyncio.run(run())
+    assert sorted(response['id'] for response in responses) == list(range(8))
+    assert all(len(response['tokens']) == 2 and response['tokens'][0][:3] == ['Я', 'живу', 'в']
+               for response in responses)
+    assert all(len(t) == len(g) for response in responses for t, g in zip(response['tokens'], response['tags']))
+    assert stats['requests'] == 8 and stats['batches'] < 8 and stats['mean_batch_size'] > 2
+
+
+def test_server_rejects_malformed_requests():
+    async def run() -> list:
+        server = AugmentationServer(max_latency=0.05)
+        await server.start(port=0)
+        port = server.server.sockets[0].getsockname()[1]
+        try:
+            responses = await asyncio.gather(
+                _request(port=port, request={'tokens': [['Москва']], 'tags': [['B-LOC']], 'n_variants': '2'}),
+                _request(port=port, request={'tokens': [['a']], 'tags': [['O', 'B-LOC']]}),
+                _request(port=port, request={'tokens': [[1]], 'tags': [['O']]}),
+                _request(port=port, request={'tokens': [['Москва']], 'tags': [['B-LOC']]}),
+            )
+            # Server keeps answering after bad requests:
+            responses += [await asyncio.wait_for(_request(port=port, request={'tokens': [['Москва']],
+                                                                               'tags': [['B-LOC']]}), timeout=10)]
+        finally:
+            await server.close()
+        return responses
+
+    responses = asyncio.run(run())
+    assert all('error' in response for response in responses[:3])
+    assert all('error' not in response and len(response['tokens']) == 1 for response in responses[3:])
+
+
+def test_server_isolates_failing_request_of_batch():
+    async def run() -> list:
+        server = AugmentationServer(max_latency=0.2)
+        await server.start(port=0)
+        # Malformed sentence reaches batch (validation is bypassed):
+        server._validate = lambda request: None
+        port = server.server.sockets[0].getsockname()[1]
+        try:
+            return await asyncio.gather(
+                _request(port=port, request={'tokens': [['a']], 'tags': [['O', 'B-LOC']]}),
+                _request(port=port, request={'tokens': [['в', 'Москве']], 'tags': [['O', 'B-LOC']]}),
+            )
+        finally:
+            await server.close()
+
+    bad, good = asyncio.run(run())
+    assert 'error' in bad and 'error' not in good and good['tokens'][0][0] == 'в'
+
+
+def test_server_close_answers_pending_requests():
+    parallel._init_worker(tagging_format='BIOLU', inflection_mode='morph')
+    augmentor = parallel._AUGMENTOR
+
+    async def run() -> dict:
+        server = AugmentationServer(max_latency=10)
+        await server.start(port=0)
+        port = server.server.sockets[0].getsockname()[1]
+        pending = asyncio.create_task(_request(port=port, request={'id': 1, 'tokens': [['Москва']],
+                                                                   'tags': [['B-LOC']]}))
+        await asyncio.sleep(0.2)
+        # Request waits for other requests of batch, it's answered on close:
+        await asyncio.wait_for(server.close(), timeout=10)
+        return await asyncio.wait_for(pending, timeout=10)
+
+    response = asyncio.run(run())
+    assert response['id'] == 1 and 'closed' in response['error']
+    # Single-worker server has own augmentor:
+    assert parallel._AUGMENTOR is augmentor
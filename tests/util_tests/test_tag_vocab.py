@@ -0,0 +1,9 @@
+from src.utils.tag_vocab import TAG_VOCAB
+
+
+def test_tag_vocab():
+    ids = TAG_VOCAB.encode(tags=['O', 'B-STREET', 'L-STREET', 'U-HOUSE'])
+    assert TAG_VOCAB.decode(ids=ids) == ['O', 'B-DMN_STREET', 'L-DMN_STREET', 'U-DMN_HOUSE']
+    assert TAG_VOCAB.decode(ids=ids, tagging_format='BIO') == ['O', 'B-DMN_STREET', 'I-DMN_STREET', 'B-DMN_HOUSE']
+    assert TAG_VOCAB.decode(ids=ids, tagging_format='single_token') == ['O', 'DMN_STREET', 'DMN_STREET', 'DMN_HOUSE']
+    assert TAG_VOCAB.decode(ids=ids, tagging_format='BIO', tag_map=False) == ['O', 'B-STREET', 'I-STREET', 'B-HOUSE']
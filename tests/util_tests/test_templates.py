@@ -0,0 +1,15 @@
+import random
+import pytest
+
+from src.utils.templates import TEMPLATES, TemplatePlan, compile_templates
+
+
+def test_templates():
+    assert TEMPLATES['full_name'].labels[1] == ('LAST_NAME', 'FIRST_NAME')
+    assert TEMPLATES['address'].labels[1] == ('STREET', 'HOUSE', 'CITY', 'O')
+    plan = compile_templates(templates={'street': {'layouts': [['STREET', 'HOUSE']], 'inflect': False}})['street']
+    assert plan.choose(rng=random.Random(0)) == 0 and not plan.inflect
+    with pytest.raises(ValueError):
+        TemplatePlan(entity='street', layouts=[['STREET', 'FLAT']])
+    with pytest.raises(ValueError):
+        TemplatePlan(entity='street', layouts=[['STREET']], abbreviation='always')
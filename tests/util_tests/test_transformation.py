@@ -1,6 +1,7 @@
-import pytest
+import numpy as np
+import transliterate
 
-from src.utils.transformation import transform
+from src.utils.transformation import TRANSLITERATOR, transform, transform_batch
 
 test_sample = 'Задача NLP - извлечении именованных сущностей (NER)'
 
@@ -45,3 +46,22 @@ def test_transform_transliterated_and_uppercase():
         tokens=test_sample.split(' '),
         transformation_case='transliterated_uppercase'
     ) == ['ZADAChA', 'NLP', '-', 'IZVLEChENII', 'IMENOVANNYH', 'SUSchNOSTEJ', '(NER)']
+
+
+def test_transform_own_rng():
+    assert [transform(tokens=test_sample.split(' '), rng=np.random.default_rng(seed=i)) for i in range(10)] == \
+           [transform(tokens=test_sample.split(' '), rng=np.random.default_rng(seed=i)) for i in range(10)]
+
+
+def test_transliterator_matches_transliterate():
+    for value in [test_sample, test_sample.upper(), 'Щёлково, Цимлянск, съезд, ЪЬЭЮЯ']:
+        assert TRANSLITERATOR.translit(value=value) == transliterate.translit(value, 'ru', reversed=True)
+
+
+def test_transform_batch():
+    tokens_list = [test_sample.split(' ')] * 20
+    assert transform_batch(tokens_list=tokens_list, transformation_case='transliterated_uppercase') == \
+           [transform(tokens=tokens, transformation_case='transliterated_uppercase') for tokens in tokens_list]
+    transformed = transform_batch(tokens_list=tokens_list, rng=np.random.default_rng(seed=0))
+    assert all(len(tokens) == len(test_sample.split(' ')) for tokens in transformed)
+    assert transform_batch(tokens_list=[[]]) == [[]]
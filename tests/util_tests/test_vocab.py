@@ -0,0 +1,14 @@
+import pytest
+
+import src
+from src.utils.vocab import VOCAB_FILES, load_vocab
+
+
+def test_vocabs_are_loaded_once():
+    for name in VOCAB_FILES:
+        assert getattr(src, name) is load_vocab(name=name)
+
+
+def test_unknown_attribute():
+    with pytest.raises(AttributeError):
+        getattr(src, 'UNKNOWN_VOCAB')